@@ -0,0 +1,178 @@
+"""
+Adaptive Research Agent - Transcript-first research that searches the web only when needed.
+
+ParallelResearch used to run SearchAgent and TranscriptAgent for every
+question, so each one paid for a web-grounded model call even when the
+channel's own video answered it outright. This agent first scores the
+transcripts locally (tools/transcript_search_tool.transcript_confidence,
+a few milliseconds, no model call):
+
+- confidence at or above TRANSCRIPT_CONFIDENCE_THRESHOLD: only the
+  TranscriptAgent runs, and search_results records that the web search
+  was skipped
+- below it: SearchAgent and TranscriptAgent run in parallel as before
+
+Either way the branches run under per-branch deadlines
+(agents/deadline_parallel_agent.py): a search that is still running at
+RESEARCH_SEARCH_TIMEOUT is cancelled and synthesis goes ahead without it.
+
+Scoring is fast enough that running it first adds no noticeable latency,
+so there is no need to race it against the search. The path taken, the
+confidence and the estimated latency saved are written to session state
+("research_path") and appended to a JSONL log.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import AsyncGenerator, Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from agents.deadline_parallel_agent import DEFAULT_BRANCH_TIMEOUT, DeadlineParallelAgent
+from tools.transcript_search_tool import transcript_confidence
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Transcript coverage at which the web search is skipped. Questions the
+# transcripts answer score 0.76 - 1.0; off-topic or partly covered ones
+# (a missing "mba", "stipend", "weather") stay at or below 0.58.
+CONFIDENCE_THRESHOLD = float(os.environ.get("TRANSCRIPT_CONFIDENCE_THRESHOLD", "0.7"))
+
+# Deadlines of the research branches (seconds from the start of research)
+SEARCH_TIMEOUT = float(os.environ.get("RESEARCH_SEARCH_TIMEOUT", "12"))
+TRANSCRIPT_TIMEOUT = float(os.environ.get("RESEARCH_TRANSCRIPT_TIMEOUT", str(DEFAULT_BRANCH_TIMEOUT)))
+
+# Per-question research path log
+DEFAULT_RESEARCH_LOG = Path(os.environ.get(
+    "RESEARCH_PATH_LOG", PROJECT_ROOT / "data" / "research_paths.jsonl"
+))
+
+# Written to search_results when the web search is skipped
+SEARCH_SKIPPED = (
+    "Web search was skipped: the video transcripts cover this question. "
+    "Answer from the transcript findings."
+)
+
+# Smoothing of the running average of each path's duration
+LATENCY_SMOOTHING = 0.2
+
+_durations: Dict[str, float] = {}
+_durations_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def _observe_duration(path: str, seconds: float) -> None:
+    """Updates the running average duration of a research path."""
+    with _durations_lock:
+        previous = _durations.get(path)
+        _durations[path] = seconds if previous is None else previous + LATENCY_SMOOTHING * (seconds - previous)
+
+
+def _average_duration(path: str) -> float:
+    with _durations_lock:
+        return _durations.get(path, 0.0)
+
+
+def log_research_path(record: Dict, path: Path = None):
+    """
+    Appends one question's research path to the research log.
+
+    Args:
+        record: The "research_path" state value plus the question
+        path: Log file (defaults to data/research_paths.jsonl)
+    """
+    log_path = Path(path) if path else DEFAULT_RESEARCH_LOG
+    with _log_lock:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class AdaptiveResearchAgent(BaseAgent):
+    """
+    Runs only the TranscriptAgent when the transcripts clearly cover the
+    question, and the full parallel research otherwise.
+
+    parallel_research contains both search_agent and transcript_agent; the
+    transcript-only path runs transcript_agent on its own, under the same
+    deadline.
+    """
+
+    parallel_research: DeadlineParallelAgent
+    transcript_agent: BaseAgent
+    search_agent: BaseAgent
+    threshold: float = CONFIDENCE_THRESHOLD
+
+    def __init__(
+        self,
+        name: str,
+        search_agent: BaseAgent,
+        transcript_agent: BaseAgent,
+        threshold: float = CONFIDENCE_THRESHOLD,
+        branch_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        parallel_research = DeadlineParallelAgent(
+            name="ParallelResearch",
+            sub_agents=[search_agent, transcript_agent],
+            branch_timeouts=branch_timeouts or {
+                search_agent.name: SEARCH_TIMEOUT,
+                transcript_agent.name: TRANSCRIPT_TIMEOUT,
+            },
+        )
+        super().__init__(
+            name=name,
+            parallel_research=parallel_research,
+            transcript_agent=transcript_agent,
+            search_agent=search_agent,
+            threshold=threshold,
+            sub_agents=[parallel_research],
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        question = ""
+        if ctx.user_content and ctx.user_content.parts:
+            question = "".join(part.text or "" for part in ctx.user_content.parts)
+        started = time.perf_counter()
+        scored = transcript_confidence(question) if question else {"confidence": 0.0}
+        scoring_ms = (time.perf_counter() - started) * 1000
+        transcript_only = scored["confidence"] >= self.threshold
+
+        if transcript_only:
+            async for event in self.parallel_research.run_branches(ctx, [self.transcript_agent]):
+                yield event
+            path = "transcript_only"
+        else:
+            async for event in self.parallel_research.run_async(ctx):
+                yield event
+            path = "transcript_and_search"
+        elapsed = time.perf_counter() - started
+        _observe_duration(path, elapsed)
+
+        # Saved time is estimated against the running average of full research
+        full_average = _average_duration("transcript_and_search")
+        record = {
+            "path": path,
+            "confidence": scored["confidence"],
+            "threshold": self.threshold,
+            "video_number": scored.get("video_number"),
+            "missing_terms": scored.get("missing_terms", []),
+            "scoring_ms": round(scoring_ms, 1),
+            "research_ms": round(elapsed * 1000, 1),
+            "latency_saved_ms": round(max(0.0, full_average - elapsed) * 1000, 1) if transcript_only and full_average else 0.0,
+        }
+        state_delta = {"research_path": record}
+        if transcript_only:
+            state_delta["search_results"] = SEARCH_SKIPPED
+        log_research_path({"time": time.time(), "question": question, **record})
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
@@ -0,0 +1,238 @@
+"""
+Batch Classifier - Filters and routes many comments per model request.
+
+Backfilling a video means classifying hundreds of comments. Instead of one
+ClassifierAgent call per comment, this packs up to batch_size comments,
+each with an id, into one prompt and constrains the response to a JSON
+array of {"id", "decision", "type"} objects.
+
+Every id is validated: ids that come back missing, duplicated or malformed
+are retried in a smaller batch, and whatever is still missing after that
+is classified with one single-comment request each. Comments the local
+pre-filter and intent classifier are confident about never reach the model.
+
+The results are meant to be seeded into each comment's session state
+(see seed_state()), where the ClassifierAgent picks them up without a
+model call.
+"""
+
+import asyncio
+import json
+from typing import Dict, List, Literal, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from pydantic import BaseModel, Field, ValidationError
+
+from agents.classifier_agent import CLASSIFIER_INSTRUCTION, CommentClassification
+from agents.models import get_shared_model
+from tools.comment_prefilter import get_comment_prefilter
+from tools.intent_classifier import get_intent_classifier
+
+
+# Comments per model request
+DEFAULT_BATCH_SIZE = 25
+
+# Batch requests in flight at once
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Rounds of re-batching missing ids before falling back to single calls
+DEFAULT_MAX_RETRIES = 1
+
+BATCH_INSTRUCTION = CLASSIFIER_INSTRUCTION + """
+You will receive a JSON array of comments, each with an "id" and a
+"comment". Classify every comment independently and return one object per
+comment with the same "id". Return every id exactly once.
+"""
+
+
+class BatchClassificationItem(BaseModel):
+    """One element of the batch response array."""
+
+    id: str = Field(description="The id of the comment, copied exactly")
+    decision: Literal["IGNORE", "ACCEPT"]
+    type: Literal["Question", "Praise"]
+
+
+class BatchCommentClassifier:
+    """Classifies comments in batches with id validation and single-call fallback."""
+
+    def __init__(
+        self,
+        model: BaseLlm,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        use_local: bool = True,
+    ):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max_retries
+        self.use_local = use_local
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.stats = {"comments": 0, "local": 0, "batched": 0, "retried": 0, "single": 0, "failed": 0, "model_requests": 0}
+
+    async def classify(self, comments: List[Tuple[str, str]]) -> Dict[str, Dict[str, str]]:
+        """
+        Classifies comments, batching the ones that need the model.
+
+        Args:
+            comments: List of (comment_id, comment_text) pairs; ids must be unique
+
+        Returns:
+            Dictionary of comment_id -> {"decision", "type", "source"}; ids
+            that could not be classified at all are left out
+        """
+        texts = dict(comments)
+        self.stats["comments"] += len(texts)
+        results: Dict[str, Dict[str, str]] = {}
+
+        pending: List[str] = []
+        for comment_id, text in texts.items():
+            local = self._classify_locally(text) if self.use_local else None
+            if local is None:
+                pending.append(comment_id)
+            else:
+                results[comment_id] = local
+                self.stats["local"] += 1
+
+        batch_size = self.batch_size
+        for attempt in range(self.max_retries + 1):
+            if not pending or batch_size < 2:
+                break
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            batch_results = await asyncio.gather(*(self._classify_batch(batch, texts) for batch in batches))
+            for classified in batch_results:
+                for comment_id, result in classified.items():
+                    result["source"] = "batch" if attempt == 0 else "batch_retry"
+                    results[comment_id] = result
+            self.stats["batched" if attempt == 0 else "retried"] += sum(len(classified) for classified in batch_results)
+            pending = [comment_id for comment_id in pending if comment_id not in results]
+            # Missing ids often come from batches that were too long for the
+            # model to track; retry them in smaller batches
+            batch_size = max(1, batch_size // 2)
+
+        singles = await asyncio.gather(*(self._classify_single(texts[comment_id]) for comment_id in pending))
+        for comment_id, result in zip(pending, singles):
+            if result is None:
+                self.stats["failed"] += 1
+                continue
+            result["source"] = "single"
+            results[comment_id] = result
+            self.stats["single"] += 1
+        return results
+
+    def _classify_locally(self, text: str) -> Optional[Dict[str, str]]:
+        """Uses the local pre-filter and intent classifier when both are confident."""
+        prefilter = get_comment_prefilter().decide(text)
+        if prefilter is None:
+            return None
+        if prefilter.decision == "IGNORE":
+            return {"decision": "IGNORE", "type": "Praise", "source": "local"}
+        decision = get_intent_classifier().decide(text)
+        if decision is None:
+            return None
+        comment_type, _ = decision
+        return {"decision": "ACCEPT", "type": comment_type, "source": "local"}
+
+    async def _classify_batch(self, batch: List[str], texts: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+        """Sends one batch request and keeps only valid items for ids that were asked for."""
+        payload = json.dumps([{"id": comment_id, "comment": texts[comment_id]} for comment_id in batch], ensure_ascii=False)
+        response = await self._generate(BATCH_INSTRUCTION, payload, List[BatchClassificationItem])
+        if not isinstance(response, list):
+            return {}
+        wanted = set(batch)
+        seen: Dict[str, Dict[str, str]] = {}
+        duplicates = set()
+        for raw in response:
+            try:
+                item = BatchClassificationItem.model_validate(raw)
+            except ValidationError:
+                continue
+            if item.id not in wanted:
+                continue
+            if item.id in seen:
+                duplicates.add(item.id)
+            seen[item.id] = {"decision": item.decision, "type": item.type}
+        # An id answered twice is ambiguous; ask again
+        for comment_id in duplicates:
+            del seen[comment_id]
+        return seen
+
+    async def _classify_single(self, text: str) -> Optional[Dict[str, str]]:
+        """Classifies one comment with the single-comment schema."""
+        response = await self._generate(CLASSIFIER_INSTRUCTION, text, CommentClassification)
+        try:
+            item = CommentClassification.model_validate(response)
+        except ValidationError:
+            return None
+        return {"decision": item.decision, "type": item.type}
+
+    async def _generate(self, instruction: str, prompt: str, schema) -> Optional[object]:
+        """Runs one structured request and returns the parsed JSON, or None on any failure."""
+        request = LlmRequest(
+            model=self.model.model,
+            contents=[types.Content(role="user", parts=[types.Part(text=prompt)])],
+            config=types.GenerateContentConfig(
+                system_instruction=instruction,
+                response_mime_type="application/json",
+                response_schema=schema,
+            ),
+        )
+        text = ""
+        async with self._semaphore:
+            self.stats["model_requests"] += 1
+            try:
+                async for response in self.model.generate_content_async(request, stream=False):
+                    if response.content and response.content.parts:
+                        text += "".join(part.text or "" for part in response.content.parts if not part.thought)
+            except Exception:
+                # Retries for transient HTTP errors and rate limits already
+                # happened inside the model; treat the rest as a missing answer
+                return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
+
+
+def seed_state(classification: Dict[str, str]) -> Dict[str, object]:
+    """
+    Builds the initial session state for a comment that was batch-classified.
+
+    Args:
+        classification: One value returned by BatchCommentClassifier.classify()
+
+    Returns:
+        State dictionary to pass to create_session(state=...)
+    """
+    return {
+        "preclassified": {
+            "decision": classification["decision"],
+            "type": classification["type"],
+            "source": classification.get("source", "batch"),
+        }
+    }
+
+
+def create_batch_classifier(
+    retry_config: types.HttpRetryOptions,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    model: Optional[BaseLlm] = None,
+) -> BatchCommentClassifier:
+    """
+    Creates a batch classifier backed by the same model as the ClassifierAgent.
+
+    Args:
+        retry_config: HTTP retry configuration for API calls
+        batch_size: Comments per model request
+        max_concurrency: Batch requests in flight at once
+        model: Model to call (defaults to the process-wide shared Gemini model)
+
+    Returns:
+        Configured BatchCommentClassifier
+    """
+    model = model or get_shared_model(retry_config)
+    return BatchCommentClassifier(model, batch_size=batch_size, max_concurrency=max_concurrency)
@@ -0,0 +1,177 @@
+"""
+Classifier Agent - Filters and routes a comment in one structured model call.
+
+Combines the FilterAgent and RouterAgent decisions. The model must answer
+with a constrained JSON object, {"decision": "IGNORE" | "ACCEPT",
+"type": "Question" | "Praise"}, so there is no free text to parse. Both
+values are written to the "filter_decision" and "comment_type" state keys
+the rest of the workflow already reads.
+
+The local pre-filter and intent classifier run first, as they do for the
+separate agents; the model is only called when they are not confident.
+"""
+
+import json
+from typing import Literal, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.base_llm import BaseLlm
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from agents.models import create_model
+from tools.comment_prefilter import get_comment_prefilter
+from tools.intent_classifier import get_intent_classifier, log_decision
+
+
+# Shared with the batch classifier (agents/batch_classifier.py)
+CLASSIFIER_INSTRUCTION = """You classify comments on a YouTube channel.
+
+Return two fields:
+
+decision:
+- "IGNORE" if the comment is spam or promotional content, rude,
+  offensive or inappropriate, or completely empty / only emojis
+- "ACCEPT" for everything else: questions (even simple ones), praise,
+  thanks, personal stories, requests for help
+- Be VERY lenient - only reject clearly spam/rude/inappropriate comments
+
+type:
+- "Question" if the comment asks a question or requests information,
+  clarification or an explanation (with "?", "how", "what", "why",
+  "can you", "kya", "kaise", etc.)
+- "Praise" if it expresses appreciation, gratitude or positive feedback
+  and does not ask anything
+- If a comment has both praise AND a question, choose "Question"
+"""
+
+
+class CommentClassification(BaseModel):
+    """Structured output of the ClassifierAgent."""
+
+    decision: Literal["IGNORE", "ACCEPT"] = Field(description="IGNORE for spam/rude/empty comments, else ACCEPT")
+    type: Literal["Question", "Praise"] = Field(description="Question if the comment asks anything, else Praise")
+
+
+def _comment_text(callback_context: CallbackContext) -> str:
+    """Returns the text of the comment being classified."""
+    user_content = callback_context.user_content
+    if not user_content or not user_content.parts:
+        return ""
+    return "".join(part.text or "" for part in user_content.parts)
+
+
+def _store_classification(callback_context: CallbackContext, decision: str, comment_type: str, source: str):
+    """Writes a classification to all the state keys the workflow reads."""
+    callback_context.state["classification"] = {"decision": decision, "type": comment_type}
+    callback_context.state["filter_decision"] = decision
+    callback_context.state["comment_type"] = comment_type
+    callback_context.state["classification_source"] = source
+
+
+def local_classification_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Classifies the comment locally when the local rules and classifier are confident.
+
+    A classification seeded into session state under "preclassified" (by
+    a batch classification pass) is used as is.
+
+    Args:
+        callback_context: Context of the ClassifierAgent invocation
+
+    Returns:
+        Content with the classification JSON, or None to let the model decide
+    """
+    # Already classified by a batch classification pass. The seed is
+    # consumed so later turns of the same session are classified afresh.
+    preclassified = callback_context.state.get("preclassified")
+    if isinstance(preclassified, dict):
+        callback_context.state["preclassified"] = None
+        _store_classification(
+            callback_context,
+            preclassified.get("decision", "ACCEPT"),
+            preclassified.get("type", "Question"),
+            preclassified.get("source", "batch"),
+        )
+        return types.Content(
+            role="model",
+            parts=[types.Part(text=json.dumps(callback_context.state["classification"]))]
+        )
+
+    comment = _comment_text(callback_context)
+    if not comment:
+        return None
+    callback_context.state["classification_source"] = "model"
+
+    prefilter = get_comment_prefilter().decide(comment)
+    if prefilter is None:
+        return None
+    if prefilter.decision == "IGNORE":
+        # The type is irrelevant for ignored comments
+        _store_classification(callback_context, "IGNORE", "Praise", "local")
+    else:
+        decision = get_intent_classifier().decide(comment)
+        if decision is None:
+            return None
+        comment_type, _ = decision
+        _store_classification(callback_context, "ACCEPT", comment_type, "local")
+        log_decision(comment, comment_type, "local")
+    return types.Content(
+        role="model",
+        parts=[types.Part(text=json.dumps(callback_context.state["classification"]))]
+    )
+
+
+def split_classification_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Copies the model's structured result into "filter_decision" and "comment_type".
+
+    Args:
+        callback_context: Context of the ClassifierAgent invocation
+
+    Returns:
+        None (the agent's output is left unchanged)
+    """
+    if callback_context.state.get("classification_source") != "model":
+        return None
+    classification = callback_context.state.get("classification")
+    if not isinstance(classification, dict):
+        return None
+    decision = classification.get("decision", "ACCEPT")
+    comment_type = classification.get("type", "Question")
+    _store_classification(callback_context, decision, comment_type, "model")
+    comment = _comment_text(callback_context)
+    if decision == "ACCEPT" and comment:
+        log_decision(comment, comment_type, "model")
+    return None
+
+
+def create_classifier_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
+    """
+    Creates the Classifier Agent that filters and routes a comment in one call.
+
+    Replaces FilterAgent followed by RouterAgent: one structured model call
+    returns both decisions, and confident local predictions skip the model.
+
+    Args:
+        retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
+
+    Returns:
+        Configured LlmAgent for classifying comments
+    """
+    classifier_agent = LlmAgent(
+        name="ClassifierAgent",
+        model=model or create_model(retry_config),
+        instruction=CLASSIFIER_INSTRUCTION,
+        output_schema=CommentClassification,
+        output_key="classification",  # Structured result in session state
+        before_agent_callback=local_classification_callback,  # Skip the model for obvious comments
+        after_agent_callback=split_classification_callback  # Fill filter_decision / comment_type
+    )
+
+    return classifier_agent
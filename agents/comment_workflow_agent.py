@@ -0,0 +1,151 @@
+"""
+Comment Workflow Agent - Deterministic coordinator for the comment response workflow.
+
+The FilterAgent and RouterAgent already write their decisions to session
+state ("filter_decision" and "comment_type"). This agent runs them in
+order, branches on those values in code, runs the matching responder and
+emits its response exactly as written. No model call is spent on
+coordination, and the response is never rephrased on its way out.
+
+Instead of the two agents, a single ClassifierAgent that writes both state
+keys can be given as classifier_agent.
+
+With a response_cache, a comment that repeats (or nearly repeats) one
+answered before gets the cached answer without running any agent, and
+every new praise or question answer is added to the cache.
+"""
+
+from typing import AsyncGenerator, Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from tools.response_cache import ResponseCache
+
+
+# Reply emitted when the filter rejects a comment
+IGNORE_RESPONSE = "This comment doesn't need a response."
+
+
+def normalize_label(value: Optional[str]) -> str:
+    """
+    Reduces a classifier's raw output to a bare lowercase label.
+
+    Models occasionally wrap the label in quotes, add a trailing period or
+    a newline; "ACCEPT", "Accept." and '"accept"' all become "accept".
+
+    Args:
+        value: Raw state value written by an agent's output_key
+
+    Returns:
+        Normalized label, or "" if there is none
+    """
+    if not value:
+        return ""
+    return str(value).strip().strip("\"'`.*").strip().lower()
+
+
+class CommentWorkflowAgent(BaseAgent):
+    """
+    Runs filter -> router -> praise responder or question pipeline in code.
+
+    Either classifier_agent (one combined call) or both filter_agent and
+    router_agent must be given. Sub-agent events are passed through (so
+    their state updates are recorded), followed by one final event carrying
+    the response.
+    """
+
+    praise_agent: BaseAgent
+    question_pipeline: BaseAgent
+    filter_agent: Optional[BaseAgent] = None
+    router_agent: Optional[BaseAgent] = None
+    classifier_agent: Optional[BaseAgent] = None
+    response_cache: Optional[ResponseCache] = None
+
+    def __init__(
+        self,
+        name: str,
+        praise_agent: BaseAgent,
+        question_pipeline: BaseAgent,
+        filter_agent: Optional[BaseAgent] = None,
+        router_agent: Optional[BaseAgent] = None,
+        classifier_agent: Optional[BaseAgent] = None,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        if classifier_agent is None and (filter_agent is None or router_agent is None):
+            raise ValueError("CommentWorkflowAgent needs classifier_agent or both filter_agent and router_agent")
+        if classifier_agent is not None:
+            filter_agent = router_agent = None
+            classifiers = [classifier_agent]
+        else:
+            classifiers = [filter_agent, router_agent]
+        super().__init__(
+            name=name,
+            filter_agent=filter_agent,
+            router_agent=router_agent,
+            classifier_agent=classifier_agent,
+            praise_agent=praise_agent,
+            question_pipeline=question_pipeline,
+            response_cache=response_cache,
+            sub_agents=classifiers + [praise_agent, question_pipeline],
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        comment = self._comment_text(ctx)
+        if self.response_cache is not None and comment:
+            hit = self.response_cache.lookup(comment)
+            if hit is not None:
+                yield self._response_event(ctx, hit["response"], state_delta={
+                    "filter_decision": "ACCEPT",
+                    "comment_type": hit["comment_type"],
+                    "response_cache": {"match": hit["match"], "similarity": hit["similarity"]},
+                })
+                return
+
+        first_classifier = self.classifier_agent or self.filter_agent
+        async for event in first_classifier.run_async(ctx):
+            yield event
+        # Anything other than an explicit IGNORE is accepted, matching the
+        # filter's "be lenient" instruction
+        if normalize_label(ctx.session.state.get("filter_decision")) == "ignore":
+            yield self._response_event(ctx, IGNORE_RESPONSE)
+            return
+
+        if self.classifier_agent is None:
+            async for event in self.router_agent.run_async(ctx):
+                yield event
+        # Mixed praise + question comments are questions, so only an
+        # explicit "Praise" takes the praise path
+        if normalize_label(ctx.session.state.get("comment_type")) == "praise":
+            responder, response_key = self.praise_agent, "praise_response"
+        else:
+            responder, response_key = self.question_pipeline, "final_response"
+
+        async for event in responder.run_async(ctx):
+            yield event
+        response = ctx.session.state.get(response_key)
+        if response:
+            response = str(response).strip()
+            if self.response_cache is not None and comment:
+                comment_type = "Praise" if responder is self.praise_agent else "Question"
+                self.response_cache.store(comment, response, comment_type)
+            yield self._response_event(ctx, response)
+
+    @staticmethod
+    def _comment_text(ctx: InvocationContext) -> str:
+        """Returns the text of the comment this invocation answers."""
+        if not ctx.user_content or not ctx.user_content.parts:
+            return ""
+        return "".join(part.text or "" for part in ctx.user_content.parts).strip()
+
+    def _response_event(self, ctx: InvocationContext, text: str, state_delta: Optional[Dict] = None) -> Event:
+        """Builds the final event that carries the response text verbatim."""
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta or {}),
+        )
@@ -0,0 +1,147 @@
+"""
+Deadline Parallel Agent - Runs research branches in parallel, each with its own timeout.
+
+With a plain ParallelAgent, one slow google_search call held back
+SynthesisAgent and QuestionResponderAgent even when the transcript branch
+had finished long before. Here every branch gets a timeout, measured from
+the start of the stage. When a branch misses it, it is cancelled and the
+stage moves on with whatever the other branches produced. A branch that
+fails is treated the same way instead of failing the whole question.
+
+Each branch that did not finish has its output_key set to an explicit
+"unavailable" marker, so prompts that read it ({search_results},
+{transcript_results}) still render and tell the model what is missing.
+Per-branch outcomes are recorded in session state ("research_branches").
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+
+logger = logging.getLogger(__name__)
+
+# Timeout of a branch without an entry in branch_timeouts (seconds)
+DEFAULT_BRANCH_TIMEOUT = float(os.environ.get("RESEARCH_BRANCH_TIMEOUT", "20"))
+
+# Written to a branch's output_key when it did not finish
+UNAVAILABLE_MARKER = "UNAVAILABLE: {agent} {reason}. Answer without this source."
+
+_DONE = object()
+
+
+class DeadlineParallelAgent(BaseAgent):
+    """Parallel agent whose branches are cancelled at their deadline."""
+
+    branch_timeouts: Dict[str, float] = {}
+    default_timeout: float = DEFAULT_BRANCH_TIMEOUT
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async for event in self.run_branches(ctx, self.sub_agents):
+            yield event
+
+    def timeout_for(self, agent: BaseAgent) -> float:
+        return self.branch_timeouts.get(agent.name, self.default_timeout)
+
+    async def run_branches(self, ctx: InvocationContext, agents: List[BaseAgent]) -> AsyncGenerator[Event, None]:
+        """
+        Runs agents concurrently, yielding their events until each finishes or times out.
+
+        Args:
+            ctx: Invocation context of this agent
+            agents: Branches to run (normally sub_agents, or a subset of them)
+
+        Yields:
+            The branches' events, then one event recording the outcomes
+            and filling the output_key of every unfinished branch
+        """
+        started = time.monotonic()
+        queue: asyncio.Queue = asyncio.Queue()
+        outcomes: Dict[str, str] = {}
+        errors: Dict[str, str] = {}
+
+        async def run_branch(index: int, agent: BaseAgent):
+            events = agent.run_async(self._branch_context(ctx, agent))
+            try:
+                async for event in events:
+                    resume = asyncio.Event()
+                    await queue.put((index, event, resume))
+                    # Wait until the event is handed upstream (and persisted)
+                    await resume.wait()
+                outcomes[agent.name] = "done"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Research branch %s failed", agent.name, exc_info=True)
+                outcomes[agent.name] = "failed"
+                errors[agent.name] = f"{type(e).__name__}: {e}"
+            finally:
+                await events.aclose()
+                queue.put_nowait((index, _DONE, None))
+
+        tasks = [asyncio.create_task(run_branch(index, agent)) for index, agent in enumerate(agents)]
+        deadlines = [started + self.timeout_for(agent) for agent in agents]
+        running = set(range(len(agents)))
+        try:
+            while running:
+                now = time.monotonic()
+                for index in [index for index in running if deadlines[index] <= now]:
+                    # Late branch: cancel it (unless it finished just now)
+                    tasks[index].cancel()
+                    outcomes.setdefault(agents[index].name, "timed_out")
+                    running.discard(index)
+                if not running:
+                    break
+                wait = min(deadlines[index] for index in running) - now
+                try:
+                    index, event, resume = await asyncio.wait_for(queue.get(), timeout=max(0.0, wait))
+                except asyncio.TimeoutError:
+                    continue
+                if event is _DONE:
+                    running.discard(index)
+                    continue
+                if index not in running:
+                    continue  # Produced just before its branch was cancelled
+                yield event
+                resume.set()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        elapsed = time.monotonic() - started
+        state_delta: Dict[str, object] = {}
+        branches = {}
+        for agent in agents:
+            outcome = outcomes.get(agent.name, "timed_out")
+            branches[agent.name] = outcome
+            if outcome == "done":
+                continue
+            reason = (
+                f"did not finish within {self.timeout_for(agent):g}s"
+                if outcome == "timed_out" else f"failed ({errors.get(agent.name, 'error')})"
+            )
+            output_key: Optional[str] = getattr(agent, "output_key", None)
+            if output_key:
+                state_delta[output_key] = UNAVAILABLE_MARKER.format(agent=agent.name, reason=reason)
+        state_delta["research_branches"] = {"branches": branches, "elapsed_ms": round(elapsed * 1000, 1)}
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    def _branch_context(self, ctx: InvocationContext, agent: BaseAgent) -> InvocationContext:
+        """Gives a branch its own conversation branch, as ParallelAgent does."""
+        branch_ctx = ctx.model_copy()
+        suffix = f"{self.name}.{agent.name}"
+        branch_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+        return branch_ctx
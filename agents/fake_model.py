@@ -0,0 +1,172 @@
+"""
+Fake Model - Local stand-in for Gemini that answers instantly or with simulated load.
+
+Used to exercise the rate limiter, the batch CLI and benchmarks without an
+API key. It behaves like an overloaded endpoint on request: it answers 429
+RESOURCE_EXHAUSTED when more than server_concurrency calls are in flight or
+its own requests-per-minute budget is spent, and can inject random 429 /
+503 errors and latency.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import AsyncGenerator, Callable, Dict, Optional, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+from pydantic import PrivateAttr
+
+
+_AGENT_NAME_RE = re.compile(r'Your internal name is "([^"]+)"')
+
+# Latency distributions understood by FakeLlm
+LATENCY_DISTRIBUTIONS = ("uniform", "lognormal", "exponential")
+
+
+def request_agent_name(llm_request: LlmRequest) -> str:
+    """
+    Returns the name of the agent that built a request.
+
+    ADK starts every agent's system instruction with its internal name.
+
+    Args:
+        llm_request: Request sent to the model
+
+    Returns:
+        Agent name, or "" if the instruction does not carry one
+    """
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    match = _AGENT_NAME_RE.search(instruction) if isinstance(instruction, str) else None
+    return match.group(1) if match else ""
+
+
+def _error(code: int, status: str, message: str, retry_delay: Optional[float] = None) -> errors.APIError:
+    """Builds the exception google-genai raises for an HTTP error response."""
+    details = []
+    if retry_delay is not None:
+        details.append({"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{retry_delay:.0f}s"})
+    body = {"error": {"code": code, "message": message, "status": status, "details": details}}
+    if code >= 500:
+        return errors.ServerError(code, body)
+    return errors.ClientError(code, body)
+
+
+class FakeLlm(BaseLlm):
+    """
+    Fake model with configurable replies, latency and failure injection.
+
+    reply may be a string or a callable receiving the LlmRequest. When the
+    request asks for JSON (response_mime_type) and reply is a dict or list,
+    it is serialized. A callable may also return a types.FunctionCall,
+    which is answered as a tool call.
+
+    Latency is drawn per call from latency_distribution: "uniform" (latency
+    +/- latency_jitter), "lognormal" (median latency, shape latency_sigma)
+    or "exponential" (mean latency). latency_by_agent overrides the mean
+    for the agents it names.
+    """
+
+    reply: Union[str, dict, list, Callable] = "ACCEPT"
+    latency: float = 0.0  # Mean latency in seconds
+    latency_jitter: float = 0.0  # Uniform +/- jitter in seconds
+    latency_distribution: str = "uniform"
+    latency_sigma: float = 0.5  # Shape of the lognormal distribution
+    latency_by_agent: Dict[str, float] = {}
+    error_rate_429: float = 0.0
+    error_rate_503: float = 0.0
+    server_concurrency: int = 0  # 0 = unlimited
+    server_rpm: float = 0.0  # 0 = unlimited
+    prompt_tokens_per_char: float = 0.25
+    seed: Optional[int] = None
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _in_flight: int = PrivateAttr(default=0)
+    _window: list = PrivateAttr(default_factory=list)
+    _random: random.Random = PrivateAttr(default=None)
+    calls: int = 0
+    rejected: int = 0
+
+    def model_post_init(self, __context):
+        self._random = random.Random(self.seed)
+
+    def _admit(self) -> Optional[errors.APIError]:
+        """Applies the fake server's limits; returns the error to raise, if any."""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            if self.server_rpm:
+                self._window = [t for t in self._window if now - t < 60.0]
+                if len(self._window) >= self.server_rpm:
+                    self.rejected += 1
+                    return _error(429, "RESOURCE_EXHAUSTED", "Quota exceeded (requests per minute)", 60.0 - (now - self._window[0]))
+                self._window.append(now)
+            if self.server_concurrency and self._in_flight >= self.server_concurrency:
+                self.rejected += 1
+                return _error(429, "RESOURCE_EXHAUSTED", "Too many concurrent requests")
+            roll = self._random.random()
+            if roll < self.error_rate_429:
+                self.rejected += 1
+                return _error(429, "RESOURCE_EXHAUSTED", "Injected rate limit")
+            if roll < self.error_rate_429 + self.error_rate_503:
+                self.rejected += 1
+                return _error(503, "UNAVAILABLE", "Injected overload")
+            self._in_flight += 1
+            return None
+
+    def _sample_latency(self, llm_request: LlmRequest) -> float:
+        """Draws one call's latency from the configured distribution."""
+        mean = self.latency_by_agent.get(request_agent_name(llm_request), self.latency) if self.latency_by_agent else self.latency
+        if mean <= 0:
+            return 0.0
+        if self.latency_distribution == "lognormal":
+            return self._random.lognormvariate(math.log(mean), self.latency_sigma)
+        if self.latency_distribution == "exponential":
+            return self._random.expovariate(1.0 / mean)
+        return max(0.0, mean + self._random.uniform(-self.latency_jitter, self.latency_jitter))
+
+    def _reply_part(self, llm_request: LlmRequest) -> types.Part:
+        reply = self.reply(llm_request) if callable(self.reply) else self.reply
+        if isinstance(reply, types.FunctionCall):
+            return types.Part(function_call=reply)
+        if isinstance(reply, (dict, list)):
+            return types.Part(text=json.dumps(reply))
+        return types.Part(text=str(reply))
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        error = self._admit()
+        if error is not None:
+            await asyncio.sleep(0.005)  # Rejections are fast but not free
+            raise error
+        try:
+            delay = self._sample_latency(llm_request)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            part = self._reply_part(llm_request)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        prompt_chars = sum(
+            len(part.text or "")
+            for content in llm_request.contents
+            for part in (content.parts or [])
+        )
+        prompt_tokens = int(prompt_chars * self.prompt_tokens_per_char)
+        reply_chars = len(part.text) if part.text else len(json.dumps(part.function_call.args or {}))
+        completion_tokens = int(reply_chars * self.prompt_tokens_per_char)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=completion_tokens,
+                total_token_count=prompt_tokens + completion_tokens,
+            ),
+        )
@@ -3,14 +3,55 @@ Filter Agent - Filters out spam, rude comments, or simple "thanks" messages.
 
 This agent decides whether a comment is worthy of a response.
 If the comment should be ignored, it outputs "IGNORE".
+
+Obvious cases (emoji-only, link spam, plain questions and thanks) are
+decided by local rules before the model is called; see
+tools/comment_prefilter.py.
 """
 
+from typing import Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
 
+from agents.models import create_model
+from tools.comment_prefilter import get_comment_prefilter
 
-def create_filter_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
+
+def prefilter_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Decides the comment locally when the pre-filter rules are confident.
+    
+    Runs before the FilterAgent. Returning content skips the model call;
+    the decision is written to the same "filter_decision" state key the
+    agent would have written.
+    
+    Args:
+        callback_context: Context of the FilterAgent invocation
+    
+    Returns:
+        Content with "IGNORE" or "ACCEPT", or None to let the model decide
+    """
+    user_content = callback_context.user_content
+    if not user_content or not user_content.parts:
+        return None
+    comment = "".join(part.text or "" for part in user_content.parts)
+    result = get_comment_prefilter().decide(comment)
+    if result is None:
+        callback_context.state["filter_source"] = "model"
+        return None
+    callback_context.state["filter_decision"] = result.decision
+    callback_context.state["filter_source"] = "prefilter"
+    callback_context.state["prefilter_result"] = result.to_dict()
+    return types.Content(role="model", parts=[types.Part(text=result.decision)])
+
+
+def create_filter_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
     """
     Creates the Filter Agent that checks if a comment is worthy of response.
     
@@ -20,18 +61,18 @@ def create_filter_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
     - Reject simple "thanks" or "great video" without substance
     - Accept meaningful questions or praise
     
+    Comments the local pre-filter is confident about never reach the model.
+    
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
     
     Returns:
         Configured LlmAgent for filtering comments
     """
     filter_agent = LlmAgent(
         name="FilterAgent",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
+        model=model or create_model(retry_config),
         instruction="""You are a comment filter for a YouTube channel.
         
         Your job is to decide if a comment is worthy of a response.
@@ -54,7 +95,8 @@ def create_filter_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
         - ACCEPT praise comments - even simple ones like "thanks" or "great video" deserve a response
         - Only reject clearly spam/rude/inappropriate comments
         """,
-        output_key="filter_decision"  # Store decision in session state
+        output_key="filter_decision",  # Store decision in session state
+        before_agent_callback=prefilter_callback  # Skip the model for obvious comments
     )
     
     return filter_agent
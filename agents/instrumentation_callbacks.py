@@ -0,0 +1,267 @@
+"""
+Instrumentation Callbacks - Per-agent latency, token and tool-call metrics and traces.
+
+apply_instrumentation() walks an agent graph and adds agent, model and
+tool callbacks to every agent (after any they already have). For each
+comment they record, under one correlation id:
+
+- every agent run (CommentResponderCoordinator, ClassifierAgent or
+  FilterAgent / RouterAgent, AdaptiveResearch, ParallelResearch,
+  SynthesisStage, SynthesisAgent, the responders, ...): wall time
+- every model call: time queued in the rate limiter, model time,
+  throttle retries and tokens in and out
+- every tool call: latency and status
+
+Durations go into per-stage histograms and counters in the process-wide
+registry (tools/metrics.py, exported as Prometheus text) and every span
+is appended to the JSONL trace log. The correlation id is the session's
+"correlation_id" state value when the caller sets one (respond-batch uses
+the comment id), and the invocation id otherwise.
+
+Agents whose own before-callbacks answer for them (a search cache hit, a
+pre-filter decision) skip these callbacks too and are not timed; their
+state records where the answer came from.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from agents.models import estimate_request_tokens
+from agents.token_budget_callbacks import add_callback, response_tokens
+from tools.metrics import get_metrics, get_trace_log
+
+
+logger = logging.getLogger(__name__)
+
+# Open spans, by (invocation id, branch, agent name) or tool call id
+_open_agents: Dict[Tuple[str, str, str], Dict] = {}
+_open_models: Dict[Tuple[str, str, str], Dict] = {}
+_open_tools: Dict[str, Dict] = {}
+_spans_lock = threading.Lock()
+
+
+def _metrics():
+    registry = get_metrics()
+    return {
+        "stage_seconds": registry.histogram(
+            "stage_seconds", "Wall time of one agent run.", ["stage"]),
+        "stage_runs": registry.counter(
+            "stage_runs_total", "Agent runs.", ["stage"]),
+        "model_seconds": registry.histogram(
+            "model_seconds", "Model call time with throttle retries, excluding rate-limiter queueing.", ["agent"]),
+        "model_queue_seconds": registry.histogram(
+            "model_queue_seconds", "Time a model call waited in the rate limiter.", ["agent"]),
+        "model_calls": registry.counter(
+            "model_calls_total", "Model calls by outcome.", ["agent", "status"]),
+        "model_retries": registry.counter(
+            "model_retries_total", "Model calls retried after 429 / 503.", ["agent"]),
+        "tokens": registry.counter(
+            "tokens_total", "Model tokens, in (prompt) and out (response).", ["agent", "direction"]),
+        "tool_seconds": registry.histogram(
+            "tool_seconds", "Tool call latency.", ["tool"]),
+        "tool_calls": registry.counter(
+            "tool_calls_total", "Tool calls by outcome.", ["tool", "status"]),
+    }
+
+
+def _span_key(callback_context: CallbackContext) -> Tuple[str, str, str]:
+    branch = callback_context.get_invocation_context().branch or ""
+    return callback_context.invocation_id, branch, callback_context.agent_name
+
+
+def _correlation_id(callback_context: CallbackContext) -> str:
+    return str(callback_context.state.get("correlation_id") or callback_context.invocation_id)
+
+
+def _write_span(kind: str, name: str, key: Tuple[str, str, str], opened: Dict, duration: float, **fields: Any):
+    get_trace_log().write({
+        "correlation_id": opened["correlation_id"],
+        "invocation_id": key[0],
+        "branch": key[1],
+        "agent": key[2],
+        "span": kind,
+        "name": name,
+        "start": opened["start"],
+        "duration_ms": round(duration * 1000, 2),
+        **fields,
+    })
+
+
+def start_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Before-agent callback: opens the agent's span."""
+    with _spans_lock:
+        _open_agents[_span_key(callback_context)] = {
+            "correlation_id": _correlation_id(callback_context),
+            "start": time.time(),
+            "started": time.perf_counter(),
+        }
+    return None
+
+
+def end_agent_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """After-agent callback: records the agent's wall time."""
+    key = _span_key(callback_context)
+    with _spans_lock:
+        opened = _open_agents.pop(key, None)
+        _open_models.pop(key, None)  # A model call cut short by cancellation
+    if opened is None:
+        return None
+    duration = time.perf_counter() - opened["started"]
+    metrics = _metrics()
+    metrics["stage_seconds"].observe(duration, stage=key[2])
+    metrics["stage_runs"].inc(stage=key[2])
+    _write_span("agent", key[2], key, opened, duration)
+    return None
+
+
+def start_model_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Before-model callback: opens the model call's span."""
+    with _spans_lock:
+        _open_models[_span_key(callback_context)] = {
+            "correlation_id": _correlation_id(callback_context),
+            "start": time.time(),
+            "started": time.perf_counter(),
+            "estimated_in": estimate_request_tokens(llm_request),
+        }
+    return None
+
+
+def end_model_callback(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """After-model callback: records queue time, model time, retries and tokens."""
+    if llm_response.partial:
+        return None  # Recorded once, on the final chunk
+    key = _span_key(callback_context)
+    with _spans_lock:
+        opened = _open_models.pop(key, None)
+    if opened is None:
+        return None
+    duration = time.perf_counter() - opened["started"]
+    limiter = (llm_response.custom_metadata or {}).get("rate_limiter", {})
+    queued = min(duration, float(limiter.get("queue_seconds", 0.0)))
+    retries = int(limiter.get("retries", 0))
+    tokens_in, tokens_out, source = response_tokens(llm_response, opened["estimated_in"])
+    status = "error" if llm_response.error_code else "ok"
+
+    agent_name = key[2]
+    metrics = _metrics()
+    metrics["model_seconds"].observe(duration - queued, agent=agent_name)
+    metrics["model_queue_seconds"].observe(queued, agent=agent_name)
+    metrics["model_calls"].inc(agent=agent_name, status=status)
+    if retries:
+        metrics["model_retries"].inc(retries, agent=agent_name)
+    metrics["tokens"].inc(tokens_in, agent=agent_name, direction="in")
+    metrics["tokens"].inc(tokens_out, agent=agent_name, direction="out")
+    _write_span(
+        "model", agent_name, key, opened, duration,
+        status=status,
+        queue_ms=round(queued * 1000, 2),
+        retries=retries,
+        tokens_in=tokens_in,
+        tokens_out=tokens_out,
+        token_source=source,
+    )
+    return None
+
+
+def model_error_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+    error: Exception,
+) -> Optional[LlmResponse]:
+    """Model-error callback: records the failed call (the error still propagates)."""
+    key = _span_key(callback_context)
+    with _spans_lock:
+        opened = _open_models.pop(key, None)
+    if opened is None:
+        return None
+    duration = time.perf_counter() - opened["started"]
+    metrics = _metrics()
+    metrics["model_seconds"].observe(duration, agent=key[2])
+    metrics["model_calls"].inc(agent=key[2], status="error")
+    _write_span("model", key[2], key, opened, duration, status="error", error=f"{type(error).__name__}: {error}")
+    return None
+
+
+def _tool_key(tool_context: ToolContext) -> str:
+    return tool_context.function_call_id or f"{tool_context.invocation_id}:{tool_context.agent_name}"
+
+
+def start_tool_callback(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict]:
+    """Before-tool callback: opens the tool call's span."""
+    branch = tool_context.get_invocation_context().branch or ""
+    with _spans_lock:
+        _open_tools[_tool_key(tool_context)] = {
+            "correlation_id": str(tool_context.state.get("correlation_id") or tool_context.invocation_id),
+            "start": time.time(),
+            "started": time.perf_counter(),
+            "key": (tool_context.invocation_id, branch, tool_context.agent_name),
+        }
+    return None
+
+
+def _end_tool(tool: BaseTool, tool_context: ToolContext, status: str, **fields: Any):
+    with _spans_lock:
+        opened = _open_tools.pop(_tool_key(tool_context), None)
+    if opened is None:
+        return
+    duration = time.perf_counter() - opened["started"]
+    metrics = _metrics()
+    metrics["tool_seconds"].observe(duration, tool=tool.name)
+    metrics["tool_calls"].inc(tool=tool.name, status=status)
+    _write_span("tool", tool.name, opened["key"], opened, duration, status=status, **fields)
+
+
+def end_tool_callback(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: ToolContext,
+    tool_response: Dict,
+) -> Optional[Dict]:
+    """After-tool callback: records the tool's latency."""
+    status = tool_response.get("status", "ok") if isinstance(tool_response, dict) else "ok"
+    _end_tool(tool, tool_context, status)
+    return None
+
+
+def tool_error_callback(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: ToolContext,
+    error: Exception,
+) -> Optional[Dict]:
+    """Tool-error callback: records the failed call (the error still propagates)."""
+    _end_tool(tool, tool_context, "exception", error=f"{type(error).__name__}: {error}")
+    return None
+
+
+def apply_instrumentation(agent: BaseAgent) -> BaseAgent:
+    """
+    Adds the instrumentation callbacks to an agent and all its sub-agents.
+
+    Args:
+        agent: Root of the agent graph
+
+    Returns:
+        The same agent, for chaining
+    """
+    add_callback(agent, "before_agent_callback", start_agent_callback)
+    add_callback(agent, "after_agent_callback", end_agent_callback)
+    if isinstance(agent, LlmAgent):
+        add_callback(agent, "before_model_callback", start_model_callback)
+        add_callback(agent, "after_model_callback", end_model_callback)
+        add_callback(agent, "on_model_error_callback", model_error_callback)
+        add_callback(agent, "before_tool_callback", start_tool_callback)
+        add_callback(agent, "after_tool_callback", end_tool_callback)
+        add_callback(agent, "on_tool_error_callback", tool_error_callback)
+    for sub_agent in agent.sub_agents:
+        apply_instrumentation(sub_agent)
+    return agent
@@ -0,0 +1,206 @@
+"""
+Models - The Gemini model shared by all agents.
+
+Every agent used to construct its own Gemini instance, and each instance
+opens its own API client and HTTP connection pool. create_model() builds
+one instance that the agent factories share, so the whole graph reuses a
+single client and its warm connections. get_shared_model() returns the
+same instance for the same retry configuration across the process.
+
+The shared model is wrapped in RateLimitedLlm, which sends every call
+through the process-wide rate limiter (agents/rate_limiter.py) and retries
+429 / 503 answers itself, with jittered backoff and an adaptive
+concurrency limit, instead of leaving them to per-request HTTP retries.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from typing import AsyncGenerator, Dict, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import errors, types
+
+from agents.rate_limiter import BACKOFF_CAP, RateLimiter, backoff_delay, get_rate_limiter
+from tools.token_budget import count_tokens
+
+
+# Model used by every agent in the system
+DEFAULT_MODEL = "gemini-2.5-flash-lite"
+
+
+def create_model(retry_config: types.HttpRetryOptions, model_name: str = DEFAULT_MODEL) -> Gemini:
+    """
+    Creates a Gemini model to share between agents.
+
+    Args:
+        retry_config: HTTP retry configuration for API calls
+        model_name: Gemini model to call
+
+    Returns:
+        Gemini model instance (its API client is created on first use and reused)
+    """
+    return Gemini(
+        model=model_name,
+        retry_options=retry_config
+    )
+
+
+# HTTP statuses that mean "slow down" rather than "broken request"
+THROTTLE_STATUS_CODES = (429, 503)
+
+# Attempts per call when the API keeps answering 429 / 503
+MAX_THROTTLE_ATTEMPTS = 6
+
+_RETRY_DELAY_RE = re.compile(r"^(\d+(?:\.\d+)?)s$")
+
+
+def estimate_request_tokens(llm_request: LlmRequest) -> int:
+    """
+    Estimates the token count of a request with the local tokenizer.
+
+    Args:
+        llm_request: Request about to be sent
+
+    Returns:
+        Approximate prompt token count (at least 1)
+    """
+    tokens = 0
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            tokens += count_tokens(part.text or "")
+            if part.function_call:
+                tokens += count_tokens(str(part.function_call.args or {}))
+            if part.function_response:
+                tokens += count_tokens(str(part.function_response.response or {}))
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if isinstance(instruction, str):
+        tokens += count_tokens(instruction)
+    return max(1, tokens)
+
+
+def server_retry_delay(error: errors.APIError) -> Optional[float]:
+    """
+    Extracts the server's retryDelay hint from a 429 response, if present.
+
+    Args:
+        error: API error raised by the client
+
+    Returns:
+        Delay in seconds, or None
+    """
+    details = getattr(error, "details", None)
+    if not isinstance(details, dict):
+        return None
+    for detail in details.get("error", {}).get("details", []) or []:
+        match = _RETRY_DELAY_RE.match(str(detail.get("retryDelay", "")))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class RateLimitedLlm(BaseLlm):
+    """
+    Wraps a model so every call passes through a shared RateLimiter.
+
+    Throttled calls (429 / 503) shrink the limiter's concurrency and are
+    retried here with full-jitter backoff, capped at BACKOFF_CAP seconds
+    (or the server's retryDelay, if longer but still capped).
+    """
+
+    inner: BaseLlm
+    limiter: RateLimiter
+    max_attempts: int = MAX_THROTTLE_ATTEMPTS
+
+    @property
+    def capabilities(self):
+        return self.inner.capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        estimated = estimate_request_tokens(llm_request)
+        attempt = 0
+        queued = 0.0
+        while True:
+            wait_started = time.monotonic()
+            await self.limiter.acquire(estimated)
+            started = time.monotonic()
+            queued += started - wait_started
+            released = False
+            yielded = False
+            used_tokens = 0
+            try:
+                async for response in self.inner.generate_content_async(llm_request, stream):
+                    if response.usage_metadata and response.usage_metadata.total_token_count:
+                        used_tokens = response.usage_metadata.total_token_count
+                    # Per-call limiter figures, read by the instrumentation callbacks
+                    response.custom_metadata = {
+                        **(response.custom_metadata or {}),
+                        "rate_limiter": {"queue_seconds": round(queued, 4), "retries": attempt},
+                    }
+                    yielded = True
+                    yield response
+                released = True
+                self.limiter.release(
+                    time.monotonic() - started,
+                    token_correction=(estimated - used_tokens) if used_tokens else 0,
+                )
+                return
+            except errors.APIError as e:
+                throttled = e.code in THROTTLE_STATUS_CODES
+                released = True
+                # A rejected attempt used no tokens (or only what the server
+                # reported), so its estimate goes back to the TPM bucket;
+                # otherwise a burst of retries drains it for later calls
+                self.limiter.release(
+                    time.monotonic() - started,
+                    throttled=throttled,
+                    succeeded=False,
+                    token_correction=estimated - used_tokens,
+                )
+                # A partially streamed answer cannot be replayed
+                if not throttled or yielded or attempt + 1 >= self.max_attempts:
+                    raise
+                delay = backoff_delay(attempt)
+                hint = server_retry_delay(e)
+                if hint is not None:
+                    delay = min(BACKOFF_CAP, max(delay, hint))
+                self.limiter.record_retry()
+                attempt += 1
+                await asyncio.sleep(delay)
+            finally:
+                if not released:
+                    # Cancelled, or the consumer stopped reading early
+                    self.limiter.release(time.monotonic() - started, succeeded=False)
+
+
+_shared_models: Dict[Tuple[str, str], BaseLlm] = {}
+_shared_models_lock = threading.Lock()
+
+
+def get_shared_model(retry_config: types.HttpRetryOptions, model_name: str = DEFAULT_MODEL) -> BaseLlm:
+    """
+    Returns the process-wide model for a retry configuration, creating it once.
+
+    Args:
+        retry_config: HTTP retry configuration for API calls
+        model_name: Gemini model to call
+
+    Returns:
+        Shared Gemini model behind the process-wide rate limiter
+    """
+    key = (retry_config.model_dump_json(), model_name)
+    with _shared_models_lock:
+        model = _shared_models.get(key)
+        if model is None:
+            model = _shared_models[key] = RateLimitedLlm(
+                model=model_name,
+                inner=create_model(retry_config, model_name),
+                limiter=get_rate_limiter(),
+            )
+        return model
@@ -1,46 +1,30 @@
 """
 Praise Responder Agent - Generates thank-you responses for praise comments.
 
-This agent uses the gold_standard.json file to learn the response style
-and generates appropriate thank-you messages.
+This agent learns the response style from the gold examples and generates
+appropriate thank-you messages. Only the examples closest to the incoming
+comment are put in the prompt (see tools/style_examples.py).
 """
 
-import json
-import os
+from typing import Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
 
-
-def load_gold_standard() -> str:
-    """
-    Loads the gold standard responses from JSON file.
-    
-    Returns:
-        Formatted string of example responses for the agent to learn from
-    """
-    try:
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        gold_standard_path = os.path.join(current_dir, "data", "gold_standard.json")
-        
-        with open(gold_standard_path, "r", encoding="utf-8") as f:
-            gold_data = json.load(f)
-        
-        # Format examples for the agent
-        examples = []
-        for item in gold_data:
-            examples.append(f"Comment: {item['input_comment']}\nReply: {item['your_response']}")
-        
-        return "\n\n".join(examples)
-    except Exception as e:
-        return f"Error loading gold standard: {str(e)}"
+from agents.models import create_model
+from tools.style_examples import EXAMPLES_PLACEHOLDER, style_instruction
 
 
-def create_praise_responder_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
+def create_praise_responder_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
     """
     Creates the Praise Responder Agent that generates thank-you responses.
     
-    The agent learns from gold_standard.json to match the channel's response style:
+    The agent learns from the gold examples nearest to each comment to match
+    the channel's response style:
     - Friendly and casual tone
     - Mix of Hindi and English (Hinglish)
     - Appreciative and warm
@@ -48,23 +32,18 @@ def create_praise_responder_agent(retry_config: types.HttpRetryOptions) -> LlmAg
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
     
     Returns:
         Configured LlmAgent for responding to praise
     """
-    # Load style examples
-    style_examples = load_gold_standard()
-    
     praise_agent = LlmAgent(
         name="PraiseResponderAgent",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
-        instruction=f"""You are a YouTube channel comment responder. Your job is to write thank-you responses to praise comments.
+        model=model or create_model(retry_config),
+        instruction=style_instruction("""You are a YouTube channel comment responder. Your job is to write thank-you responses to praise comments.
 
-STYLE GUIDE (learn from these examples - this is YOUR ACTUAL RESPONSE STYLE):
-{style_examples}
+STYLE GUIDE (learn from these examples of your replies to similar comments - this is YOUR ACTUAL RESPONSE STYLE):
+""" + EXAMPLES_PLACEHOLDER + """
 
 CRITICAL STYLE RULES (match the examples above exactly):
 1. Use Hinglish (mix of Hindi and English) naturally - like the examples show
@@ -89,7 +68,7 @@ TASK:
 - Match their energy level
 
 Output ONLY your response - no explanations or meta-commentary.
-        """,
+        """),  # Adds the style examples nearest to each comment
         output_key="praise_response"  # Store response in session state
     )
     
@@ -1,70 +1,48 @@
 """
 Question Responder Agent - Generates final answers to questions.
 
-This agent uses the synthesized information and gold_standard.json style
-to write the final response to the user's question.
+This agent uses the synthesized information and the gold examples' style
+to write the final response to the user's question. Only the examples
+closest to the question are put in the prompt (see tools/style_examples.py).
 """
 
-import json
-import os
+from typing import Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
 
-
-def load_gold_standard() -> str:
-    """
-    Loads the gold standard responses from JSON file.
-    
-    Returns:
-        Formatted string of example responses for the agent to learn from
-    """
-    try:
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        gold_standard_path = os.path.join(current_dir, "data", "gold_standard.json")
-        
-        with open(gold_standard_path, "r", encoding="utf-8") as f:
-            gold_data = json.load(f)
-        
-        # Format examples for the agent
-        examples = []
-        for item in gold_data:
-            examples.append(f"Comment: {item['input_comment']}\nReply: {item['your_response']}")
-        
-        return "\n\n".join(examples)
-    except Exception as e:
-        return f"Error loading gold standard: {str(e)}"
+from agents.models import create_model
+from tools.style_examples import EXAMPLES_PLACEHOLDER, style_instruction
 
 
-def create_question_responder_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
+def create_question_responder_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
     """
     Creates the Question Responder Agent that writes final answers.
     
     This agent:
     - Uses synthesized information from SynthesisAgent
-    - Matches the style from gold_standard.json
+    - Matches the style of the gold examples nearest to the question
     - Writes a helpful, accurate answer
     - Admits when information is not available
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
     
     Returns:
         Configured LlmAgent for answering questions
     """
-    # Load style examples
-    style_examples = load_gold_standard()
-    
     question_agent = LlmAgent(
         name="QuestionResponderAgent",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
-        instruction=f"""You are a YouTube channel comment responder. Your job is to answer user questions.
+        model=model or create_model(retry_config),
+        instruction=style_instruction("""You are a YouTube channel comment responder. Your job is to answer user questions.
 
-STYLE GUIDE (learn from these examples - this is YOUR ACTUAL RESPONSE STYLE):
-{style_examples}
+STYLE GUIDE (learn from these examples of your replies to similar comments - this is YOUR ACTUAL RESPONSE STYLE):
+""" + EXAMPLES_PLACEHOLDER + """
 
 CRITICAL STYLE RULES (match the examples above exactly):
 1. Use Hinglish (mix of Hindi and English) naturally - like the examples show
@@ -82,7 +60,7 @@ EXAMPLES OF GOOD QUESTION RESPONSES (in your style):
 - "Sir can a student do BTech then mtech and then mba" → "yes it is possible!"
 
 CRITICAL ACCURACY RULES:
-1. You will receive synthesized information: {{synthesized_info}}
+1. You will receive synthesized information: {synthesized_info}
 2. You will receive the original user question
 3. ONLY use information from the synthesized_info - do NOT make up facts
 4. If the synthesized_info doesn't contain the answer, you MUST say: "Yar, iske baare mein mere paas zyada info nahi hai videos mein. Thoda clarify kar sakte ho kya exactly chahiye?"
@@ -97,7 +75,7 @@ TASK:
 - Keep it conversational and personal
 
 Output ONLY your response - no explanations or meta-commentary.
-        """,
+        """),  # Adds the style examples nearest to each comment
         output_key="final_response"  # Store final response in session state
     )
     
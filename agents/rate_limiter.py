@@ -0,0 +1,327 @@
+"""
+Rate Limiter - Process-wide client-side throttling for model calls.
+
+With many comments in flight, every agent request used to retry 429s on
+its own with exponential backoff (exp_base=7), so a burst of rate-limit
+errors turned into a storm of retries waiting up to minutes each. Instead,
+every model call now goes through one shared limiter:
+
+- token buckets for requests per minute and tokens per minute, so calls
+  wait locally instead of being rejected by the API
+- an AIMD concurrency limit: +1 slot per window of successful calls,
+  halved (at most once per cooldown) when the API answers 429 / 503
+- full-jitter exponential backoff, capped, for the retries themselves
+  (honoring the server's retryDelay hint when it sends one)
+- metrics separating time spent queued in the limiter from model time
+
+The limiter keeps its state behind a threading lock and wakes waiters with
+call_soon_threadsafe, so one instance can serve several event loops (adk
+web, batch runs and scripts in the same process).
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+# Defaults, overridable per process through the environment
+DEFAULT_REQUESTS_PER_MINUTE = float(os.environ.get("GEMINI_RPM", "60"))
+DEFAULT_TOKENS_PER_MINUTE = float(os.environ.get("GEMINI_TPM", "250000"))
+DEFAULT_INITIAL_CONCURRENCY = int(os.environ.get("GEMINI_INITIAL_CONCURRENCY", "4"))
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "32"))
+
+# Backoff for throttled calls (seconds)
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+# Minimum time between two multiplicative decreases of the concurrency limit
+DECREASE_COOLDOWN = 2.0
+
+# Samples kept per metric for percentiles
+METRIC_SAMPLES = 2048
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """
+    Computes a full-jitter exponential backoff delay.
+
+    Args:
+        attempt: Zero-based retry number
+        base: Delay scale of the first retry
+        cap: Upper bound of any delay
+
+    Returns:
+        Delay in seconds, uniform in [0, min(cap, base * 2^attempt)]
+    """
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    take() reserves capacity immediately (the level may go negative) and
+    returns how long the caller must wait before using it, so waiters are
+    served in arrival order without holding any lock while they sleep.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, amount: float = 1.0) -> float:
+        """
+        Reserves capacity.
+
+        Args:
+            amount: Units to reserve (requests or tokens)
+
+        Returns:
+            Seconds to wait before the reservation is covered
+        """
+        if self.rate <= 0:
+            return 0.0
+        # A single request larger than the bucket could never be covered
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level -= amount
+            return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def give_back(self, amount: float):
+        """
+        Returns (or, if negative, additionally takes) capacity after the fact.
+
+        Args:
+            amount: Units to return; negative to charge more
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.level = min(self.capacity, self.level + amount)
+
+
+class AimdConcurrencyLimiter:
+    """Concurrency limit with additive increase and multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_CONCURRENCY,
+        minimum: int = 1,
+        maximum: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(self.maximum, max(self.minimum, initial)))
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        """Waits for a free concurrency slot and takes it."""
+        with self._lock:
+            if self.in_flight < int(self.limit) and not self._waiters:
+                self.in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, future))
+                except ValueError:
+                    # Already handed a slot just before cancellation
+                    self._release_locked()
+            raise
+
+    def release(self, throttled: bool = False, succeeded: bool = True):
+        """
+        Frees a slot and adapts the limit.
+
+        Args:
+            throttled: The call was rejected with 429 / 503
+            succeeded: The call completed normally
+        """
+        with self._lock:
+            if throttled:
+                now = time.monotonic()
+                if now - self.last_decrease >= DECREASE_COOLDOWN:
+                    self.limit = max(float(self.minimum), self.limit / 2.0)
+                    self.last_decrease = now
+            elif succeeded:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            self._release_locked()
+
+    def _release_locked(self):
+        """Frees a slot and hands free slots to waiters (lock must be held)."""
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            loop, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.in_flight += 1
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future):
+    """Completes a waiter's future unless it was cancelled meanwhile."""
+    if not future.done():
+        future.set_result(None)
+
+
+class LatencyMetric:
+    """Count, total and recent samples of a duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=METRIC_SAMPLES)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def snapshot(self) -> Dict[str, float]:
+        ordered: List[float] = sorted(self.samples)
+
+        def percentile(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        }
+
+
+class RateLimiter:
+    """Requests/tokens-per-minute buckets plus AIMD concurrency, with metrics."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        initial_concurrency: int = DEFAULT_INITIAL_CONCURRENCY,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AimdConcurrencyLimiter(initial_concurrency, 1, max_concurrency)
+        self.queue_wait = LatencyMetric()
+        self.model_time = LatencyMetric()
+        self.counters = {"calls": 0, "succeeded": 0, "throttled": 0, "retries": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """
+        Waits until a call may start.
+
+        Args:
+            estimated_tokens: Token estimate of the request, charged to the TPM bucket
+
+        Returns:
+            Seconds spent waiting
+        """
+        started = time.monotonic()
+        await self.concurrency.acquire()
+        try:
+            delay = max(self.requests.take(1), self.tokens.take(estimated_tokens))
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self.concurrency.release(succeeded=False)
+            raise
+        waited = time.monotonic() - started
+        with self._lock:
+            self.counters["calls"] += 1
+            self.queue_wait.observe(waited)
+        return waited
+
+    def release(
+        self,
+        model_seconds: float,
+        throttled: bool = False,
+        succeeded: bool = True,
+        token_correction: int = 0,
+    ):
+        """
+        Records the end of a call and frees its slot.
+
+        Args:
+            model_seconds: Time spent inside the model call
+            throttled: The call was rejected with 429 / 503
+            succeeded: The call completed normally
+            token_correction: Estimated minus actual tokens (returned to the TPM bucket)
+        """
+        if token_correction:
+            self.tokens.give_back(token_correction)
+        self.concurrency.release(throttled=throttled, succeeded=succeeded)
+        with self._lock:
+            self.model_time.observe(model_seconds)
+            if throttled:
+                self.counters["throttled"] += 1
+            elif succeeded:
+                self.counters["succeeded"] += 1
+            else:
+                self.counters["failed"] += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.counters["retries"] += 1
+
+    def snapshot(self) -> Dict:
+        """
+        Returns the limiter's counters and timing metrics.
+
+        Returns:
+            Dictionary with counters, the current concurrency limit and
+            in-flight count, and queue_wait / model_time statistics (seconds)
+        """
+        with self._lock:
+            return {
+                **self.counters,
+                "concurrency_limit": int(self.concurrency.limit),
+                "in_flight": self.concurrency.in_flight,
+                "queue_wait": self.queue_wait.snapshot(),
+                "model_time": self.model_time.snapshot(),
+            }
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide rate limiter shared by all agents.
+
+    Returns:
+        RateLimiter configured from GEMINI_RPM, GEMINI_TPM,
+        GEMINI_INITIAL_CONCURRENCY and GEMINI_MAX_CONCURRENCY
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
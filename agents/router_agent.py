@@ -3,14 +3,80 @@ Router Agent - Routes accepted comments to either "Question" or "Praise" handler
 
 This agent analyzes the comment and decides if it's a question that needs answering
 or praise that needs acknowledgment.
+
+A local classifier (tools/intent_classifier.py) answers first; the model
+is only called when the classifier is not confident. Model decisions are
+logged so the classifier can learn from them.
 """
 
+from typing import Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
 
+from agents.models import create_model
+from tools.intent_classifier import LABELS, get_intent_classifier, log_decision
+
+
+def _comment_text(callback_context: CallbackContext) -> str:
+    """Returns the text of the comment being routed."""
+    user_content = callback_context.user_content
+    if not user_content or not user_content.parts:
+        return ""
+    return "".join(part.text or "" for part in user_content.parts)
+
+
+def local_router_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Routes the comment locally when the intent classifier is validated and confident.
+    
+    Args:
+        callback_context: Context of the RouterAgent invocation
+    
+    Returns:
+        Content with "Question" or "Praise", or None to let the model decide
+    """
+    comment = _comment_text(callback_context)
+    if not comment:
+        return None
+    decision = get_intent_classifier().decide(comment)
+    if decision is None:
+        callback_context.state["router_source"] = "model"
+        return None
+    comment_type, confidence = decision
+    callback_context.state["comment_type"] = comment_type
+    callback_context.state["router_source"] = "local"
+    callback_context.state["router_confidence"] = round(confidence, 3)
+    log_decision(comment, comment_type, "local")
+    return types.Content(role="model", parts=[types.Part(text=comment_type)])
+
 
-def create_router_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
+def log_router_decision_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Logs the model's routing decision as training data for the local classifier.
+    
+    Args:
+        callback_context: Context of the RouterAgent invocation
+    
+    Returns:
+        None (the agent's output is left unchanged)
+    """
+    if callback_context.state.get("router_source") != "model":
+        return None
+    raw = str(callback_context.state.get("comment_type") or "").strip().strip("\"'`.*").strip()
+    comment_type = next((label for label in LABELS if label.lower() == raw.lower()), None)
+    comment = _comment_text(callback_context)
+    if comment_type and comment:
+        log_decision(comment, comment_type, "model")
+    return None
+
+
+def create_router_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
     """
     Creates the Router Agent that categorizes comments as "Question" or "Praise".
     
@@ -18,18 +84,18 @@ def create_router_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
     - If it's a question (needs information/answer) → "Question"
     - If it's praise/feedback (needs acknowledgment) → "Praise"
     
+    Confident local predictions skip the model call.
+    
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
     
     Returns:
         Configured LlmAgent for routing comments
     """
     router_agent = LlmAgent(
         name="RouterAgent",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
+        model=model or create_model(retry_config),
         instruction="""You are a comment router for a YouTube channel.
         
         Your job is to categorize comments into two types:
@@ -50,7 +116,9 @@ def create_router_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
         - If a comment has both praise AND a question, output "Question"
         - Be decisive - choose the primary intent of the comment
         """,
-        output_key="comment_type"  # Store type in session state
+        output_key="comment_type",  # Store type in session state
+        before_agent_callback=local_router_callback,  # Skip the model when the local classifier is sure
+        after_agent_callback=log_router_decision_callback  # Log model decisions for retraining
     )
     
     return router_agent
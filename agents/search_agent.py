@@ -3,15 +3,134 @@ Search Agent - Uses Google Search to find information for answering questions.
 
 This agent searches the web for current information that might help answer
 the user's question.
+
+Findings are memoized per normalized question (tools/search_cache.py), so a
+repeat question skips the search. In stale-while-revalidate mode an aged
+entry is served at once and refreshed in the background.
 """
 
-from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+import asyncio
+import logging
+import uuid
+from typing import Optional, Set
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import InMemoryRunner
 from google.adk.tools import google_search
 from google.genai import types
 
+from agents.models import create_model
+from tools.search_cache import get_search_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Session state flag that makes the SearchAgent ignore cached findings
+SEARCH_CACHE_BYPASS = "search_cache_bypass"
+
+_refreshing: Set[str] = set()
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
+def _question_text(callback_context: CallbackContext) -> str:
+    """Returns the text of the question being researched."""
+    user_content = callback_context.user_content
+    if not user_content or not user_content.parts:
+        return ""
+    return "".join(part.text or "" for part in user_content.parts)
+
+
+async def refresh_search_results(agent: BaseAgent, question: str):
+    """
+    Re-runs a search for a question in a private session, updating the cache.
+    
+    Args:
+        agent: The SearchAgent (its after-callback stores the new findings)
+        question: Question to research
+    """
+    runner = InMemoryRunner(agent=agent, app_name="SearchRefresh")
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name,
+        user_id="search_refresh",
+        session_id=uuid.uuid4().hex,
+        state={SEARCH_CACHE_BYPASS: True},
+    )
+    message = types.Content(role="user", parts=[types.Part(text=question)])
+    async for _ in runner.run_async(user_id=session.user_id, session_id=session.id, new_message=message):
+        pass
+
+
+def _schedule_refresh(agent: BaseAgent, question: str):
+    """Starts one background refresh per question on the running loop."""
+    key = question.strip().lower()
+    if key in _refreshing:
+        return
+    _refreshing.add(key)
+
+    async def refresh():
+        try:
+            await refresh_search_results(agent, question)
+        except Exception:
+            logger.warning("Background search refresh failed", exc_info=True)
+        finally:
+            _refreshing.discard(key)
+
+    task = asyncio.get_running_loop().create_task(refresh())
+    # Keep a reference so the task is not garbage-collected mid-flight
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+
+def cached_search_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Answers from the search cache when the question was researched recently.
+    
+    Args:
+        callback_context: Context of the SearchAgent invocation
+    
+    Returns:
+        Content with the cached findings, or None to run the search
+    """
+    question = _question_text(callback_context)
+    if not question or callback_context.state.get(SEARCH_CACHE_BYPASS):
+        callback_context.state["search_source"] = "model"
+        return None
+    cached = get_search_cache().lookup(question)
+    if cached is None:
+        callback_context.state["search_source"] = "model"
+        return None
+    if cached["stale"]:
+        _schedule_refresh(callback_context.get_invocation_context().agent, question)
+    callback_context.state["search_results"] = cached["results"]
+    callback_context.state["search_source"] = "cache_stale" if cached["stale"] else "cache"
+    return types.Content(role="model", parts=[types.Part(text=cached["results"])])
+
+
+def store_search_results_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Stores the findings of a real search in the search cache.
+    
+    Args:
+        callback_context: Context of the SearchAgent invocation
+    
+    Returns:
+        None (the agent's output is left unchanged)
+    """
+    if callback_context.state.get("search_source") != "model":
+        return None
+    question = _question_text(callback_context)
+    results = callback_context.state.get("search_results")
+    if question and isinstance(results, str):
+        get_search_cache().store(question, results)
+    return None
+
 
-def create_search_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
+def create_search_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
     """
     Creates the Search Agent that uses Google Search to find information.
     
@@ -22,16 +141,14 @@ def create_search_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
     
     Returns:
         Configured LlmAgent with Google Search capability
     """
     search_agent = LlmAgent(
         name="SearchAgent",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
+        model=model or create_model(retry_config),
         instruction="""You are a research agent that uses Google Search to find information.
 
 Your job:
@@ -49,7 +166,9 @@ IMPORTANT:
 Output your findings in a clear, structured format.
         """,
         tools=[google_search],  # Enable Google Search tool
-        output_key="search_results"  # Store results in session state
+        output_key="search_results",  # Store results in session state
+        before_agent_callback=cached_search_callback,  # Reuse findings for repeat questions
+        after_agent_callback=store_search_results_callback  # Memoize new findings
     )
     
     return search_agent
@@ -5,12 +5,19 @@ This agent takes results from both SearchAgent and TranscriptAgent and
 synthesizes them into a coherent information base for answering questions.
 """
 
+from typing import Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
 
+from agents.models import create_model
+
 
-def create_synthesis_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
+def create_synthesis_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
     """
     Creates the Synthesis Agent that combines search and transcript results.
     
@@ -23,16 +30,14 @@ def create_synthesis_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
     
     Returns:
         Configured LlmAgent for synthesizing information
     """
     synthesis_agent = LlmAgent(
         name="SynthesisAgent",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
+        model=model or create_model(retry_config),
         instruction="""You are a synthesis agent. Your job is to combine information from multiple sources.
 
 You will receive information from:
@@ -52,6 +57,8 @@ IMPORTANT:
 - Only use information that was actually provided in the sources
 - If sources contradict, note the contradiction
 - If information is missing, clearly state what is missing
+- A source that starts with "UNAVAILABLE" or says the web search was skipped
+  has no information; rely on the other source
 - Focus on information that directly helps answer the user's question
 - Don't make up facts - if you don't have the information, say so
 
@@ -0,0 +1,78 @@
+"""
+Synthesis Stage Agent - Merges research in code, calling SynthesisAgent only when needed.
+
+For most questions the SynthesisAgent just restated {search_results} and
+{transcript_results}, a full serial model call on the critical path. This
+stage merges the two outputs in code (tools/research_merge.py: sentence
+dedup, transcript-first order, source tags) and writes synthesized_info
+itself when:
+
+- the combined research is under SYNTHESIS_TOKEN_BUDGET tokens, and
+- the sources do not contradict each other
+
+Large or contradictory inputs still go to the SynthesisAgent. The path
+taken is recorded in session state ("synthesis_path").
+"""
+
+import os
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from tools.research_merge import merge_research
+
+
+# Combined research size (estimated tokens) up to which it is merged in code
+TOKEN_BUDGET = int(os.environ.get("SYNTHESIS_TOKEN_BUDGET", "800"))
+
+
+class SynthesisStageAgent(BaseAgent):
+    """Writes synthesized_info by a code merge, or runs synthesis_agent for hard cases."""
+
+    synthesis_agent: BaseAgent
+    token_budget: int = TOKEN_BUDGET
+
+    def __init__(self, name: str, synthesis_agent: BaseAgent, token_budget: int = TOKEN_BUDGET):
+        super().__init__(
+            name=name,
+            synthesis_agent=synthesis_agent,
+            token_budget=token_budget,
+            sub_agents=[synthesis_agent],
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        merged = merge_research(
+            str(state.get("transcript_results") or ""),
+            str(state.get("search_results") or ""),
+        )
+        if merged["contradictions"]:
+            reason = "contradiction"
+        elif merged["tokens"] > self.token_budget:
+            reason = "over_budget"
+        else:
+            reason = None
+
+        record = {
+            "path": "model" if reason else "merged",
+            "reason": reason,
+            "tokens": merged["tokens"],
+            "token_budget": self.token_budget,
+            "sentences_kept": merged["kept"],
+            "sentences_dropped": merged["dropped"],
+            "contradictions": len(merged["contradictions"]),
+        }
+        if reason:
+            async for event in self.synthesis_agent.run_async(ctx):
+                yield event
+            state_delta = {"synthesis_path": record}
+        else:
+            state_delta = {"synthesized_info": merged["text"], "synthesis_path": record}
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
@@ -0,0 +1,296 @@
+"""
+Token Budget Callbacks - Enforces token budgets and logs token use for every agent.
+
+apply_token_budgets() walks an agent graph and adds these callbacks
+(after any the agents already have):
+
+- every agent, before it runs: the research values in session state
+  (transcript_results, search_results, synthesized_info) that are over
+  their budget are trimmed, keeping what is most relevant to the comment,
+  so the next prompt that reads them stays bounded
+- every tool call: responses over TOOL_OUTPUT_BUDGET drop their
+  lowest-ranked matches
+- every model call: when the prompt is over the agent's budget, the
+  largest parts of the conversation (other agents' outputs, never the
+  comment itself) are trimmed to fit; tokens in and out are recorded in
+  the process-wide TokenLedger (tools/token_budget.py), from the API's
+  usage counts when it sends them and from the local tokenizer otherwise;
+  calls that fail or are cancelled (a research branch past its deadline)
+  are recorded with their prompt estimate when the agent, or at the latest
+  the whole invocation, ends
+
+Budgets and the tokenizer live in tools/token_budget.py.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from agents.models import estimate_request_tokens
+from tools.token_budget import (
+    STATE_BUDGETS,
+    TOOL_OUTPUT_BUDGET,
+    agent_budget,
+    count_tokens,
+    get_token_ledger,
+    trim_text,
+    trim_tool_response,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Prompt parts are never trimmed below this many tokens
+MIN_PART_TOKENS = 64
+
+# Prompt estimates waiting for their response, by (invocation id, agent name)
+_pending_prompts: Dict[Tuple[str, str], int] = {}
+_pending_lock = threading.Lock()
+
+
+def _comment_text(callback_context: CallbackContext) -> str:
+    user_content = callback_context.user_content
+    if not user_content or not user_content.parts:
+        return ""
+    return "".join(part.text or "" for part in user_content.parts)
+
+
+def trim_state_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Before-agent callback: trims over-budget research values in session state.
+
+    Args:
+        callback_context: Context of the agent about to run
+
+    Returns:
+        None (the agent always runs)
+    """
+    query = _comment_text(callback_context)
+    for key, budget in STATE_BUDGETS.items():
+        value = callback_context.state.get(key)
+        if not isinstance(value, str):
+            continue
+        tokens = count_tokens(value)
+        if tokens <= budget:
+            continue
+        callback_context.state[key] = trim_text(value, budget, query)
+        get_token_ledger().record_trim(callback_context.agent_name)
+        logger.info("Trimmed %s from %d to %d tokens before %s", key, tokens, budget, callback_context.agent_name)
+    return None
+
+
+def trim_tool_output_callback(
+    tool: BaseTool,
+    args: Dict[str, Any],
+    tool_context: ToolContext,
+    tool_response: Dict,
+) -> Optional[Dict]:
+    """
+    After-tool callback: cuts a tool response to TOOL_OUTPUT_BUDGET.
+
+    Args:
+        tool: Tool that ran
+        args: Its arguments
+        tool_context: Context of the calling agent
+        tool_response: The tool's response
+
+    Returns:
+        The trimmed response, or None to keep the original
+    """
+    trimmed, dropped = trim_tool_response(tool_response, TOOL_OUTPUT_BUDGET)
+    if not dropped:
+        return None
+    get_token_ledger().record_trim(tool_context.agent_name)
+    logger.info("Dropped %d match(es) from %s output for %s", dropped, tool.name, tool_context.agent_name)
+    return trimmed
+
+
+def _trimmable_parts(llm_request: LlmRequest, comment: str) -> List[types.Part]:
+    """Text parts of the conversation, except the comment itself."""
+    return [
+        part
+        for content in llm_request.contents
+        for part in content.parts or []
+        if part.text and part.text.strip() != comment.strip()
+    ]
+
+
+def count_prompt_callback(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Before-model callback: fits the prompt to the agent's budget and records its size.
+
+    Args:
+        callback_context: Context of the calling agent
+        llm_request: Request about to be sent (trimmed in place)
+
+    Returns:
+        None (the call always goes ahead)
+    """
+    agent_name = callback_context.agent_name
+    budget = agent_budget(agent_name)
+    tokens = estimate_request_tokens(llm_request)
+    if tokens > budget:
+        query = _comment_text(callback_context)
+        excess = tokens - budget
+        for part in sorted(_trimmable_parts(llm_request, query), key=lambda part: -count_tokens(part.text)):
+            if excess <= 0:
+                break
+            part_tokens = count_tokens(part.text)
+            target = max(MIN_PART_TOKENS, part_tokens - excess)
+            if target >= part_tokens:
+                break  # Every remaining part is already small
+            part.text = trim_text(part.text, target, query)
+            excess -= part_tokens - count_tokens(part.text)
+            get_token_ledger().record_trim(agent_name)
+        trimmed_tokens = estimate_request_tokens(llm_request)
+        logger.info("Prompt of %s trimmed from %d to %d tokens (budget %d)", agent_name, tokens, trimmed_tokens, budget)
+        tokens = trimmed_tokens
+    with _pending_lock:
+        _pending_prompts[(callback_context.invocation_id, agent_name)] = tokens
+    return None
+
+
+def response_tokens(llm_response: LlmResponse, estimated_in: int = 0) -> Tuple[int, int, str]:
+    """
+    Gets the tokens in and out of a model call.
+
+    Args:
+        llm_response: The model's (final) response
+        estimated_in: Local estimate of the prompt, used without usage counts
+
+    Returns:
+        (tokens in, tokens out, "usage" or "estimate")
+    """
+    usage = llm_response.usage_metadata
+    if usage and usage.prompt_token_count:
+        return usage.prompt_token_count, usage.candidates_token_count or 0, "usage"
+    tokens_out = 0
+    if llm_response.content:
+        for part in llm_response.content.parts or []:
+            tokens_out += count_tokens(part.text or "")
+            if part.function_call:
+                tokens_out += count_tokens(str(part.function_call.args or {})) + count_tokens(part.function_call.name or "")
+    return estimated_in, tokens_out, "estimate"
+
+
+def _record_unanswered(invocation_id: str, agent_name: str, tokens_in: int, source: str):
+    """Records a model call that produced no response (tokens out unknown, counted as 0)."""
+    get_token_ledger().record_call(
+        agent_name, tokens_in, 0, agent_budget(agent_name), source, invocation_id=invocation_id,
+    )
+
+
+def count_response_callback(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """
+    After-model callback: records the call's tokens in and out in the TokenLedger.
+
+    Args:
+        callback_context: Context of the calling agent
+        llm_response: The model's response
+
+    Returns:
+        None (the response is kept as is)
+    """
+    if llm_response.partial:
+        return None  # Counted once, on the final chunk
+    agent_name = callback_context.agent_name
+    with _pending_lock:
+        estimated_in = _pending_prompts.pop((callback_context.invocation_id, agent_name), 0)
+    tokens_in, tokens_out, source = response_tokens(llm_response, estimated_in)
+    get_token_ledger().record_call(
+        agent_name,
+        tokens_in,
+        tokens_out,
+        agent_budget(agent_name),
+        source,
+        invocation_id=callback_context.invocation_id,
+    )
+    return None
+
+
+def model_error_callback(
+    callback_context: CallbackContext,
+    llm_request: LlmRequest,
+    error: Exception,
+) -> Optional[LlmResponse]:
+    """
+    Model-error callback: records the failed call's prompt (the error still propagates).
+
+    Args:
+        callback_context: Context of the calling agent
+        llm_request: Request that failed
+        error: The model's exception
+
+    Returns:
+        None
+    """
+    agent_name = callback_context.agent_name
+    with _pending_lock:
+        estimated_in = _pending_prompts.pop((callback_context.invocation_id, agent_name), None)
+    if estimated_in is not None:
+        _record_unanswered(callback_context.invocation_id, agent_name, estimated_in, "error")
+    return None
+
+
+def flush_prompts_callback(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    After-agent callback: records prompts that never got a response.
+
+    An agent clears its own entry; the root agent clears every entry left
+    by its invocation, which covers branches that were cancelled (their
+    after-agent callbacks never run).
+
+    Args:
+        callback_context: Context of the agent that finished
+
+    Returns:
+        None (the agent's output is left unchanged)
+    """
+    invocation_id = callback_context.invocation_id
+    is_root = callback_context.get_invocation_context().agent.parent_agent is None
+    with _pending_lock:
+        keys = [
+            key for key in _pending_prompts
+            if key[0] == invocation_id and (is_root or key[1] == callback_context.agent_name)
+        ]
+        unanswered = [(key[1], _pending_prompts.pop(key)) for key in keys]
+    for agent_name, estimated_in in unanswered:
+        _record_unanswered(invocation_id, agent_name, estimated_in, "cancelled")
+    return None
+
+
+def add_callback(agent: BaseAgent, field: str, callback) -> None:
+    """Appends a callback to an agent's callback field, keeping existing ones."""
+    current = getattr(agent, field)
+    callbacks = list(current) if isinstance(current, list) else ([current] if current else [])
+    if callback not in callbacks:
+        setattr(agent, field, callbacks + [callback])
+
+
+def apply_token_budgets(agent: BaseAgent) -> BaseAgent:
+    """
+    Adds the budget and accounting callbacks to an agent and all its sub-agents.
+
+    Args:
+        agent: Root of the agent graph
+
+    Returns:
+        The same agent, for chaining
+    """
+    add_callback(agent, "before_agent_callback", trim_state_callback)
+    add_callback(agent, "after_agent_callback", flush_prompts_callback)
+    if isinstance(agent, LlmAgent):
+        add_callback(agent, "before_model_callback", count_prompt_callback)
+        add_callback(agent, "after_model_callback", count_response_callback)
+        add_callback(agent, "on_model_error_callback", model_error_callback)
+        add_callback(agent, "after_tool_callback", trim_tool_output_callback)
+    for sub_agent in agent.sub_agents:
+        apply_token_budgets(sub_agent)
+    return agent
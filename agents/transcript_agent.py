@@ -5,50 +5,63 @@ This agent uses a custom tool to search through the channel's video transcripts
 to find information that might help answer questions.
 """
 
+from typing import Optional
+
 from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
-from tools.transcript_search_tool import transcript_search_tool
+
+from agents.models import create_model
+from tools.transcript_search_tool import transcript_batch_search_tool, transcript_search_tool
 
 
-def create_transcript_agent(retry_config: types.HttpRetryOptions) -> LlmAgent:
+def create_transcript_agent(
+    retry_config: types.HttpRetryOptions,
+    model: Optional[BaseLlm] = None
+) -> LlmAgent:
     """
     Creates the Transcript Agent that searches video transcripts.
     
     This agent will:
-    - Use the transcript_search_tool to find relevant sections
+    - Use the transcript_batch_search_tool to look up every phrasing of the
+      question in a single tool call (transcript_search_tool remains
+      available for a follow-up lookup)
     - Extract information from the channel's own videos
     - Present findings from transcripts
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        model: Model shared with the other agents (defaults to a new Gemini client)
     
     Returns:
         Configured LlmAgent with transcript search capability
     """
     transcript_agent = LlmAgent(
         name="TranscriptAgent",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
+        model=model or create_model(retry_config),
         instruction="""You are a transcript search agent. Your job is to search through video transcripts to find relevant information.
 
 Your job:
-1. Use the search_transcripts tool to search for information related to the user's question
-2. Extract relevant information from the transcript matches
+1. Call the search_transcripts_batch tool ONCE with all the queries you need: the key terms of
+   the user's question plus 2-4 rephrasings or related keywords (e.g. for "gate 600 iit possible?"
+   use ["GATE score 600 IIT admission", "good GATE score", "GATE score cutoff IIT"])
+2. Extract relevant information from the transcript matches (each match is a short
+   excerpt tagged with the video number and title it came from)
 3. Present findings clearly, focusing on what was actually said in the videos
 4. If multiple matches are found, prioritize the most relevant ones
 
 IMPORTANT:
+- Prefer a single search_transcripts_batch call; only use search_transcripts for a follow-up
+  lookup if the batch results clearly miss something
 - Only use information from the transcript search results - don't make things up
 - If no relevant information is found in transcripts, say so clearly
 - Quote or paraphrase what was said in the videos accurately
+- Mention which video (number and title) each finding comes from
 - Keep findings focused on answering the user's question
 
 Output your findings in a clear format, indicating they came from video transcripts.
         """,
-        tools=[transcript_search_tool],  # Use custom transcript search tool
+        tools=[transcript_batch_search_tool, transcript_search_tool],  # Custom transcript search tools
         output_key="transcript_results"  # Store results in session state
     )
     
@@ -30,18 +30,20 @@ if not (project_root / "root_agent.py").exists():
 sys.path.insert(0, str(project_root))
 
 from google.genai import types
-from root_agent import create_root_agent
+from root_agent import get_root_agent
 
 
-# Setup retry configuration
+# Setup retry configuration (429 / 503 are retried by the shared rate limiter)
 retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=7,
+    attempts=3,
+    exp_base=2,
     initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
+    max_delay=10,
+    jitter=1,
+    http_status_codes=[500, 504],
 )
 
 # Create and export the root agent
 # ADK web looks for 'root_agent' variable (not 'agent')
-root_agent = create_root_agent(retry_config)
+root_agent = get_root_agent(retry_config)
 
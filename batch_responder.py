@@ -0,0 +1,293 @@
+"""
+Batch Responder - Runs a stream of comments through one shared agent runner.
+
+Input is JSONL, one comment per line ({"id": ..., "comment": ...}; plain
+text lines are accepted too and numbered). Comments are read lazily and
+handed to a bounded pool of async workers that share a single runner, so
+the agent graph is built once and at most `concurrency` comments are in
+flight. Each result is written as one JSONL line, in completion order,
+as soon as it is ready.
+
+The output file doubles as the checkpoint: when it already exists, ids
+with a successful result in it are skipped, so a crashed or interrupted
+run picks up where it stopped. Failed comments are retried on the next
+run.
+
+Optionally, comments are pre-classified in groups with the batch
+classifier, so filtering and routing cost one model request per group
+instead of one per comment.
+"""
+
+import asyncio
+import json
+import sys
+import time
+import uuid
+from typing import Dict, IO, Iterator, Optional, Set, Tuple
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from agents.batch_classifier import create_batch_classifier, seed_state
+
+
+USER_ID = "batch"
+
+
+def parse_input_line(line: str, line_number: int) -> Optional[Tuple[str, str]]:
+    """
+    Parses one input line into (id, comment).
+
+    Args:
+        line: JSONL object with "comment" (or "text") and optional "id", or plain text
+        line_number: 1-based line number, used as the id when none is given
+
+    Returns:
+        (comment_id, comment_text), or None for blank lines
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        record = None
+    if isinstance(record, dict):
+        comment = record.get("comment", record.get("text", ""))
+        comment_id = record.get("id", f"line-{line_number}")
+        return str(comment_id), str(comment)
+    return f"line-{line_number}", line
+
+
+def iter_comments(stream: IO[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Reads (id, comment) pairs from a JSONL or plain-text stream.
+
+    Args:
+        stream: Open text stream
+
+    Yields:
+        (comment_id, comment_text) pairs in input order
+    """
+    for line_number, line in enumerate(stream, start=1):
+        parsed = parse_input_line(line, line_number)
+        if parsed is not None:
+            yield parsed
+
+
+def load_completed_ids(output_path: Optional[str]) -> Set[str]:
+    """
+    Reads the ids that already have a successful result in the output file.
+
+    Args:
+        output_path: Output JSONL file (None for stdout)
+
+    Returns:
+        Set of completed comment ids (empty if there is no file yet)
+    """
+    completed: Set[str] = set()
+    if not output_path:
+        return completed
+    try:
+        with open(output_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A line cut short by a crash
+                if record.get("status") == "success":
+                    completed.add(str(record.get("id")))
+    except FileNotFoundError:
+        pass
+    return completed
+
+
+def _ends_mid_line(path: str) -> bool:
+    """Whether a file is non-empty and does not end with a newline."""
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return False
+        f.seek(-1, 2)
+        return f.read(1) != b"\n"
+
+
+async def respond_to_comment(
+    runner: InMemoryRunner,
+    comment_id: str,
+    comment: str,
+    state: Optional[Dict] = None,
+) -> Dict:
+    """
+    Runs one comment through the shared runner in a fresh session.
+
+    Args:
+        runner: Shared runner
+        comment_id: Id of the comment (echoed in the result)
+        comment: Comment text
+        state: Initial session state (e.g. a batch classification seed)
+
+    Returns:
+        Result record with id, comment, response, decisions, status and timing
+    """
+    started = time.perf_counter()
+    session_id = f"{comment_id}-{uuid.uuid4().hex[:8]}"
+    result = {"id": comment_id, "comment": comment}
+    try:
+        await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=USER_ID, session_id=session_id,
+            state={**(state or {}), "correlation_id": comment_id},  # Tags metrics and traces
+        )
+        response = None
+        message = types.Content(role="user", parts=[types.Part(text=comment)])
+        async for event in runner.run_async(user_id=USER_ID, session_id=session_id, new_message=message):
+            if event.author == runner.agent.name and event.content and event.content.parts:
+                text = "".join(part.text or "" for part in event.content.parts)
+                if text:
+                    response = text
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=USER_ID, session_id=session_id
+        )
+        result.update({
+            "status": "success",
+            "response": response,
+            "filter_decision": session.state.get("filter_decision"),
+            "comment_type": session.state.get("comment_type"),
+        })
+    except Exception as e:
+        result.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+    finally:
+        try:
+            # Sessions are not reused; drop them so memory stays flat
+            await runner.session_service.delete_session(
+                app_name=runner.app_name, user_id=USER_ID, session_id=session_id
+            )
+        except Exception:
+            pass
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def respond_batch(
+    runner: InMemoryRunner,
+    input_stream: IO[str],
+    output_stream: IO[str],
+    concurrency: int = 4,
+    completed_ids: Optional[Set[str]] = None,
+    classify_batch_size: int = 0,
+    retry_config: Optional[types.HttpRetryOptions] = None,
+) -> Dict[str, int]:
+    """
+    Processes every comment of an input stream with a bounded worker pool.
+
+    Args:
+        runner: Shared runner for all comments
+        input_stream: JSONL / plain-text comment stream
+        output_stream: Stream the JSONL results are appended to
+        concurrency: Maximum number of comments in flight
+        completed_ids: Ids to skip (already answered in a previous run)
+        classify_batch_size: If > 1, pre-classify comments in groups of this size
+        retry_config: HTTP retry configuration for the batch classifier
+
+    Returns:
+        Counters: read, skipped, succeeded, failed
+    """
+    completed_ids = completed_ids or set()
+    counters = {"read": 0, "skipped": 0, "succeeded": 0, "failed": 0}
+    workers = max(1, concurrency)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    classifier = (
+        create_batch_classifier(retry_config or types.HttpRetryOptions(), batch_size=classify_batch_size)
+        if classify_batch_size > 1 else None
+    )
+    loop = asyncio.get_running_loop()
+    comments = iter_comments(input_stream)
+
+    async def enqueue_group(group):
+        seeds = await classifier.classify(group) if classifier else {}
+        for comment_id, comment in group:
+            seed = seeds.get(comment_id)
+            await queue.put((comment_id, comment, seed_state(seed) if seed else None))
+
+    async def produce():
+        group = []
+        while True:
+            # Reading may block (stdin), so it happens off the event loop
+            item = await loop.run_in_executor(None, next, comments, None)
+            if item is None:
+                break
+            counters["read"] += 1
+            if item[0] in completed_ids:
+                counters["skipped"] += 1
+                continue
+            group.append(item)
+            if len(group) >= max(1, classify_batch_size):
+                await enqueue_group(group)
+                group = []
+        if group:
+            await enqueue_group(group)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def work():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            comment_id, comment, state = item
+            result = await respond_to_comment(runner, comment_id, comment, state)
+            counters["succeeded" if result["status"] == "success" else "failed"] += 1
+            output_stream.write(json.dumps(result, ensure_ascii=False) + "\n")
+            output_stream.flush()
+
+    await asyncio.gather(produce(), *(work() for _ in range(workers)))
+    return counters
+
+
+def run_respond_batch(
+    root_agent,
+    input_path: Optional[str],
+    output_path: Optional[str],
+    concurrency: int = 4,
+    resume: bool = True,
+    classify_batch_size: int = 0,
+    retry_config: Optional[types.HttpRetryOptions] = None,
+) -> Dict[str, int]:
+    """
+    Runs respond_batch() over files (or stdin / stdout) with checkpoint resume.
+
+    Args:
+        root_agent: Root agent shared by all comments
+        input_path: Input JSONL file, or None / "-" for stdin
+        output_path: Output JSONL file, or None / "-" for stdout
+        concurrency: Maximum number of comments in flight
+        resume: Skip ids that already succeeded in the output file
+        classify_batch_size: If > 1, pre-classify comments in groups of this size
+        retry_config: HTTP retry configuration for the batch classifier
+
+    Returns:
+        Counters: read, skipped, succeeded, failed
+    """
+    input_path = None if input_path in (None, "-") else input_path
+    output_path = None if output_path in (None, "-") else output_path
+    completed_ids = load_completed_ids(output_path) if resume else set()
+    runner = InMemoryRunner(agent=root_agent)
+
+    input_stream = open(input_path, "r", encoding="utf-8") if input_path else sys.stdin
+    output_stream = open(output_path, "a" if resume else "w", encoding="utf-8") if output_path else sys.stdout
+    if output_path and resume and _ends_mid_line(output_path):
+        # Terminate a record cut short by a crash so it does not swallow the next one
+        output_stream.write("\n")
+    try:
+        return asyncio.run(respond_batch(
+            runner, input_stream, output_stream,
+            concurrency=concurrency,
+            completed_ids=completed_ids,
+            classify_batch_size=classify_batch_size,
+            retry_config=retry_config,
+        ))
+    finally:
+        if input_path:
+            input_stream.close()
+        if output_path:
+            output_stream.close()
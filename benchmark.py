@@ -0,0 +1,583 @@
+"""
+Benchmark - Offline load test of the comment pipeline and the transcript search.
+
+Load-testing against Gemini burns API quota, so this harness swaps the
+model of every agent for a local FakeLlm (agents/fake_model.py) that
+answers with scripted responses after a latency drawn from a profile and
+injects 429 / 503 errors. Two benchmarks run:
+
+- pipeline: the full root agent, driven through one InMemoryRunner at
+  each concurrency level with a mix of praise and questions (taken from
+  the gold example files); reports throughput, p50/p95/p99 latency,
+  failures and, per stage, mean wall time, model time and the overhead
+  between them (from the instrumentation metrics, tools/metrics.py)
+- search: search_transcripts latency over synthetic corpora (the real
+  transcripts, renumbered and salted with extra vocabulary) from 80 KB up
+  to 1 GB, against the compiled index and, for small corpora, the
+  in-memory index; index build time and size are reported too
+
+Every log and cache the pipeline writes goes to a scratch directory
+(BENCHMARK_DIR, default a new temporary directory), never to data/.
+Compiling a 1 GB corpus holds its postings in memory (several GB of RAM
+and a few minutes); pass --corpus-sizes to stay smaller.
+
+Usage:
+    python benchmark.py
+    python benchmark.py --profile overloaded --concurrency 1,8,32 --comments 300
+    python benchmark.py --skip-pipeline --corpus-sizes 80K,1M,10M
+    python benchmark.py --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# The pipeline's logs and caches read their paths from the environment at
+# import time, so the scratch directory is set up before importing them
+BENCHMARK_DIR = Path(os.environ.get("BENCHMARK_DIR") or tempfile.mkdtemp(prefix="comment-benchmark-"))
+for _variable, _file_name in (
+    ("ROUTER_DECISIONS_LOG", "router_decisions.jsonl"),
+    ("ROUTER_LOCAL_DECISIONS_LOG", "router_local_decisions.jsonl"),
+    ("RESPONSE_CACHE_PATH", "response_cache.sqlite"),
+    ("SEARCH_CACHE_PATH", "search_cache.sqlite"),
+    ("RESEARCH_PATH_LOG", "research_paths.jsonl"),
+    ("TOKEN_USAGE_LOG", "token_usage.jsonl"),
+    ("TRACE_LOG", "traces.jsonl"),
+):
+    os.environ.setdefault(_variable, str(BENCHMARK_DIR / _file_name))
+
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from agents.fake_model import FakeLlm, request_agent_name  # noqa: E402
+from agents.models import RateLimitedLlm  # noqa: E402
+from agents.rate_limiter import RateLimiter  # noqa: E402
+from agents.search_agent import SEARCH_CACHE_BYPASS  # noqa: E402
+from batch_responder import respond_to_comment  # noqa: E402
+from main import setup_retry_config  # noqa: E402
+from root_agent import create_root_agent  # noqa: E402
+from tools.compiled_transcript_index import CompiledTranscriptIndex, compile_index  # noqa: E402
+from tools.metrics import get_metrics  # noqa: E402
+from tools.style_examples import load_style_examples  # noqa: E402
+from tools.transcript_index import DEFAULT_TRANSCRIPTS_PATH, BaseTranscriptIndex, TranscriptIndex  # noqa: E402
+from tools.transcript_search_tool import MAX_MATCHES, format_match, rank_queries  # noqa: E402
+
+
+# Fake model settings; latencies in seconds
+PROFILES: Dict[str, Dict] = {
+    "instant": {"latency": 0.0},
+    "fast": {"latency": 0.05, "latency_distribution": "lognormal", "latency_sigma": 0.3},
+    "realistic": {
+        "latency": 0.6,
+        "latency_distribution": "lognormal",
+        "latency_sigma": 0.5,
+        "latency_by_agent": {"ClassifierAgent": 0.35, "SearchAgent": 2.5},
+        "error_rate_429": 0.02,
+        "error_rate_503": 0.01,
+    },
+    "overloaded": {
+        "latency": 0.6,
+        "latency_distribution": "lognormal",
+        "latency_sigma": 0.7,
+        "latency_by_agent": {"ClassifierAgent": 0.35, "SearchAgent": 2.5},
+        "server_concurrency": 8,
+        "error_rate_429": 0.05,
+        "error_rate_503": 0.02,
+    },
+}
+
+DEFAULT_CONCURRENCY_LEVELS = "1,4,16"
+DEFAULT_CORPUS_SIZES = "80K,1M,10M,100M,1G"
+
+# Synthetic corpora are written in parts of this size (compiled together);
+# corpora of a single part are also searched with the in-memory index
+CORPUS_PART_BYTES = 32 * 1024 * 1024
+
+# Queries timed against every corpus
+SEARCH_QUERIES = [
+    "GATE score IIT admission",
+    "placement package average salary",
+    "\"pay package\"",
+    "salary NEAR/5 average",
+    "how to prepare for interviews",
+    "is MBA worth it after engineering",
+]
+
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)B?\s*$", re.IGNORECASE)
+_QUESTION_RE = re.compile(r"\?|^(how|what|why|when|where|which|who|can|should|is|are|do|does|kya|kaise)\b", re.IGNORECASE)
+
+
+def parse_size(text: str) -> int:
+    """
+    Parses a size such as "80K", "10M" or "1G" into bytes.
+
+    Args:
+        text: Number with an optional K / M / G suffix (powers of 1024)
+
+    Returns:
+        Size in bytes
+
+    Raises:
+        ValueError: If the text is not a size
+    """
+    match = _SIZE_RE.match(text)
+    if not match:
+        raise ValueError(f"Not a size: {text!r}")
+    return int(float(match.group(1)) * 1024 ** " KMG".index(match.group(2).upper() or " "))
+
+
+def format_size(size: int) -> str:
+    for unit, scale in (("G", 1024 ** 3), ("M", 1024 ** 2), ("K", 1024)):
+        if size >= scale:
+            return f"{size / scale:.3g}{unit}"
+    return f"{size}B"
+
+
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarizes a sample.
+
+    Args:
+        values: Observations
+
+    Returns:
+        Dictionary with count, mean, p50, p95, p99 and max (nearest rank)
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "max": ordered[-1],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Pipeline benchmark
+# ---------------------------------------------------------------------------
+
+def load_benchmark_comments() -> List[str]:
+    """Returns the comments of the gold example files (praise and questions)."""
+    comments = [example.comment for example in load_style_examples()]
+    if not comments:
+        raise FileNotFoundError("No gold examples to build benchmark comments from (data/gold_*.json/txt)")
+    return comments
+
+
+def _comment_of(llm_request: LlmRequest) -> str:
+    """The comment being answered: the first user text of the conversation."""
+    for content in llm_request.contents:
+        if content.role == "user":
+            text = "".join(part.text or "" for part in content.parts or [])
+            if text:
+                return text
+    return ""
+
+
+def _transcript_excerpt(llm_request: LlmRequest) -> Optional[str]:
+    """The best excerpt of the TranscriptAgent's tool call, once it has run."""
+    for content in reversed(llm_request.contents):
+        for part in content.parts or []:
+            if part.function_response:
+                matches = (part.function_response.response or {}).get("matches") or []
+                if not matches:
+                    return ""
+                best = matches[0]
+                return f"Video {best.get('video_number')} ({best.get('video_title')}): {best.get('excerpt')}"
+    return None
+
+
+def scripted_reply(llm_request: LlmRequest):
+    """
+    Answers a request the way its agent's model would, in shape if not in substance.
+
+    The TranscriptAgent calls search_transcripts_batch for real, so the
+    tool and its callbacks are part of the measurement.
+
+    Args:
+        llm_request: Request from any agent of the root graph
+
+    Returns:
+        Reply text, a JSON-able dict, or a types.FunctionCall
+    """
+    agent_name = request_agent_name(llm_request)
+    comment = _comment_of(llm_request)
+    is_question = bool(_QUESTION_RE.search(comment.strip()))
+    if agent_name == "ClassifierAgent":
+        return {"decision": "ACCEPT", "type": "Question" if is_question else "Praise"}
+    if agent_name == "FilterAgent":
+        return "ACCEPT"
+    if agent_name == "RouterAgent":
+        return "Question" if is_question else "Praise"
+    if agent_name == "TranscriptAgent":
+        excerpt = _transcript_excerpt(llm_request)
+        if excerpt is None:
+            return types.FunctionCall(name="search_transcripts_batch", args={"queries": [comment]})
+        return f"From the video transcripts:\n- {excerpt}" if excerpt else "No relevant information in the transcripts."
+    if agent_name == "SearchAgent":
+        return (
+            "Web findings:\n"
+            "- Official sources publish admission cutoffs every year.\n"
+            "- Requirements differ between institutes and categories."
+        )
+    if agent_name == "SynthesisAgent":
+        return "Key points: the videos and the web agree; cutoffs vary by year and institute."
+    if agent_name == "PraiseResponderAgent":
+        return "Thank you so much! Glad the videos help. 🙏"
+    if agent_name == "QuestionResponderAgent":
+        return "Great question! It depends on the year and the institute; check the latest cutoffs."
+    return "OK"
+
+
+def _stage_totals() -> Dict[str, Dict[str, Dict]]:
+    """Current sums and counts of the per-stage and per-agent model histograms."""
+    snapshot = get_metrics().snapshot()
+    totals: Dict[str, Dict[str, Dict]] = {}
+    for metric in ("stage_seconds", "model_seconds", "model_queue_seconds"):
+        series = snapshot.get(f"comment_responder_{metric}", {})
+        totals[metric] = {labels[0]: {"sum": data["sum"], "count": data["count"]} for labels, data in series.items()}
+    return totals
+
+
+def _stage_breakdown(before: Dict, after: Dict) -> Dict[str, Dict[str, float]]:
+    """Per-stage mean wall time, model time and overhead between two snapshots."""
+    stages = {}
+    for stage, end in after["stage_seconds"].items():
+        start = before["stage_seconds"].get(stage, {"sum": 0.0, "count": 0})
+        runs = end["count"] - start["count"]
+        if runs <= 0:
+            continue
+        wall = (end["sum"] - start["sum"]) / runs
+        row = {"runs": runs, "wall_ms": round(wall * 1000, 2), "model_ms": None, "overhead_ms": None}
+        if stage in after["model_seconds"]:
+            # Model agents: time around the model calls (callbacks, tools, ADK)
+            model = 0.0
+            for metric in ("model_seconds", "model_queue_seconds"):
+                start_model = before[metric].get(stage, {"sum": 0.0})
+                model += (after[metric][stage]["sum"] - start_model["sum"]) / runs
+            row["model_ms"] = round(model * 1000, 2)
+            row["overhead_ms"] = round(max(0.0, wall - model) * 1000, 2)
+        stages[stage] = row
+    return stages
+
+
+async def run_pipeline_level(
+    comments: List[str],
+    concurrency: int,
+    profile: Dict,
+    seed: int = 0,
+    search_cache: bool = False,
+) -> Dict:
+    """
+    Answers every comment with the full root agent at one concurrency level.
+
+    A fresh fake model, rate limiter and agent graph are built per level,
+    so levels do not share limiter state.
+
+    Args:
+        comments: Comments to answer
+        concurrency: Comments in flight at once
+        profile: FakeLlm settings (see PROFILES)
+        seed: Seed of the fake model's latency and error draws
+        search_cache: Let SearchAgent reuse cached findings (off: every
+            question that reaches the web search pays for it)
+
+    Returns:
+        Dictionary with throughput, latency percentiles (ms), failures,
+        model call counts and the per-stage breakdown
+    """
+    fake = FakeLlm(model="gemini-benchmark", reply=scripted_reply, seed=seed, **profile)
+    model = RateLimitedLlm(
+        model=fake.model,
+        inner=fake,
+        limiter=RateLimiter(requests_per_minute=1_000_000, tokens_per_minute=1_000_000_000),
+    )
+    root_agent = create_root_agent(setup_retry_config(), model=model, response_cache=False)
+    runner = InMemoryRunner(agent=root_agent, app_name="benchmark")
+    state = {} if search_cache else {SEARCH_CACHE_BYPASS: True}
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for number, comment in enumerate(comments):
+        queue.put_nowait((f"bench-{concurrency}-{number}", comment))
+    results: List[Dict] = []
+
+    async def worker():
+        while True:
+            try:
+                comment_id, comment = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results.append(await respond_to_comment(runner, comment_id, comment, dict(state)))
+
+    before = _stage_totals()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - started
+    after = _stage_totals()
+
+    succeeded = [result for result in results if result["status"] == "success"]
+    latency = percentiles([result["elapsed_ms"] for result in succeeded])
+    return {
+        "concurrency": concurrency,
+        "comments": len(comments),
+        "failed": len(results) - len(succeeded),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(succeeded) / wall, 2) if wall else 0.0,
+        "latency_ms": {key: round(value, 1) for key, value in latency.items()},
+        "model_calls": fake.calls,
+        "model_rejections": fake.rejected,
+        "stages": _stage_breakdown(before, after),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Search benchmark
+# ---------------------------------------------------------------------------
+
+def _synthetic_word(number: int) -> str:
+    """A pronounceable made-up word, unique per number."""
+    syllables = ["ka", "ri", "to", "man", "sel", "vo", "dur", "pi", "nex", "la", "qua", "zen"]
+    word = ""
+    number += 1
+    while number:
+        number, digit = divmod(number, len(syllables))
+        word += syllables[digit]
+    return word
+
+
+def write_synthetic_corpus(directory: Path, size: int, seed: int = 0) -> List[Path]:
+    """
+    Writes a synthetic transcript corpus of about size bytes.
+
+    The real transcripts are repeated with new video numbers, and some of
+    their lines get extra words drawn from a Zipf-like vocabulary that
+    grows with the corpus, so postings lists and the vocabulary grow the
+    way a real channel's would rather than just repeating.
+
+    Args:
+        directory: Where to write the corpus parts
+        size: Target size in bytes
+        seed: Seed of the word draws
+
+    Returns:
+        Paths of the parts, each at most CORPUS_PART_BYTES
+    """
+    with open(DEFAULT_TRANSCRIPTS_PATH, "r", encoding="utf-8") as f:
+        source = f.read()
+    videos = re.split(r"(?m)^(?=Video\s+\d+\s*:)", source)
+    videos = [video for video in videos if video.strip()]
+    rng = random.Random(seed)
+    vocabulary = max(1000, size // 2000)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+    written = 0
+    video_number = 0
+    part = None
+    part_bytes = 0
+    try:
+        while written < size:
+            if part is None or part_bytes >= CORPUS_PART_BYTES:
+                if part is not None:
+                    part.close()
+                paths.append(directory / f"corpus-{len(paths):04d}.txt")
+                part = open(paths[-1], "w", encoding="utf-8")
+                part_bytes = 0
+            template = videos[video_number % len(videos)]
+            video_number += 1
+            lines = template.splitlines()
+            header = re.sub(r"^Video\s+\d+", f"Video {video_number}", lines[0])
+            body = []
+            for line in lines[1:]:
+                if line.strip() and rng.random() < 0.3:
+                    extra = " ".join(
+                        _synthetic_word(int(vocabulary ** rng.random()) - 1) for _ in range(rng.randint(1, 3))
+                    )
+                    line = f"{line} {extra}"
+                body.append(line)
+            text = "\n".join([header] + body) + "\n\n"
+            encoded_size = len(text.encode("utf-8"))
+            if written + encoded_size > size and written:
+                # Last video: cut it to land on the target size
+                text = text.encode("utf-8")[: size - written].decode("utf-8", "ignore")
+                encoded_size = len(text.encode("utf-8"))
+            part.write(text)
+            part_bytes += encoded_size
+            written += encoded_size
+    finally:
+        if part is not None:
+            part.close()
+    return paths
+
+
+def _search(index: BaseTranscriptIndex, query: str) -> List[Dict]:
+    """What search_transcripts does for one query, against a given index."""
+    return [format_match(index, chunk, score, [query]) for chunk, score in rank_queries(index, [query], MAX_MATCHES)[0]]
+
+
+def time_searches(index: BaseTranscriptIndex, queries: Sequence[str], repeats: int) -> Dict[str, float]:
+    """
+    Times searches against an index.
+
+    Args:
+        index: Transcript index
+        queries: Queries to run
+        repeats: Times each query is run (after one warm-up run)
+
+    Returns:
+        Latency percentiles in milliseconds
+    """
+    for query in queries:
+        _search(index, query)  # Warm caches (term lookups, TF-IDF matrix)
+    samples = []
+    for _ in range(repeats):
+        for query in queries:
+            started = time.perf_counter()
+            _search(index, query)
+            samples.append((time.perf_counter() - started) * 1000)
+    return {key: round(value, 3) for key, value in percentiles(samples).items()}
+
+
+def run_search_size(size: int, repeats: int, seed: int = 0) -> Dict:
+    """
+    Builds a synthetic corpus of one size and times searches against it.
+
+    Args:
+        size: Corpus size in bytes
+        repeats: Runs of each query per index
+        seed: Seed of the corpus generator
+
+    Returns:
+        Dictionary with build times, index size, chunk count and latency
+        percentiles per index type
+    """
+    directory = BENCHMARK_DIR / f"corpus-{format_size(size)}"
+    started = time.perf_counter()
+    parts = write_synthetic_corpus(directory, size, seed)
+    generate_seconds = time.perf_counter() - started
+
+    index_path = directory / "corpus.idx"
+    started = time.perf_counter()
+    summary = compile_index([str(path) for path in parts], str(index_path))
+    compile_seconds = time.perf_counter() - started
+    compiled = CompiledTranscriptIndex(str(index_path))
+    result = {
+        "size": format_size(size),
+        "bytes": sum(path.stat().st_size for path in parts),
+        "chunks": compiled.num_chunks,
+        "generate_seconds": round(generate_seconds, 2),
+        "compile_seconds": round(compile_seconds, 2),
+        "index_bytes": index_path.stat().st_size,
+        "summary": summary,
+        "search_ms": {"compiled": time_searches(compiled, SEARCH_QUERIES, repeats)},
+    }
+    if len(parts) == 1:
+        started = time.perf_counter()
+        in_memory = TranscriptIndex.from_file(str(parts[0]))
+        result["in_memory_build_seconds"] = round(time.perf_counter() - started, 2)
+        result["search_ms"]["in_memory"] = time_searches(in_memory, SEARCH_QUERIES, repeats)
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def print_pipeline_report(levels: List[Dict], out=sys.stdout):
+    print("\nPipeline (fake model)", file=out)
+    print(f"{'conc':>5} {'ok/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'failed':>7} {'calls':>6} {'429/503':>8}", file=out)
+    for level in levels:
+        latency = level["latency_ms"]
+        print(
+            f"{level['concurrency']:>5} {level['throughput_per_second']:>8.2f} {latency['p50']:>9.1f} "
+            f"{latency['p95']:>9.1f} {latency['p99']:>9.1f} {level['failed']:>7} "
+            f"{level['model_calls']:>6} {level['model_rejections']:>8}",
+            file=out,
+        )
+    for level in levels:
+        print(f"\nStages at concurrency {level['concurrency']} (mean per run; workflow stages include their sub-stages)", file=out)
+        print(f"{'stage':<30} {'runs':>6} {'wall ms':>9} {'model ms':>9} {'overhead':>9}", file=out)
+        for stage, row in sorted(level["stages"].items(), key=lambda item: -item[1]["wall_ms"]):
+            model = "-" if row["model_ms"] is None else f"{row['model_ms']:.1f}"
+            overhead = "-" if row["overhead_ms"] is None else f"{row['overhead_ms']:.1f}"
+            print(f"{stage:<30} {row['runs']:>6} {row['wall_ms']:>9.1f} {model:>9} {overhead:>9}", file=out)
+
+
+def print_search_report(sizes: List[Dict], out=sys.stdout):
+    print("\nsearch_transcripts", file=out)
+    print(f"{'corpus':>7} {'chunks':>9} {'compile s':>10} {'index':>8} {'index type':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}", file=out)
+    for entry in sizes:
+        for index_type, latency in entry["search_ms"].items():
+            print(
+                f"{entry['size']:>7} {entry['chunks']:>9} {entry['compile_seconds']:>10.2f} "
+                f"{format_size(entry['index_bytes']):>8} {index_type:>10} "
+                f"{latency['p50']:>8.3f} {latency['p95']:>8.3f} {latency['p99']:>8.3f}",
+                file=out,
+            )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the comment pipeline and transcript search")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic", help="Fake model profile (default: realistic)")
+    parser.add_argument("--concurrency", default=DEFAULT_CONCURRENCY_LEVELS, help=f"Concurrency levels (default: {DEFAULT_CONCURRENCY_LEVELS})")
+    parser.add_argument("--comments", type=int, default=100, help="Comments per concurrency level (default: 100)")
+    parser.add_argument("--search-cache", action="store_true", help="Let SearchAgent reuse cached findings")
+    parser.add_argument("--corpus-sizes", default=DEFAULT_CORPUS_SIZES, help=f"Synthetic corpus sizes (default: {DEFAULT_CORPUS_SIZES})")
+    parser.add_argument("--search-repeats", type=int, default=20, help="Runs of each search query (default: 20)")
+    parser.add_argument("--skip-pipeline", action="store_true", help="Only run the search benchmark")
+    parser.add_argument("--skip-search", action="store_true", help="Only run the pipeline benchmark")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the fake model and corpus generator")
+    parser.add_argument("--json", help="Also write the results as JSON to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict:
+    args = parse_args(argv)
+    print(f"Scratch directory: {BENCHMARK_DIR}", file=sys.stderr)
+    results: Dict = {"profile": args.profile, "scratch_dir": str(BENCHMARK_DIR)}
+
+    if not args.skip_pipeline:
+        base = load_benchmark_comments()
+        comments = [base[number % len(base)] for number in range(args.comments)]
+        levels = []
+        for concurrency in (int(level) for level in args.concurrency.split(",") if level.strip()):
+            print(f"Pipeline at concurrency {concurrency}...", file=sys.stderr)
+            levels.append(asyncio.run(run_pipeline_level(
+                comments, concurrency, PROFILES[args.profile], args.seed, args.search_cache,
+            )))
+        results["pipeline"] = levels
+        print_pipeline_report(levels)
+
+    if not args.skip_search:
+        sizes = []
+        for size in (parse_size(text) for text in args.corpus_sizes.split(",") if text.strip()):
+            print(f"Search over a {format_size(size)} corpus...", file=sys.stderr)
+            sizes.append(run_search_size(size, args.search_repeats, args.seed))
+        results["search"] = sizes
+        print_search_report(sizes)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
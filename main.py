@@ -5,11 +5,26 @@ This file initializes the agent system and provides a way to run it
 using ADK's web interface or programmatically.
 """
 
+import argparse
 import os
+import sys
+import time
 from dotenv import load_dotenv
 from google.genai import types
 from google.adk.runners import InMemoryRunner
-from root_agent import create_root_agent
+from root_agent import create_root_agent, get_root_agent
+from batch_responder import run_respond_batch
+from agents.rate_limiter import get_rate_limiter
+from tools.metrics import start_metrics_server
+from tools.token_budget import get_token_ledger
+from tools.compiled_transcript_index import build_index
+from tools.intent_classifier import (
+    CONFIDENCE_THRESHOLD,
+    REQUIRED_AGREEMENT,
+    evaluate_agreement,
+    load_decisions,
+    validated_agreement,
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,17 +34,21 @@ def setup_retry_config() -> types.HttpRetryOptions:
     """
     Configures retry options for API calls.
     
-    This handles transient errors like rate limits or temporary service unavailability
-    by automatically retrying requests with exponential backoff.
+    This handles transient server errors by retrying requests with a short
+    exponential backoff. Rate limits (429) and overload (503) are not retried
+    here: the shared rate limiter (agents/rate_limiter.py) retries those
+    itself and lowers its concurrency, instead of every request retrying alone.
     
     Returns:
         Configured HttpRetryOptions object
     """
     return types.HttpRetryOptions(
-        attempts=5,  # Maximum retry attempts
-        exp_base=7,  # Delay multiplier for exponential backoff
+        attempts=3,  # Maximum retry attempts
+        exp_base=2,  # Delay multiplier for exponential backoff
         initial_delay=1,  # Initial delay before first retry (in seconds)
-        http_status_codes=[429, 500, 503, 504]  # Retry on these HTTP errors
+        max_delay=10,  # Upper bound of any single delay (in seconds)
+        jitter=1,  # Random extra delay, so retries do not line up
+        http_status_codes=[500, 504]  # Retry on these HTTP errors (429 / 503: see the rate limiter)
     )
 
 
@@ -59,7 +78,7 @@ def main():
     
     # Create the root agent (which creates all sub-agents)
     print("📦 Creating agents...")
-    root_agent = create_root_agent(retry_config)
+    root_agent = get_root_agent(retry_config)
     print("✅ All agents created successfully!")
     
     # Create runner
@@ -77,12 +96,12 @@ def main():
     print("  See the example usage below:\n")
     print("  ```python")
     print("  import asyncio")
-    print("  from main import create_root_agent, setup_retry_config")
+    print("  from main import get_root_agent, setup_retry_config")
     print("  from google.adk.runners import InMemoryRunner")
     print("  ")
     print("  async def test():")
     print("      retry_config = setup_retry_config()")
-    print("      agent = create_root_agent(retry_config)")
+    print("      agent = get_root_agent(retry_config)")
     print("      runner = InMemoryRunner(agent=agent)")
     print("      response = await runner.run_debug('Your comment here')")
     print("  ")
@@ -93,7 +112,158 @@ def main():
     return runner
 
 
+def build_index_command(args: argparse.Namespace):
+    """
+    Compiles the transcripts into the binary index used by the transcript tool.
+    
+    Args:
+        args: Parsed command-line arguments (sources, output)
+    """
+    print("📚 Compiling transcript index...")
+    summary = build_index(args.sources or None, args.output)
+    print(f"✅ Wrote {summary['path']}")
+    print(f"   {summary['sources']} file(s), {summary['chunks']} chunks, "
+          f"{summary['terms']} terms, {summary['bytes']} bytes")
+
+
+def router_agreement_command(args: argparse.Namespace):
+    """
+    Reports how often the local intent classifier agrees with logged RouterAgent decisions.
+    
+    Args:
+        args: Parsed command-line arguments (log, folds)
+    """
+    report = evaluate_agreement(load_decisions(args.log), folds=args.folds)
+    if not report["decisions"]:
+        print("⚠️  No logged RouterAgent decisions yet - run some comments through the system first")
+        return
+    print(f"📊 {report['decisions']} logged RouterAgent decisions ({report['folds']}-fold cross-validation)")
+    print(f"{'threshold':>10} {'coverage':>10} {'agreement':>10}")
+    for row in report["thresholds"]:
+        agreement = f"{row['agreement']:.1%}" if row["agreement"] is not None else "-"
+        print(f"{row['threshold']:>10.2f} {row['coverage']:>10.1%} {agreement:>10}")
+    gate = validated_agreement(load_decisions(args.log))
+    if gate is not None and gate >= REQUIRED_AGREEMENT:
+        print(f"✅ Local routing enabled at {CONFIDENCE_THRESHOLD:.2f} (agreement {gate:.1%})")
+    else:
+        print(f"⏸️  Local routing disabled: needs {REQUIRED_AGREEMENT:.0%} agreement at {CONFIDENCE_THRESHOLD:.2f}")
+
+
+def respond_batch_command(args: argparse.Namespace):
+    """
+    Answers a file (or stdin stream) of comments with a bounded worker pool.
+    
+    Results are appended to the output as JSONL in completion order. Re-running
+    with the same output file resumes after the last completed comment.
+    
+    Args:
+        args: Parsed command-line arguments (input, output, concurrency,
+            no_resume, classify_batch_size, metrics_port)
+    """
+    if not os.environ.get("GOOGLE_API_KEY"):
+        print("⚠️  WARNING: GOOGLE_API_KEY environment variable not set!", file=sys.stderr)
+        return
+    
+    retry_config = setup_retry_config()
+    root_agent = get_root_agent(retry_config)
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = start_metrics_server(args.metrics_port)
+        print(f"📈 Metrics at http://127.0.0.1:{metrics_server.server_port}/metrics", file=sys.stderr)
+    started = time.perf_counter()
+    counters = run_respond_batch(
+        root_agent,
+        args.input,
+        args.output,
+        concurrency=args.concurrency,
+        resume=not args.no_resume,
+        classify_batch_size=args.classify_batch_size,
+        retry_config=retry_config,
+    )
+    elapsed = time.perf_counter() - started
+    # Progress goes to stderr so stdout can carry the JSONL results
+    print(f"✅ {counters['succeeded']} answered, {counters['failed']} failed, "
+          f"{counters['skipped']} already done ({counters['read']} read) in {elapsed:.1f}s",
+          file=sys.stderr)
+    limits = get_rate_limiter().snapshot()
+    print(f"   {limits['calls']} model calls, {limits['throttled']} throttled, "
+          f"{limits['retries']} retried; concurrency limit {limits['concurrency_limit']}; "
+          f"queue wait p95 {limits['queue_wait']['p95']:.2f}s, "
+          f"model time p95 {limits['model_time']['p95']:.2f}s",
+          file=sys.stderr)
+    for agent_name, totals in sorted(get_token_ledger().snapshot().items()):
+        if totals["calls"]:
+            print(f"   {agent_name}: {totals['calls']} calls, {totals['tokens_in']} tokens in, "
+                  f"{totals['tokens_out']} out, {totals['over_budget']} over budget, "
+                  f"{totals['trimmed']} trimmed",
+                  file=sys.stderr)
+    if metrics_server is not None:
+        metrics_server.shutdown()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parses command-line arguments.
+    
+    Running without a command initializes the system and prints usage
+    instructions, as before.
+    
+    Args:
+        argv: Argument list (defaults to sys.argv)
+    
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="YouTube Comment Responder")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    index_parser = subparsers.add_parser(
+        "build-index",
+        help="Compile transcripts/*.txt into a memory-mappable search index"
+    )
+    index_parser.add_argument("sources", nargs="*", help="Transcript files (default: transcripts/*.txt)")
+    index_parser.add_argument("--output", help="Index file path (default: transcripts/transcripts.idx)")
+    
+    agreement_parser = subparsers.add_parser(
+        "router-agreement",
+        help="Compare the local intent classifier with logged RouterAgent decisions"
+    )
+    agreement_parser.add_argument("--log", help="Decisions log (default: data/router_decisions.jsonl)")
+    agreement_parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds (default: 5)")
+    
+    batch_parser = subparsers.add_parser(
+        "respond-batch",
+        help="Answer comments from a JSONL file or stdin, writing JSONL results"
+    )
+    batch_parser.add_argument("input", nargs="?", default="-", help="Input JSONL file (default: stdin)")
+    batch_parser.add_argument("--output", "-o", default="-", help="Output JSONL file, also the checkpoint (default: stdout)")
+    batch_parser.add_argument("--concurrency", "-c", type=int, default=4, help="Comments processed at once (default: 4)")
+    batch_parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of resuming from it")
+    batch_parser.add_argument(
+        "--classify-batch-size", type=int, default=0,
+        help="Pre-classify comments in groups of this size with one model request each (default: off)"
+    )
+    batch_parser.add_argument(
+        "--metrics-port", type=int, default=None,
+        help="Serve Prometheus metrics at http://127.0.0.1:PORT/metrics during the run (default: off)"
+    )
+    
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    
+    if args.command == "build-index":
+        build_index_command(args)
+        raise SystemExit(0)
+    if args.command == "respond-batch":
+        respond_batch_command(args)
+        raise SystemExit(0)
+    if args.command == "router-agreement":
+        router_agreement_command(args)
+        raise SystemExit(0)
+    
     # When run directly, initialize the system
     runner = main()
     
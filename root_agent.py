@@ -2,118 +2,176 @@
 Root Coordinator Agent - Orchestrates the entire comment response workflow.
 
 This agent coordinates all the specialized agents to process a comment
-and generate an appropriate response.
+and generate an appropriate response. The routing between them is
+deterministic; see agents/comment_workflow_agent.py.
 """
 
-from google.adk.agents import Agent, SequentialAgent, ParallelAgent
-from google.adk.models.google_llm import Gemini
-from google.adk.tools import AgentTool
+import threading
+from typing import Dict, Optional, Tuple
+
+from google.adk.agents import BaseAgent, SequentialAgent
+from google.adk.models.base_llm import BaseLlm
 from google.genai import types
 
 # Import all the agents
+from agents.adaptive_research_agent import AdaptiveResearchAgent
+from agents.classifier_agent import create_classifier_agent
+from agents.comment_workflow_agent import CommentWorkflowAgent
+from agents.models import get_shared_model
 from agents.filter_agent import create_filter_agent
 from agents.router_agent import create_router_agent
 from agents.praise_responder_agent import create_praise_responder_agent
 from agents.search_agent import create_search_agent
 from agents.transcript_agent import create_transcript_agent
 from agents.synthesis_agent import create_synthesis_agent
+from agents.synthesis_stage_agent import SynthesisStageAgent
 from agents.question_responder_agent import create_question_responder_agent
+from agents.instrumentation_callbacks import apply_instrumentation
+from agents.token_budget_callbacks import apply_token_budgets
+from tools.response_cache import get_response_cache
 
 
-def create_root_agent(retry_config: types.HttpRetryOptions) -> Agent:
+def create_root_agent(
+    retry_config: types.HttpRetryOptions,
+    combined_classifier: bool = True,
+    model: Optional[BaseLlm] = None,
+    response_cache: bool = True,
+    token_budgets: bool = True,
+    instrumentation: bool = True
+) -> BaseAgent:
     """
     Creates the root coordinator agent that orchestrates the entire workflow.
     
     Workflow:
-    1. FilterAgent checks if comment is worthy (outputs "IGNORE" or "ACCEPT")
+    1. FilterAgent checks if comment is worthy (outputs "IGNORE" or "ACCEPT");
+       if IGNORE, the workflow stops with a fixed "no response needed" reply
     2. If ACCEPT, RouterAgent categorizes as "Question" or "Praise"
+       (by default steps 1 and 2 are one structured ClassifierAgent call)
     3. If "Praise" → PraiseResponderAgent generates thank-you response
-    4. If "Question" → Parallel execution:
-       - SearchAgent searches Google
-       - TranscriptAgent searches transcripts
-       Then → SynthesisAgent combines results
+    4. If "Question" → Adaptive research:
+       - The transcripts are scored locally for the question
+       - If they clearly cover it, only TranscriptAgent runs
+       - Otherwise SearchAgent (Google) and TranscriptAgent run in parallel
+       Then → results are merged in code, or by SynthesisAgent when they
+       are large or contradict each other
        Then → QuestionResponderAgent writes final answer
+    5. The praise or final response is emitted exactly as generated
+    
+    Before step 1, the response cache is checked: a comment that repeats or
+    nearly repeats an earlier praise or question gets the cached answer.
+    
+    Every agent runs under a token budget: research values, tool outputs
+    and prompts over budget are trimmed by relevance, and each model
+    call's tokens in and out are logged (see agents/token_budget_callbacks.py).
+    Every agent run, model call and tool call is timed into per-stage
+    metrics and traces (see agents/instrumentation_callbacks.py).
+    
+    The branching is plain code (CommentWorkflowAgent) reading the
+    "filter_decision" and "comment_type" session state; only the agents
+    that do real work call the model. All agents share one model instance,
+    and so one API client and connection pool.
     
     Args:
         retry_config: HTTP retry configuration for API calls
+        combined_classifier: Classify with one ClassifierAgent call instead
+            of FilterAgent followed by RouterAgent
+        model: Model for every agent (defaults to the process-wide shared
+            Gemini model for retry_config)
+        response_cache: Answer repeated comments from the process-wide
+            response cache (see tools/response_cache.py)
+        token_budgets: Enforce the token budgets and log token use
+            (see tools/token_budget.py)
+        instrumentation: Record per-agent latency, token and tool-call
+            metrics and traces (see tools/metrics.py)
     
     Returns:
-        Configured root Agent that coordinates the workflow
+        Configured root agent that coordinates the workflow
     """
+    model = model or get_shared_model(retry_config)
+    
     # Create all specialized agents
-    filter_agent = create_filter_agent(retry_config)
-    router_agent = create_router_agent(retry_config)
-    praise_agent = create_praise_responder_agent(retry_config)
-    search_agent = create_search_agent(retry_config)
-    transcript_agent = create_transcript_agent(retry_config)
-    synthesis_agent = create_synthesis_agent(retry_config)
-    question_agent = create_question_responder_agent(retry_config)
-    
-    # Create parallel agent for search + transcript (runs simultaneously)
-    parallel_research = ParallelAgent(
-        name="ParallelResearch",
-        sub_agents=[search_agent, transcript_agent]
+    if combined_classifier:
+        classifier_agents = {"classifier_agent": create_classifier_agent(retry_config, model)}
+    else:
+        classifier_agents = {
+            "filter_agent": create_filter_agent(retry_config, model),
+            "router_agent": create_router_agent(retry_config, model),
+        }
+    praise_agent = create_praise_responder_agent(retry_config, model)
+    search_agent = create_search_agent(retry_config, model)
+    transcript_agent = create_transcript_agent(retry_config, model)
+    synthesis_agent = create_synthesis_agent(retry_config, model)
+    question_agent = create_question_responder_agent(retry_config, model)
+    
+    # Research: transcripts first; search and transcript run in parallel
+    # only when the transcripts do not clearly cover the question
+    research = AdaptiveResearchAgent(
+        name="AdaptiveResearch",
+        search_agent=search_agent,
+        transcript_agent=transcript_agent
+    )
+    
+    # Synthesis: small, consistent research is merged in code; the
+    # SynthesisAgent only runs for large or contradictory inputs
+    synthesis = SynthesisStageAgent(
+        name="SynthesisStage",
+        synthesis_agent=synthesis_agent
     )
     
     # Create sequential pipeline for question handling
-    # Step 1: Run search and transcript in parallel
+    # Step 1: Research (transcripts, plus web search when needed)
     # Step 2: Synthesize the results
     # Step 3: Generate final answer
     question_pipeline = SequentialAgent(
         name="QuestionPipeline",
-        sub_agents=[parallel_research, synthesis_agent, question_agent]
+        sub_agents=[research, synthesis, question_agent]
     )
     
-    # Root agent uses LLM to coordinate the workflow
-    # It decides which path to take based on filter and router decisions
-    root_agent = Agent(
+    # Root agent branches on the filter and router decisions in code, so
+    # coordination costs no model calls and responses pass through verbatim
+    root_agent = CommentWorkflowAgent(
         name="CommentResponderCoordinator",
-        model=Gemini(
-            model="gemini-2.5-flash-lite",
-            retry_options=retry_config
-        ),
-        instruction="""You are the coordinator for a YouTube comment response system.
-
-WORKFLOW:
-1. First, you MUST call FilterAgent to check if the comment is worthy
-   - If FilterAgent outputs "IGNORE", respond with: "This comment doesn't need a response."
-   - If FilterAgent outputs "ACCEPT", continue to step 2
-
-2. Call RouterAgent to categorize the comment
-   - RouterAgent will output "Question" or "Praise"
+        praise_agent=praise_agent,
+        question_pipeline=question_pipeline,
+        response_cache=get_response_cache() if response_cache else None,
+        **classifier_agents,
+    )
+    
+    # Instrumentation goes first: a trimming after-tool callback that
+    # returns a new response stops the callbacks after it
+    if instrumentation:
+        apply_instrumentation(root_agent)
+    if token_budgets:
+        apply_token_budgets(root_agent)
+    
+    return root_agent
 
-3. Based on RouterAgent's output:
-   - If "Praise": You MUST call PraiseResponderAgent to generate a thank-you response in Hinglish style
-   - If "Question": 
-     a. Call QuestionPipeline (which runs SearchAgent and TranscriptAgent in parallel,
-        then SynthesisAgent, then QuestionResponderAgent)
-     b. The QuestionPipeline will handle everything automatically
 
-4. CRITICAL: Output the response EXACTLY as received - copy it word-for-word
 
-ABSOLUTE RULES FOR RESPONSE HANDLING:
-- When PraiseResponderAgent or QuestionPipeline returns a response, you MUST copy it EXACTLY
-- DO NOT add any text before or after the response
-- DO NOT reformat, summarize, translate, or rewrite
-- DO NOT convert Hinglish to English
-- DO NOT make it more formal
-- DO NOT add explanations like "Based on the information..." or "Here's the answer..."
-- Just output the response text exactly as you received it
+_root_agents: Dict[Tuple[str, bool], BaseAgent] = {}
+_root_agents_lock = threading.Lock()
 
-EXAMPLE:
-If QuestionPipeline returns: "Official 2025 cutoffs toh abhi release nahi hue hain, par general category ke liye around 750-780 score chahiye hota hai..."
-You MUST output EXACTLY: "Official 2025 cutoffs toh abhi release nahi hue hain, par general category ke liye around 750-780 score chahiye hota hai..."
-DO NOT output: "The GATE cutoff for IIT Bombay..." (this is wrong - you reformatted it)
 
-Your ONLY job is to call the right agents and pass through their responses unchanged.
-        """,
-        tools=[
-            AgentTool(agent=filter_agent),
-            AgentTool(agent=router_agent),
-            AgentTool(agent=praise_agent),
-            AgentTool(agent=question_pipeline)  # The entire question pipeline as one tool
-        ]
-    )
+def get_root_agent(
+    retry_config: types.HttpRetryOptions,
+    combined_classifier: bool = True
+) -> BaseAgent:
+    """
+    Returns the root agent for a configuration, building the graph only once.
     
-    return root_agent
-
+    Agents hold no per-comment state (that lives in the session), so one
+    graph serves every comment and every runner in the process.
+    
+    Args:
+        retry_config: HTTP retry configuration for API calls
+        combined_classifier: See create_root_agent()
+    
+    Returns:
+        Shared root agent
+    """
+    key = (retry_config.model_dump_json(), combined_classifier)
+    with _root_agents_lock:
+        root_agent = _root_agents.get(key)
+        if root_agent is None:
+            root_agent = _root_agents[key] = create_root_agent(retry_config, combined_classifier)
+        return root_agent
@@ -0,0 +1,97 @@
+"""
+Tests for batch id validation and re-batching (agents/batch_classifier.py).
+
+Run with: python -m pytest test_batch_classifier.py
+"""
+
+import asyncio
+import json
+
+from agents.batch_classifier import BatchCommentClassifier
+from agents.fake_model import FakeLlm
+
+
+COMMENTS = [(f"c{number}", f"comment number {number}") for number in range(8)]
+
+
+class ScriptedModel:
+    """Answers batch prompts through a per-call script and records batch sizes."""
+
+    def __init__(self, answer_batch):
+        self.answer_batch = answer_batch
+        self.batches = []
+        self.singles = 0
+
+    def __call__(self, llm_request):
+        prompt = llm_request.contents[0].parts[0].text
+        try:
+            items = json.loads(prompt)
+        except json.JSONDecodeError:
+            self.singles += 1
+            return {"decision": "ACCEPT", "type": "Praise"}
+        ids = [item["id"] for item in items]
+        self.batches.append(ids)
+        return self.answer_batch(len(self.batches), ids)
+
+
+def classify(answer_batch, batch_size=4, max_retries=1):
+    script = ScriptedModel(answer_batch)
+    classifier = BatchCommentClassifier(
+        FakeLlm(model="gemini-fake", reply=script), batch_size=batch_size, max_retries=max_retries, use_local=False,
+    )
+    results = asyncio.run(classifier.classify(COMMENTS))
+    return results, script, classifier.stats
+
+
+def item(comment_id, decision="ACCEPT", comment_type="Question"):
+    return {"id": comment_id, "decision": decision, "type": comment_type}
+
+
+def test_complete_batches_need_no_retry():
+    results, script, stats = classify(lambda call, ids: [item(comment_id) for comment_id in ids])
+    assert [len(batch) for batch in script.batches] == [4, 4]
+    assert {result["source"] for result in results.values()} == {"batch"}
+    assert stats["batched"] == 8 and stats["retried"] == 0 and script.singles == 0
+
+
+def test_missing_ids_are_retried_in_half_size_batches():
+    def answer(call, ids):
+        # First round drops the last id of each batch
+        return [item(comment_id) for comment_id in (ids[:-1] if call <= 2 else ids)]
+
+    results, script, stats = classify(answer)
+    assert [len(batch) for batch in script.batches] == [4, 4, 2]
+    assert sorted(script.batches[2]) == ["c3", "c7"]
+    assert results["c3"]["source"] == "batch_retry"
+    assert len(results) == 8 and stats["retried"] == 2
+
+
+def test_duplicated_and_unknown_ids_are_rejected():
+    def answer(call, ids):
+        answered = [item(comment_id) for comment_id in ids]
+        if call <= 2 and "c0" in ids:
+            answered += [item("c0", comment_type="Praise"), item("c99")]
+        return answered
+
+    results, script, _ = classify(answer)
+    assert "c99" not in results
+    assert script.batches[2:] == [["c0"]]
+    assert results["c0"]["source"] == "batch_retry"
+
+
+def test_malformed_items_are_skipped():
+    def answer(call, ids):
+        if call <= 2 and "c0" in ids:
+            return [{"id": "c0", "decision": "MAYBE", "type": "Question"}, *map(item, ids[1:])]
+        return [item(comment_id) for comment_id in ids]
+
+    results, _, _ = classify(answer)
+    assert results["c0"]["source"] == "batch_retry"
+    assert results["c1"]["source"] == "batch"
+
+
+def test_ids_still_missing_fall_back_to_single_calls():
+    results, script, stats = classify(lambda call, ids: [item(comment_id) for comment_id in ids if comment_id != "c5"])
+    assert script.singles == 1
+    assert results["c5"]["source"] == "single"
+    assert stats["single"] == 1 and stats["failed"] == 0
@@ -0,0 +1,78 @@
+"""
+Tests for the compiled transcript index (tools/compiled_transcript_index.py).
+
+Run with: python -m pytest test_compiled_transcript_index.py
+"""
+
+import os
+import shutil
+
+from tools.compiled_transcript_index import compile_index, load_compiled_index
+
+
+TRANSCRIPT = """Video 1: GATE preparation
+GATE score matters for MTech admission.
+Start with previous year papers.
+"""
+
+
+def write_sources(root):
+    """Two transcripts with the same file name in different directories."""
+    paths = []
+    for folder in ("hindi", "english"):
+        os.makedirs(root / folder)
+        path = root / folder / "video.txt"
+        path.write_text(TRANSCRIPT, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_same_file_names_keep_separate_spans(tmp_path):
+    compile_index(write_sources(tmp_path), str(tmp_path / "index.idx"))
+    index = load_compiled_index(str(tmp_path / "index.idx"))
+    results = index.search("GATE score", top_k=5)
+    assert len(results) == 2
+    assert results[0][0].source != results[1][0].source
+
+
+def test_moved_checkout_is_not_stale(tmp_path):
+    transcripts = tmp_path / "checkout" / "transcripts"
+    os.makedirs(transcripts)
+    for name in ("a.txt", "b.txt"):
+        (transcripts / name).write_text(TRANSCRIPT, encoding="utf-8")
+    source_glob = str(transcripts / "*.txt")
+    compile_index([str(transcripts / "a.txt"), str(transcripts / "b.txt")], str(transcripts / "index.idx"), source_glob)
+    moved = tmp_path / "moved"
+    shutil.copytree(tmp_path / "checkout", moved)
+    index = load_compiled_index(str(moved / "transcripts" / "index.idx"))
+    assert index is not None
+    assert index.source_glob == str(moved / "transcripts" / "*.txt")
+
+
+def rebuild(sources, output, previous):
+    """Recompiles an index and makes sure its mtime moves past the loaded one's."""
+    compile_index(sources, output)
+    mtime_ns = previous.file_mtime_ns + 10**9
+    os.utime(output, ns=(mtime_ns, mtime_ns))
+
+
+def test_reload_closes_the_previous_mapping(tmp_path):
+    sources = write_sources(tmp_path)
+    output = str(tmp_path / "index.idx")
+    compile_index(sources[:1], output)
+    first = load_compiled_index(output)
+    rebuild(sources, output, first)
+    second = load_compiled_index(output)
+    assert second.num_chunks == 2
+    assert first._mmap.closed
+
+
+def test_chunks_outlive_a_reload(tmp_path):
+    sources = write_sources(tmp_path)
+    output = str(tmp_path / "index.idx")
+    compile_index(sources[:1], output)
+    first = load_compiled_index(output)
+    held = first.get_chunk(0)
+    rebuild(sources, output, first)
+    load_compiled_index(output)
+    assert list(held.token_starts) == sorted(held.token_starts)
@@ -0,0 +1,76 @@
+"""
+Tests for the local Question / Praise classifier (tools/intent_classifier.py).
+
+Run with: python -m pytest test_intent_classifier.py
+"""
+
+import pytest
+
+from tools.intent_classifier import (
+    MIN_VALIDATION_DECISIONS,
+    IntentClassifier,
+    train_intent_classifier,
+    training_examples,
+)
+
+
+TOPICS = [
+    "mutual funds", "MTech admission", "GATE preparation", "crypto", "stock market",
+    "home loans", "PhD stipend", "startups", "gold bonds", "credit cards",
+    "insurance", "taxes", "freelancing", "IIT placements", "real estate",
+]
+
+
+def model_decisions(count):
+    """Consistently labeled model decisions, half questions and half praise."""
+    records = []
+    for number in range(count):
+        topic = TOPICS[number % len(TOPICS)]
+        if number % 2:
+            records.append({"comment": f"How do I get started with {topic} #{number}?",
+                            "comment_type": "Question", "source": "model"})
+        else:
+            records.append({"comment": f"Great video on {topic} #{number}, thank you sir",
+                            "comment_type": "Praise", "source": "model"})
+    return records
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    """A classifier trained on the gold comments only."""
+    return IntentClassifier(training_examples([]))
+
+
+@pytest.mark.parametrize("comment", [
+    "Kya baat hai sir",
+    "Kya baat hai sir, bahut badiya",
+])
+def test_kya_exclamation_is_praise(classifier, comment):
+    assert classifier.predict(comment)[0] == "Praise"
+
+
+@pytest.mark.parametrize("comment", [
+    "Kya main crypto me invest kar sakta hu?",
+    "kya ye course free milega",
+])
+def test_kya_with_question_verb_is_question(classifier, comment):
+    assert classifier.predict(comment)[0] == "Question"
+
+
+def test_unvalidated_classifier_never_decides():
+    classifier = train_intent_classifier(model_decisions(MIN_VALIDATION_DECISIONS - 1))
+    assert classifier.agreement is None
+    assert classifier.decide("How do I start investing?") is None
+
+
+def test_validated_classifier_decides():
+    classifier = train_intent_classifier(model_decisions(MIN_VALIDATION_DECISIONS + 10))
+    assert classifier.validated
+    assert classifier.decide("How do I start investing in mutual funds?")[0] == "Question"
+
+
+def test_disagreeing_model_keeps_local_routing_off():
+    decisions = model_decisions(MIN_VALIDATION_DECISIONS + 10)
+    for record in decisions[::3]:
+        record["comment_type"] = "Praise" if record["comment_type"] == "Question" else "Question"
+    assert not train_intent_classifier(decisions).validated
@@ -0,0 +1,55 @@
+"""
+Tests for merging transcript and web findings (tools/research_merge.py).
+
+Run with: python -m pytest test_research_merge.py
+"""
+
+import pytest
+
+from tools.research_merge import merge_research, split_sentences
+
+
+def test_split_sentences_strips_markdown_and_fragments():
+    text = "Findings:\n- **Stipend** is 12400 per month. Paid monthly.\n1. GATE score matters a lot\n> Ok."
+    assert split_sentences(text) == ["Stipend is 12400 per month.", "GATE score matters a lot"]
+
+
+def test_agreeing_duplicates_keep_the_transcript_sentence():
+    merged = merge_research(
+        "MTech stipend at IIT is 12400 per month.",
+        "The MTech stipend at IIT is 12400 per month.",
+    )
+    assert merged["kept"] == 1 and merged["dropped"] == 1
+    assert "[Transcript] MTech stipend" in merged["text"]
+    assert merged["contradictions"] == []
+
+
+@pytest.mark.parametrize("transcript,web", [
+    ("MTech stipend at IIT is 12400 per month.", "MTech stipend at IIT is 15000 per month."),
+    ("You can apply for GATE after final year.", "You cannot apply for GATE after final year."),
+    ("You can apply for GATE after final year.", "You can't apply for GATE after final year."),
+    ("PSUs do recruit through GATE scores.", "PSUs do not recruit through GATE scores."),
+])
+def test_disagreeing_sentences_are_contradictions(transcript, web):
+    merged = merge_research(transcript, web)
+    assert merged["contradictions"] == [(transcript, web)]
+    assert merged["kept"] == 2  # The web sentence is not dropped as a duplicate
+
+
+@pytest.mark.parametrize("transcript,web", [
+    # Digit grouping and extra numbers (a video number, a year) still agree
+    ("MTech stipend at IIT is 12400 per month.", "MTech stipend at IIT is Rs 12,400 per month."),
+    ("Video 5 says the stipend is 12400 per month.", "The stipend is 12400 per month."),
+    ("Both can't and cannot are negations here.", "Both can't and cannot are negations there."),
+    # Different topics may carry different numbers
+    ("MTech stipend at IIT is 12400 per month.", "GATE registration fee is 1800 for general candidates."),
+])
+def test_agreeing_or_unrelated_sentences_are_not_contradictions(transcript, web):
+    assert merge_research(transcript, web)["contradictions"] == []
+
+
+def test_missing_and_unavailable_sources_are_noted():
+    merged = merge_research("", "UNAVAILABLE: search quota exceeded")
+    assert "No relevant information was found" in merged["text"]
+    assert "Missing: no findings from the video transcripts." in merged["text"]
+    assert "Note: UNAVAILABLE: search quota exceeded" in merged["text"]
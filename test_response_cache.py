@@ -0,0 +1,128 @@
+"""
+Tests for the response cache (tools/response_cache.py).
+
+Run with: python -m pytest test_response_cache.py
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from tools.response_cache import (
+    DEFAULT_POLICIES,
+    MinHasher,
+    ResponseCache,
+    estimated_similarity,
+    normalize_comment,
+)
+
+
+@pytest.fixture
+def cache():
+    """An in-memory cache holding a few praise replies."""
+    cache = ResponseCache(path=None)
+    cache.store("Thank you sir for the MTech video", "Welcome!", "Praise")
+    cache.store("Great video sir, very helpful", "Glad it helped!", "Praise")
+    return cache
+
+
+@pytest.mark.parametrize("comment", [
+    "Thank you sir for the MTech video but stipend kitna?",
+    "Thank you sir for the MTech video. Is it free?",
+    "Thank you sir. MTech video kab?",
+    "Great video sir, very helpful?",
+])
+def test_praise_is_never_served_to_questions(cache, comment):
+    assert cache.lookup(comment) is None
+
+
+def test_praise_rewordings_still_hit(cache):
+    hit = cache.lookup("THANKU sir for the mtech video!!")
+    assert hit is not None
+    assert hit["response"] == "Welcome!"
+
+
+# Pairs whose trigram Jaccard spans the policy thresholds (0.82, 0.92, 0.79, 0.0)
+SIMILARITY_PAIRS = [
+    ("how much stipend in mtech at iit", "how much stipend in mtech at iit bombay"),
+    ("can i do mba after mtech", "can i do mtech after mba"),
+    ("thank you sir for the mtech video", "thank you so much sir for this mtech video"),
+    ("what is a good gate score for iit", "best mobile phone under 20000"),
+]
+
+
+def trigram_jaccard(hasher, first, second):
+    first_shingles, second_shingles = hasher.shingles(first), hasher.shingles(second)
+    return len(first_shingles & second_shingles) / len(first_shingles | second_shingles)
+
+
+@pytest.mark.parametrize("first,second", SIMILARITY_PAIRS)
+def test_minhash_estimates_trigram_jaccard(first, second):
+    hasher = MinHasher()
+    estimate = estimated_similarity(hasher.signature(first), hasher.signature(second))
+    # 64 permutations: the standard error is at most 0.0625
+    assert abs(estimate - trigram_jaccard(hasher, first, second)) < 0.15
+
+
+def test_signatures_are_deterministic():
+    assert np.array_equal(MinHasher().signature("gate score"), MinHasher().signature("gate score"))
+    assert estimated_similarity(MinHasher().signature("gate score"), MinHasher().signature("gate score")) == 1.0
+
+
+def test_lsh_finds_close_pairs_and_skips_unrelated_ones():
+    cache = ResponseCache(path=None)
+    close = normalize_comment("how much stipend in mtech at iit bombay")
+    cache.store("how much stipend in mtech at iit", "About 12400 per month.", "Question")
+    assert cache._candidates(cache.hasher.signature(close))
+    assert not cache._candidates(cache.hasher.signature(normalize_comment("best mobile phone under 20000")))
+
+
+def test_question_rewording_below_threshold_misses():
+    cache = ResponseCache(path=None)
+    cache.store("how much stipend in mtech at iit", "About 12400 per month.", "Question")
+    assert cache.lookup("how much stipend in mtech at iit?")["match"] == "exact"
+    # Trigram Jaccard ~0.82 is below the Question policy's 0.85
+    assert cache.lookup("how much stipend in mtech at iit bombay?") is None
+
+
+def test_questions_must_keep_word_order_and_numbers():
+    cache = ResponseCache(path=None)
+    cache.store("Can I do MBA after MTech?", "Yes, many do.", "Question")
+    cache.store("Is a GATE score of 600 good?", "It is a decent score.", "Question")
+    assert cache.lookup("Can I do MTech after MBA?") is None
+    assert cache.lookup("Is a GATE score of 700 good?") is None
+
+
+def test_praise_threshold_is_looser():
+    cache = ResponseCache(path=None)
+    cache.store("thank you sir for the mtech video", "Welcome!", "Praise")
+    hit = cache.lookup("thank you so much sir for this mtech video")
+    assert hit is not None and hit["match"] == "near"
+    assert hit["similarity"] >= DEFAULT_POLICIES["Praise"].min_similarity
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    cache = ResponseCache(path=None)
+    cache.store("Great video sir", "Thanks!", "Praise")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + DEFAULT_POLICIES["Praise"].ttl_seconds + 1)
+    assert cache.lookup("Great video sir") is None
+    assert cache.stats()["expired"] == 1 and cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2, path=None)
+    cache.store("Great video sir", "Thanks!", "Praise")
+    cache.store("Very informative video", "Glad you liked it!", "Praise")
+    cache.lookup("Great video sir")
+    cache.store("Superb explanation of GATE", "Thank you!", "Praise")
+    assert cache.lookup("Great video sir") is not None
+    assert cache.lookup("Very informative video") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResponseCache(path=path).store("Great video sir", "Thanks!", "Praise")
+    assert ResponseCache(path=path).lookup("great video sir!!")["response"] == "Thanks!"
@@ -0,0 +1,129 @@
+"""
+Tests for the search cache and its SearchAgent callbacks (tools/search_cache.py, agents/search_agent.py).
+
+Run with: python -m pytest test_search_cache.py
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types
+
+import agents.search_agent as search_agent
+from tools.search_cache import DAY, HOUR, SearchCache, topic_ttl
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.time()."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize("question,topic,ttl", [
+    ("gate cutoff for iit bombay", "announcements", 6 * HOUR),
+    ("mtech stipend at iit", "figures", 3 * DAY),
+    ("best books for gate preparation", "evergreen", 14 * DAY),
+    ("is iit better than nit", "general", DAY),
+    ("cutoff and stipend for mtech", "announcements", 6 * HOUR),
+])
+def test_topic_ttls(question, topic, ttl):
+    assert topic_ttl(question) == (topic, ttl)
+
+
+def test_fresh_entry_hits_until_its_ttl(clock):
+    cache = SearchCache(":memory:")
+    cache.store("What is the GATE cutoff?", "Cutoff was 32.5 last year.")
+    hit = cache.lookup("what is the gate cutoff")
+    assert hit["results"] == "Cutoff was 32.5 last year." and not hit["stale"]
+    clock[0] += 6 * HOUR
+    assert cache.lookup("What is the GATE cutoff?") is None
+    assert cache.stats()["fresh_hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_stale_while_revalidate_serves_aged_entries_up_to_the_limit(clock):
+    cache = SearchCache(":memory:", stale_while_revalidate=True, max_stale_seconds=DAY)
+    cache.store("mtech stipend at iit", "12400 per month.")
+    clock[0] += 3 * DAY + HOUR
+    hit = cache.lookup("mtech stipend at iit")
+    assert hit["stale"] and hit["age_seconds"] == round(3 * DAY + HOUR)
+    clock[0] += DAY
+    assert cache.lookup("mtech stipend at iit") is None
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_purge_keeps_entries_that_may_still_be_served(clock):
+    strict = SearchCache(":memory:")
+    lenient = SearchCache(":memory:", stale_while_revalidate=True, max_stale_seconds=DAY)
+    for cache in (strict, lenient):
+        cache.store("gate cutoff", "32.5")
+    clock[0] += 7 * HOUR
+    assert strict.purge() == 1
+    assert lenient.purge() == 0
+
+
+def test_empty_findings_are_not_cached():
+    cache = SearchCache(":memory:")
+    assert not cache.store("gate cutoff", "   ")
+    assert not cache.store("🙏🙏", "something")
+
+
+def callback_context(question, state=None):
+    """The parts of a CallbackContext the search callbacks use."""
+    return SimpleNamespace(
+        user_content=types.Content(role="user", parts=[types.Part(text=question)]),
+        state=dict(state or {}),
+        get_invocation_context=lambda: SimpleNamespace(agent="search-agent"),
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch, clock):
+    cache = SearchCache(":memory:", stale_while_revalidate=True, max_stale_seconds=DAY)
+    monkeypatch.setattr(search_agent, "get_search_cache", lambda: cache)
+    return cache
+
+
+def test_stale_hit_is_served_and_refreshed(cache, clock, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(search_agent, "_schedule_refresh", lambda agent, question: scheduled.append(question))
+    cache.store("gate cutoff", "32.5")
+    context = callback_context("gate cutoff")
+    assert search_agent.cached_search_callback(context).parts[0].text == "32.5"
+    assert context.state["search_source"] == "cache" and not scheduled
+    clock[0] += 7 * HOUR
+    context = callback_context("gate cutoff")
+    assert search_agent.cached_search_callback(context).parts[0].text == "32.5"
+    assert context.state["search_source"] == "cache_stale" and scheduled == ["gate cutoff"]
+
+
+def test_refresh_bypasses_the_cache_and_stores_new_findings(cache):
+    cache.store("gate cutoff", "32.5")
+    context = callback_context("gate cutoff", {search_agent.SEARCH_CACHE_BYPASS: True})
+    assert search_agent.cached_search_callback(context) is None
+    context.state["search_results"] = "33.0"
+    search_agent.store_search_results_callback(context)
+    assert cache.lookup("gate cutoff")["results"] == "33.0"
+
+
+def test_one_background_refresh_per_question(monkeypatch):
+    calls = []
+
+    async def refresh(agent, question):
+        calls.append(question)
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(search_agent, "refresh_search_results", refresh)
+
+    async def main():
+        for _ in range(3):
+            search_agent._schedule_refresh("search-agent", "GATE cutoff")
+        await asyncio.gather(*search_agent._refresh_tasks)
+        search_agent._schedule_refresh("search-agent", "GATE cutoff")
+        await asyncio.gather(*search_agent._refresh_tasks)
+
+    asyncio.run(main())
+    assert calls == ["GATE cutoff", "GATE cutoff"]
@@ -1,33 +1,69 @@
 """
 Simple test script to verify the system works correctly.
 
-Run this to test the comment responder with sample comments.
+Run this to test the comment responder with sample comments
+(python test_system.py, needs GOOGLE_API_KEY). The pre-filter checks run
+offline and are also collected by pytest.
 """
 
 import asyncio
 import os
-from main import create_root_agent, setup_retry_config
+import uuid
+from main import get_root_agent, setup_retry_config
 from google.adk.runners import InMemoryRunner
+from tools.comment_prefilter import CommentPrefilter
 
 
-async def test_comment(comment: str):
+# Comments the local pre-filter must not ignore on its own (they contain
+# blocklisted phrases but are real questions), and spam it must still catch
+PREFILTER_CASES = [
+    ("Can I earn money during MTech?", None),
+    ("Is work from home possible after MS?", None),
+    ("Sir how to earn money as a fresher after BTech?", None),
+    ("earn money from home, check my channel t.me/freecash", "IGNORE"),
+    ("Join my telegram for free crypto signals www.pumpgroup.xyz", "IGNORE"),
+    # Typos like "aaya.In" are not links, and ranks are not phone numbers
+    ("Sir mera rank 1200 1500 2000 aaya.In which NIT can I get CSE?", None),
+    ("video.In sir bahut accha explain kiya", None),
+    # A "?" needs a blocklist phrase plus a link or phone number to be ignored locally
+    ("Sir telegram pe notes milenge?share link t.me/xyz", None),
+    ("Earn money fast? whatsapp +91 98765 43210", "IGNORE"),
+    ("call 9876543210 for paid promotion", "IGNORE"),
+]
+
+
+def test_prefilter():
+    """
+    Checks the local pre-filter on PREFILTER_CASES (no API key needed).
+
+    An expected decision of None means the comment must not be ignored
+    locally (it is accepted or left to the model).
+    """
+    prefilter = CommentPrefilter()
+    for comment, expected in PREFILTER_CASES:
+        result = prefilter.decide(comment)
+        decision = result.decision if result else None
+        if expected:
+            assert decision == expected, f"{comment!r}: expected {expected}, got {decision or 'model'}"
+        else:
+            assert decision != "IGNORE", f"{comment!r} was ignored locally ({result.to_dict()})"
+
+
+async def run_comment(runner: InMemoryRunner, comment: str):
     """
     Test the system with a sample comment.
     
     Args:
+        runner: Runner shared by all test comments
         comment: The comment to test
     """
     print(f"\n{'='*60}")
     print(f"Testing comment: {comment}")
     print(f"{'='*60}\n")
     
-    # Setup
-    retry_config = setup_retry_config()
-    agent = create_root_agent(retry_config)
-    runner = InMemoryRunner(agent=agent)
-    
     # Process comment
-    response = await runner.run_debug(comment)
+    # One session per comment so earlier comments don't leak into the context
+    response = await runner.run_debug(comment, session_id=f"test-{uuid.uuid4().hex[:8]}")
     
     # Print response
     print("\n--- RESPONSE ---")
@@ -41,6 +77,12 @@ async def test_comment(comment: str):
 
 async def main():
     """Run test cases."""
+    try:
+        test_prefilter()
+        print("✅ Pre-filter regression cases passed")
+    except AssertionError as e:
+        print(f"⚠️  Pre-filter regression case failed: {e}")
+
     # Check API key
     if not os.environ.get("GOOGLE_API_KEY"):
         print("⚠️  ERROR: GOOGLE_API_KEY not set!")
@@ -58,9 +100,13 @@ async def main():
         "Love your teaching style!",  # Praise - should get thank you
     ]
     
+    # Build the agent graph once and share the runner across comments
+    retry_config = setup_retry_config()
+    agent = get_root_agent(retry_config)
+    runner = InMemoryRunner(agent=agent)
+    
     for comment in test_cases:
-        await test_comment(comment)
-        await asyncio.sleep(1)  # Small delay between tests
+        await run_comment(runner, comment)
 
 
 if __name__ == "__main__":
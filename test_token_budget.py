@@ -0,0 +1,124 @@
+"""
+Tests for token counting, trimming and the token ledger (tools/token_budget.py).
+
+Run with: python -m pytest test_token_budget.py
+"""
+
+import json
+
+import pytest
+
+from tools.token_budget import (
+    DEFAULT_AGENT_BUDGET,
+    TRIM_MARKER,
+    TokenLedger,
+    agent_budget,
+    count_tokens,
+    trim_text,
+    trim_tool_response,
+)
+
+
+@pytest.mark.parametrize("text,tokens", [
+    ("", 0),
+    ("abcd", 1),
+    ("abcde", 2),
+    ("123456", 2),
+    ("1234567", 3),
+    ("sir!", 2),
+    ("🙏🙏", 2),
+])
+def test_count_tokens(text, tokens):
+    assert count_tokens(text) == tokens
+
+
+FINDINGS = "\n".join([
+    "Video 1 talks about hostel life and food at IIT campuses in detail.",
+    "Video 2 says the MTech stipend is 12400 per month for GATE qualified students.",
+    "Video 3 covers sports facilities, gyms and the swimming pool on campus.",
+    "Video 4 explains that the stipend is paid only while attendance stays above 75 percent.",
+    "Video 5 lists coaching institutes and their fees for GATE preparation.",
+])
+
+
+def test_text_within_budget_is_unchanged():
+    assert trim_text(FINDINGS, count_tokens(FINDINGS)) == FINDINGS
+
+
+def test_trim_keeps_relevant_lines_in_order_within_budget():
+    # Room for the two stipend lines and the marker, not for a third line
+    budget = 75
+    trimmed = trim_text(FINDINGS, budget, query="What is the MTech stipend?")
+    original = FINDINGS.splitlines()
+    assert trimmed.splitlines() == [original[1], original[3], TRIM_MARKER]
+    assert count_tokens(trimmed) <= budget
+
+
+def test_long_lines_are_trimmed_by_sentence():
+    text = " ".join(f"Sentence {number} is about campus life and hostels." for number in range(30))
+    text += " The MTech stipend is 12400 per month."
+    trimmed = trim_text(text, 40, query="stipend")
+    assert "The MTech stipend is 12400 per month." in trimmed
+    assert count_tokens(trimmed) <= 40
+
+
+def test_budget_smaller_than_the_marker_truncates_words():
+    trimmed = trim_text(FINDINGS, 10)
+    assert TRIM_MARKER not in trimmed
+    assert FINDINGS.startswith(trimmed) and count_tokens(trimmed) <= 10
+
+
+def test_oversized_best_segment_keeps_its_start():
+    text = "short unrelated line\n" + "stipend " * 200
+    trimmed = trim_text(text, 40, query="stipend")
+    assert trimmed.startswith("stipend stipend") and trimmed.endswith(TRIM_MARKER)
+    assert count_tokens(trimmed) <= 40
+
+
+def test_tool_response_drops_lowest_ranked_matches():
+    matches = [{"excerpt": f"match {number} " + "word " * 40} for number in range(6)]
+    response = {"status": "success", "count": 6, "message": "Found 6 matches", "matches": matches}
+    trimmed, dropped = trim_tool_response(response, budget=150)
+    assert dropped > 0 and trimmed["count"] == 6 - dropped
+    assert trimmed["matches"] == matches[:trimmed["count"]]
+    assert f"({dropped} lower-ranked match(es) left out" in trimmed["message"]
+    assert response["count"] == 6  # The original is not modified
+
+
+def test_tool_response_keeps_at_least_one_match():
+    response = {"matches": [{"excerpt": "word " * 500}]}
+    trimmed, dropped = trim_tool_response(response, budget=50)
+    assert dropped == 0 and len(trimmed["matches"]) == 1
+
+
+def test_responses_without_matches_are_unchanged():
+    response = {"status": "error", "message": "word " * 1000}
+    assert trim_tool_response(response, budget=10) == (response, 0)
+
+
+def test_agents_without_a_budget_get_the_default():
+    assert agent_budget("SomeNewAgent") == DEFAULT_AGENT_BUDGET
+
+
+def test_ledger_totals_and_log(tmp_path):
+    log = tmp_path / "tokens.jsonl"
+    ledger = TokenLedger(log)
+    ledger.record_call("SearchAgent", 3000, 200, 2500, "usage", "inv-1")
+    ledger.record_call("SearchAgent", 1000, 100, 2500, "estimate", "inv-2")
+    ledger.record_call("RouterAgent", 300, 0, 1200, "cancelled", "inv-2")
+    ledger.record_trim("SearchAgent")
+    assert ledger.snapshot() == {
+        "SearchAgent": {"calls": 2, "tokens_in": 4000, "tokens_out": 300, "over_budget": 1, "trimmed": 1},
+        "RouterAgent": {"calls": 1, "tokens_in": 300, "tokens_out": 0, "over_budget": 0, "trimmed": 0},
+    }
+    records = [json.loads(line) for line in log.read_text(encoding="utf-8").splitlines()]
+    assert [record["source"] for record in records] == ["usage", "estimate", "cancelled"]
+    assert records[0]["invocation_id"] == "inv-1" and records[0]["budget"] == 2500
+
+
+def test_ledger_survives_an_unwritable_log(tmp_path):
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("", encoding="utf-8")
+    ledger = TokenLedger(blocker / "tokens.jsonl")
+    ledger.record_call("SearchAgent", 10, 1, 2500, "usage")
+    assert ledger.snapshot()["SearchAgent"]["calls"] == 1
@@ -0,0 +1,57 @@
+"""
+Tests for incremental refresh of the transcript index (tools/transcript_index.py).
+
+Run with: python -m pytest test_transcript_index.py
+"""
+
+import os
+
+import pytest
+
+import tools.transcript_index as transcript_index
+from tools.transcript_index import TranscriptIndex
+
+
+FIRST_VIDEO = "Video 1: GATE preparation\nGATE score matters for MTech admission.\n"
+SECOND_VIDEO = "Video 2: Placements\nIIT placements depend on the branch.\n"
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    """A transcripts file hashed in 16-byte blocks, so it spans several."""
+    monkeypatch.setattr(transcript_index, "HASH_BLOCK_BYTES", 16)
+    path = tmp_path / "transcripts.txt"
+    path.write_bytes(FIRST_VIDEO.encode("utf-8"))
+    return path
+
+
+def rewrite(path, data):
+    """Writes data and moves the mtime forward so the change is always seen."""
+    mtime_ns = path.stat().st_mtime_ns + 10**9
+    path.write_bytes(data.encode("utf-8"))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_append_indexes_only_new_text(source):
+    index = TranscriptIndex.from_file(str(source))
+    rewrite(source, FIRST_VIDEO + SECOND_VIDEO)
+    assert index.refresh() == "appended"
+    assert index.search("placements branch", top_k=1)[0][0].video_number == 2
+    assert index.block_hashes == transcript_index._block_hashes(source.read_bytes())
+
+
+def test_rewritten_tail_rebuilds(source):
+    index = TranscriptIndex.from_file(str(source))
+    rewrite(source, FIRST_VIDEO.replace("admission", "interviews") + SECOND_VIDEO)
+    assert index.refresh() == "rebuilt"
+
+
+def test_shrunk_file_rebuilds(source):
+    index = TranscriptIndex.from_file(str(source))
+    rewrite(source, FIRST_VIDEO[:20])
+    assert index.refresh() == "rebuilt"
+
+
+def test_unchanged_file_is_not_reread(source):
+    index = TranscriptIndex.from_file(str(source))
+    assert index.refresh() == "unchanged"
@@ -0,0 +1,38 @@
+"""
+Tests for transcript search and coverage scoring (tools/transcript_search_tool.py).
+
+Run with: python -m pytest test_transcript_search.py
+"""
+
+import pytest
+
+from agents.adaptive_research_agent import CONFIDENCE_THRESHOLD
+from tools.transcript_search_tool import transcript_confidence
+
+
+@pytest.mark.parametrize("question", [
+    "What is a good GATE score?",
+    "Can you explain more about M.Tech placements?",
+    "Does a career gap matter for GATE?",
+])
+def test_covered_questions_skip_the_web_search(question):
+    assert transcript_confidence(question)["confidence"] >= CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize("question", [
+    "what is the weather in paris",
+    "who won the cricket match yesterday?",
+    "Sir can a student do BTech then mtech and then mba",
+])
+def test_uncovered_questions_search_the_web(question):
+    assert transcript_confidence(question)["confidence"] < CONFIDENCE_THRESHOLD
+
+
+def test_stop_words_and_thanks_are_not_coverage():
+    scored = transcript_confidence("Thank You Sir!")
+    assert scored["confidence"] == 0.0
+    assert scored["missing_terms"] == []
+
+
+def test_terms_found_in_any_top_excerpt_count_as_covered():
+    assert "placements" not in transcript_confidence("Can you explain more about M.Tech placements?")["missing_terms"]
@@ -0,0 +1,100 @@
+"""
+Tests for TF-IDF cosine retrieval (tools/transcript_vectors.py).
+
+Run with: python -m pytest test_transcript_vectors.py
+"""
+
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import tools.transcript_vectors as transcript_vectors
+from tools.transcript_index import TranscriptIndex
+from tools.transcript_query import tokenize
+from tools.transcript_vectors import get_tfidf_matrix
+
+
+CHUNKS = [
+    "GATE score matters for MTech admission at IIT",
+    "MTech stipend is paid every month at IIT",
+    "placements at IIT depend on the branch and the company",
+    "the the the the video video video thanks for watching the video",
+    "GATE preparation starts with previous year papers",
+    "home loan interest rates depend on the bank",
+]
+
+QUERIES = ["GATE score", "MTech stipend month", "IIT placements branch", "home loan bank", "the video"]
+
+
+@pytest.fixture
+def index():
+    """One chunk per video, so no two chunks overlap."""
+    index = TranscriptIndex()
+    for number, text in enumerate(CHUNKS):
+        index.add_chunk(text, number + 1, f"Video {number + 1}", number * 10 + 1, number * 10 + 5)
+    return index
+
+
+def reference_scores(query):
+    """Dense cosine similarity with smoothed IDF and sublinear TF, computed naively."""
+    documents = [Counter(tokenize(text)) for text in CHUNKS]
+    vocabulary = sorted(set().union(*documents))
+    df = {term: sum(1 for document in documents if term in document) for term in vocabulary}
+    idf = {term: math.log((1 + len(documents)) / (1 + df[term])) + 1 for term in vocabulary}
+
+    def vector(counts):
+        weights = np.array([(1 + math.log(counts[term])) * idf[term] if counts[term] else 0.0 for term in vocabulary])
+        norm = np.linalg.norm(weights)
+        return weights / norm if norm else weights
+
+    query_vector = vector(Counter(term for term in tokenize(query) if term in idf))
+    return np.array([float(np.dot(vector(document), query_vector)) for document in documents])
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_scores_match_dense_cosine(index, query):
+    scores = get_tfidf_matrix(index).score_many([query])[0]
+    assert np.allclose(scores, reference_scores(query), atol=1e-5)
+
+
+def test_batch_matches_single_queries(index, monkeypatch):
+    monkeypatch.setattr(transcript_vectors, "MAX_SCORE_BLOCK", len(CHUNKS) * 2)  # Two queries per block
+    matrix = get_tfidf_matrix(index)
+    batched = matrix.search_many(QUERIES, top_k=3)
+    for query, results in zip(QUERIES, batched):
+        single = matrix.search(query, top_k=3)
+        assert [(chunk.chunk_id, round(score, 6)) for chunk, score in results] == \
+            [(chunk.chunk_id, round(score, 6)) for chunk, score in single]
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("GATE score", 0),
+    ("MTech stipend month", 1),
+    ("IIT placements branch", 2),
+    ("home loan bank", 5),
+])
+def test_tfidf_and_bm25_agree_on_the_best_chunk(index, query, expected):
+    assert get_tfidf_matrix(index).search(query, top_k=1)[0][0].chunk_id == expected
+    assert index.search(query, top_k=1)[0][0].chunk_id == expected
+
+
+def test_results_are_sorted_bounded_and_non_zero(index):
+    results = get_tfidf_matrix(index).search("GATE MTech IIT", top_k=2)
+    scores = [score for _, score in results]
+    assert len(results) == 2
+    assert scores == sorted(scores, reverse=True)
+    assert all(0.0 < score <= 1.0 + 1e-6 for score in scores)
+
+
+def test_unknown_query_returns_nothing(index):
+    assert get_tfidf_matrix(index).search("zzzz qqqq") == []
+
+
+def test_matrix_is_rebuilt_when_the_index_changes(index):
+    before = get_tfidf_matrix(index)
+    index.add_chunk("crypto tax rules for traders", 7, "Video 7", 71, 75)
+    after = get_tfidf_matrix(index)
+    assert after is not before
+    assert after.search("crypto tax", top_k=1)[0][0].chunk_id == len(CHUNKS)
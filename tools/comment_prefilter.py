@@ -0,0 +1,313 @@
+"""
+Comment Pre-filter - Local rules that decide obvious comments without a model call.
+
+Most comments the FilterAgent sees are easy: emoji-only reactions, link
+spam ("join my Telegram t.me/..."), or plain questions and thanks. This
+module scores a comment with compiled regexes and cheap text statistics:
+
+- URLs, @handles, messaging-app invites and phone numbers
+- a configurable blocklist of promotional phrases (data/filter_blocklist.txt)
+- the share of emoji among visible characters
+- how repetitive the text is (same word or character over and over)
+
+and returns IGNORE or ACCEPT with a confidence. Question cues (a "?", a
+wh-word, a leading auxiliary) offset the spam score, and a blocklist phrase
+alone is never confident: "Can I earn money during MTech?" is a real
+question that happens to contain "earn money". A comment with a "?" is
+only ignored locally when it has a blocklist phrase and a link or phone
+number. When no rule is confident
+the decision is left to the FilterAgent. Counters record how many model
+calls the rules saved.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from tools.transcript_query import tokenize
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BLOCKLIST_PATH = PROJECT_ROOT / "data" / "filter_blocklist.txt"
+
+# Decisions below this confidence are left to the FilterAgent
+CONFIDENCE_THRESHOLD = float(os.environ.get("COMMENT_PREFILTER_THRESHOLD", "0.85"))
+
+# Spam score taken off comments that ask a question
+QUESTION_SPAM_OFFSET = 0.3
+
+# Confidence of an IGNORE the rules are not sure enough about (kept below
+# the threshold, so the FilterAgent sees the comment): a blocklist phrase
+# alone, or a comment with a "?" that lacks both a blocklist phrase and a
+# link or phone number
+DEFERRED_IGNORE_CONFIDENCE = 0.7
+
+# A bare domain only counts with a path ("t.me/xyz"); without one, typos
+# such as "aaya.In" or "sir.Me" would look like links
+_URL_RE = re.compile(
+    r"https?://\S+|www\.\S+|\b[a-z0-9-]+\.(?:com|in|net|org|io|me|ly|xyz|link|site|online|shop)/\S*",
+    re.IGNORECASE,
+)
+_HANDLE_RE = re.compile(r"(?<![\w.])@[a-z0-9_.]{3,}", re.IGNORECASE)
+_INVITE_RE = re.compile(r"\b(?:telegram|whats\s?app|wa\.me|t\.me|insta(?:gram)?|dm\s+me|inbox\s+me)\b", re.IGNORECASE)
+# Ten or more contiguous digits, or phone-style groups ("98765 43210",
+# "987-654-3210", "+91 98765 43210"); not any run of numbers ("1200 1500 2000")
+_PHONE_RE = re.compile(
+    r"(?<![\d.])(?:\+?\d{10,13}|(?:\+\d{1,3}[\s-]?)?(?:\d{5}[\s-]\d{5}|\d{3}[\s-]\d{3}[\s-]\d{4}))(?![\d.])"
+)
+_REPEATED_CHAR_RE = re.compile(r"(.)\1{5,}")
+
+# Words that mark a comment as a genuine question or as thanks/praise.
+# Auxiliaries ("is", "can") only count as the first word of a comment.
+_QUESTION_WORDS = frozenset({
+    "what", "how", "why", "when", "where", "which", "who", "kya", "kaise",
+    "kyu", "kab", "kitna", "kitni", "kaun", "konsa", "kaha", "kahan",
+})
+_LEADING_QUESTION_WORDS = frozenset({
+    "can", "should", "could", "is", "are", "does", "do", "will", "would",
+})
+_SALUTATIONS = frozenset({"sir", "bhai", "hello", "hi", "hey", "mam", "maam"})
+_THANKS_WORDS = frozenset({
+    "thanks", "thank", "great", "awesome", "helpful", "love", "best", "nice",
+    "amazing", "excellent", "informative", "useful", "dhanyavad", "shukriya",
+    "respect", "inspiring", "motivating",
+})
+
+# Criticism or possible rudeness is always left to the FilterAgent
+_NEGATIVE_WORDS = frozenset({
+    "bad", "worst", "useless", "waste", "fake", "stupid", "idiot", "fraud",
+    "bakwas", "bekar", "faltu", "pagal", "chutiya", "shame", "hate", "liar",
+})
+
+
+def asks_question(text: str) -> bool:
+    """
+    Whether a comment carries a question cue: a "?", a wh-word (what, kya,
+    kab, kitna, kaise, ...), or a leading auxiliary ("can", "is", ...) in a
+    comment of more than three words.
+
+    Args:
+        text: Comment text
+
+    Returns:
+        True if the comment looks like it asks something
+    """
+    tokens = tokenize(text)
+    leading = next((token for token in tokens if token not in _SALUTATIONS), "")
+    return bool(
+        "?" in text
+        or set(tokens) & _QUESTION_WORDS
+        or (leading in _LEADING_QUESTION_WORDS and len(tokens) > 3)
+    )
+
+
+def load_blocklist(path: Optional[str] = None) -> List[str]:
+    """
+    Loads blocklisted phrases, one per line; blank lines and # comments are skipped.
+
+    Args:
+        path: Blocklist file (defaults to data/filter_blocklist.txt)
+
+    Returns:
+        List of lowercase phrases (empty if the file does not exist)
+    """
+    blocklist_path = Path(path) if path else DEFAULT_BLOCKLIST_PATH
+    if not blocklist_path.exists():
+        return []
+    phrases = []
+    with open(blocklist_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip().lower()
+            if line and not line.startswith("#"):
+                phrases.append(line)
+    return phrases
+
+
+def is_emoji(char: str) -> bool:
+    """Whether a character is an emoji or pictographic symbol (or an emoji joiner/modifier)."""
+    if char in "\u200d\ufe0f":
+        return True
+    category = unicodedata.category(char)
+    return category == "So" or (category == "Sk" and "\U0001f3fb" <= char <= "\U0001f3ff")
+
+
+def repetition_score(text: str) -> float:
+    """
+    Measures how repetitive a comment is.
+
+    Args:
+        text: Comment text
+
+    Returns:
+        0.0 (no repetition) to 1.0 (one word or character repeated throughout)
+    """
+    words = text.lower().split()
+    word_score = 0.0
+    if len(words) >= 4:
+        word_score = Counter(words).most_common(1)[0][1] / len(words)
+    visible = [char for char in text if not char.isspace()]
+    char_score = 0.0
+    if len(visible) >= 8:
+        char_score = 1.0 - len(set(visible)) / len(visible)
+        if not _REPEATED_CHAR_RE.search(text):
+            char_score *= 0.5
+    return max(word_score, char_score)
+
+
+class PrefilterResult:
+    """Outcome of the local rules for one comment."""
+
+    __slots__ = ("decision", "confidence", "reasons")
+
+    def __init__(self, decision: str, confidence: float, reasons: List[str]):
+        self.decision = decision  # "IGNORE" or "ACCEPT"
+        self.confidence = confidence  # 0.0 - 1.0
+        self.reasons = reasons  # Which rules fired
+
+    def to_dict(self) -> Dict:
+        return {"decision": self.decision, "confidence": round(self.confidence, 3), "reasons": self.reasons}
+
+
+class CommentPrefilter:
+    """Rule-based IGNORE / ACCEPT classifier with saved-call counters."""
+
+    def __init__(self, blocklist: Optional[Iterable[str]] = None, threshold: float = CONFIDENCE_THRESHOLD):
+        phrases = list(load_blocklist() if blocklist is None else blocklist)
+        self.blocklist_re = (
+            re.compile(r"\b(?:" + "|".join(re.escape(phrase) for phrase in phrases) + r")\b", re.IGNORECASE)
+            if phrases else None
+        )
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._counters = {"checked": 0, "ignored": 0, "accepted": 0, "deferred": 0}
+
+    def classify(self, comment: str) -> PrefilterResult:
+        """
+        Scores a comment with the local rules.
+
+        Args:
+            comment: Raw comment text
+
+        Returns:
+            PrefilterResult; its confidence says how sure the rules are
+        """
+        text = comment.strip()
+        alnum = sum(1 for char in text if char.isalnum())
+        emoji = sum(1 for char in text if is_emoji(char))
+        if not alnum:
+            reasons = ["emoji_only"] if emoji else ["empty"]
+            return PrefilterResult("IGNORE", 0.98, reasons)
+
+        reasons: List[str] = []
+        spam = 0.0
+        links = len(_URL_RE.findall(text))
+        if links:
+            reasons.append("url")
+            spam += 0.6 + 0.2 * (links - 1)
+        contact = bool(links)
+        if _HANDLE_RE.search(text):
+            reasons.append("handle")
+            spam += 0.3
+        if _INVITE_RE.search(text):
+            reasons.append("invite")
+            spam += 0.4
+        if _PHONE_RE.search(text):
+            reasons.append("phone_number")
+            spam += 0.5
+            contact = True
+        if self.blocklist_re is not None and self.blocklist_re.search(text):
+            reasons.append("blocklist")
+            spam += 0.7
+        repetition = repetition_score(text)
+        if repetition >= 0.6:
+            reasons.append("repetitive")
+            spam += 0.5 * repetition
+        emoji_ratio = emoji / (emoji + alnum)
+        if emoji_ratio >= 0.5 and alnum < 4:
+            reasons.append("mostly_emoji")
+            spam += 0.4
+
+        words = set(tokenize(text))
+        asks = asks_question(text)
+
+        if spam > 0:
+            if asks:
+                reasons.append("question")
+                spam -= QUESTION_SPAM_OFFSET
+            if spam <= 0:
+                # A weak spam signal in a question: let the FilterAgent judge
+                return PrefilterResult("ACCEPT", 0.6, reasons)
+            confidence = min(0.99, 0.5 + spam / 2)
+            blocklisted = "blocklist" in reasons
+            if [reason for reason in reasons if reason != "question"] == ["blocklist"]:
+                confidence = min(confidence, DEFERRED_IGNORE_CONFIDENCE)
+            if "?" in text and not (blocklisted and contact):
+                confidence = min(confidence, DEFERRED_IGNORE_CONFIDENCE)
+            return PrefilterResult("IGNORE", confidence, reasons)
+
+        # No spam signal: a comment that plainly asks something or says
+        # thanks is accepted (the FilterAgent is told to be lenient)
+        if words & _NEGATIVE_WORDS:
+            return PrefilterResult("ACCEPT", 0.5, ["negative_tone"])
+        if asks:
+            return PrefilterResult("ACCEPT", 0.9, ["question"])
+        if words & _THANKS_WORDS:
+            return PrefilterResult("ACCEPT", 0.9, ["thanks"])
+        return PrefilterResult("ACCEPT", 0.6, ["no_spam_signal"])
+
+    def decide(self, comment: str) -> Optional[PrefilterResult]:
+        """
+        Classifies a comment and returns the result only if it is confident.
+
+        Args:
+            comment: Raw comment text
+
+        Returns:
+            PrefilterResult, or None when the FilterAgent should decide
+        """
+        result = self.classify(comment)
+        confident = result.confidence >= self.threshold
+        with self._lock:
+            self._counters["checked"] += 1
+            if not confident:
+                self._counters["deferred"] += 1
+            elif result.decision == "IGNORE":
+                self._counters["ignored"] += 1
+            else:
+                self._counters["accepted"] += 1
+        return result if confident else None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the decision counters.
+
+        Returns:
+            Dictionary with checked, ignored, accepted, deferred and
+            calls_saved (comments decided without the FilterAgent)
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        counters["calls_saved"] = counters["ignored"] + counters["accepted"]
+        return counters
+
+
+_prefilter: Optional[CommentPrefilter] = None
+_prefilter_lock = threading.Lock()
+
+
+def get_comment_prefilter() -> CommentPrefilter:
+    """
+    Returns the process-wide pre-filter (its counters cover every comment).
+
+    Returns:
+        Shared CommentPrefilter loaded with the default blocklist
+    """
+    global _prefilter
+    with _prefilter_lock:
+        if _prefilter is None:
+            _prefilter = CommentPrefilter()
+        return _prefilter
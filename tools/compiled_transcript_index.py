@@ -0,0 +1,490 @@
+"""
+Compiled Transcript Index - Versioned binary index loaded with mmap.
+
+`python main.py build-index` compiles every transcripts/*.txt file into a
+single binary file. Worker processes memory-map that file read-only, so a
+cold start only parses a small header, and all processes on a machine share
+one page-cached copy of the postings instead of each holding its own Python
+dicts of strings.
+
+File layout (all integers in native byte order, checked on load):
+
+    header     magic (8 bytes), format version (u32), byte order marker (u32),
+               metadata offset (u64), metadata length (u64)
+    sections   8-byte aligned arrays, located through the metadata:
+               chunk_table      u32 x CHUNK_FIELDS per chunk
+               text_offsets     u64, n_chunks + 1 offsets into text_blob
+               text_blob        UTF-8 chunk text
+               token_offsets    u64, n_chunks + 1 offsets into token_starts/ends
+               token_starts     u32 character offset of each token in its chunk
+               token_ends       u32 character end offset of each token
+               term_offsets     u64, n_terms + 1 offsets into term_blob
+               term_blob        UTF-8 terms, sorted bytewise
+               postings_offsets u64, n_terms + 1 offsets into the postings
+               postings_chunks  u32 chunk ids, per term, in chunk order
+               postings_tfs     u32 term frequencies, parallel to the above
+               position_offsets u64, n_postings + 1 offsets into positions
+               positions        u32 token positions of each posting
+    metadata   JSON: counts, section table, source fingerprints, titles
+"""
+
+import functools
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tools.transcript_index import (
+    PROJECT_ROOT,
+    BaseTranscriptIndex,
+    TranscriptChunk,
+    TranscriptIndex,
+    source_key,
+)
+
+
+# Default location of the compiled index and of the files it is built from
+DEFAULT_COMPILED_INDEX_PATH = os.path.join(PROJECT_ROOT, "transcripts", "transcripts.idx")
+DEFAULT_SOURCE_GLOB = os.path.join(PROJECT_ROOT, "transcripts", "*.txt")
+
+MAGIC = b"YTTXIDX\0"
+# Bumped when the layout or the tokenizer changes; older files are rejected
+FORMAT_VERSION = 3
+BYTE_ORDER_MARKER = 0x01020304
+
+_HEADER = struct.Struct("=8sIIQQ")
+
+# Per-chunk fields stored in chunk_table
+CHUNK_FIELDS = 6
+_LENGTH, _SOURCE, _VIDEO, _TITLE, _START, _END = range(CHUNK_FIELDS)
+
+# Stored in the video field for chunks that precede any "Video N:" header
+_NO_VIDEO = 0xFFFFFFFF
+
+
+class CompiledIndexError(Exception):
+    """Raised when a compiled index file is missing, corrupt or incompatible."""
+
+
+def compile_index(source_paths: List[str], output_path: str, source_glob: Optional[str] = None) -> Dict:
+    """
+    Compiles transcript files into a binary index file.
+
+    The file is written next to its final location and atomically renamed
+    into place, so processes that already mapped the old file keep a
+    consistent view until they reload.
+
+    Args:
+        source_paths: Transcript files to include, in order
+        output_path: Where to write the compiled index
+        source_glob: Pattern the sources were collected from, if any; files
+            added to or removed from that pattern make the index stale.
+            Like the source paths, it is stored relative to the index file,
+            so a moved or re-cloned checkout does not look stale
+
+    Returns:
+        Summary dictionary with chunk, term and byte counts
+    """
+    source_paths = sorted(os.path.abspath(path) for path in source_paths)
+    index_dir = os.path.dirname(os.path.abspath(output_path))
+
+    chunk_table = array("I")
+    text_offsets = array("Q", [0])
+    text_parts: List[bytes] = []
+    text_size = 0
+    token_offsets = array("Q", [0])
+    token_starts = array("I")
+    token_ends = array("I")
+    titles: List[str] = []
+    title_ids: Dict[str, int] = {}
+    postings: Dict[str, List[Tuple[int, int, List[int]]]] = {}
+    sources = []
+    total_length = 0
+
+    for source_id, path in enumerate(source_paths):
+        stat = os.stat(path)
+        sources.append({
+            "path": os.path.relpath(path, index_dir),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        })
+        index = TranscriptIndex.from_file(path)
+        base = len(text_offsets) - 1
+        for chunk in index.chunks:
+            title_id = title_ids.setdefault(chunk.video_title, len(titles))
+            if title_id == len(titles):
+                titles.append(chunk.video_title)
+            chunk_table.extend((
+                chunk.length,
+                source_id,
+                _NO_VIDEO if chunk.video_number is None else chunk.video_number,
+                title_id,
+                chunk.start_line,
+                chunk.end_line,
+            ))
+            encoded = chunk.text.encode("utf-8")
+            text_parts.append(encoded)
+            text_size += len(encoded)
+            text_offsets.append(text_size)
+            token_starts.extend(chunk.token_starts)
+            token_ends.extend(chunk.token_ends)
+            token_offsets.append(len(token_starts))
+            total_length += chunk.length
+        for term, term_postings in index.postings.items():
+            merged = postings.setdefault(term, [])
+            term_positions = index.positions[term]
+            merged.extend((base + chunk_id, tf, term_positions[chunk_id]) for chunk_id, tf in term_postings)
+
+    encoded_terms = sorted(term.encode("utf-8") for term in postings)
+    term_offsets = array("Q", [0])
+    postings_offsets = array("Q", [0])
+    postings_chunks = array("I")
+    postings_tfs = array("I")
+    position_offsets = array("Q", [0])
+    positions = array("I")
+    for encoded in encoded_terms:
+        term_offsets.append(term_offsets[-1] + len(encoded))
+        for chunk_id, tf, chunk_positions in postings[encoded.decode("utf-8")]:
+            postings_chunks.append(chunk_id)
+            postings_tfs.append(tf)
+            positions.extend(chunk_positions)
+            position_offsets.append(len(positions))
+        postings_offsets.append(len(postings_chunks))
+
+    section_data = [
+        ("chunk_table", "I", chunk_table.tobytes()),
+        ("text_offsets", "Q", text_offsets.tobytes()),
+        ("text_blob", "B", b"".join(text_parts)),
+        ("token_offsets", "Q", token_offsets.tobytes()),
+        ("token_starts", "I", token_starts.tobytes()),
+        ("token_ends", "I", token_ends.tobytes()),
+        ("term_offsets", "Q", term_offsets.tobytes()),
+        ("term_blob", "B", b"".join(encoded_terms)),
+        ("postings_offsets", "Q", postings_offsets.tobytes()),
+        ("postings_chunks", "I", postings_chunks.tobytes()),
+        ("postings_tfs", "I", postings_tfs.tobytes()),
+        ("position_offsets", "Q", position_offsets.tobytes()),
+        ("positions", "I", positions.tobytes()),
+    ]
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        sections = {}
+        for name, typecode, data in section_data:
+            f.write(b"\0" * (-f.tell() % 8))
+            sections[name] = [f.tell(), len(data), typecode]
+            f.write(data)
+        metadata = json.dumps({
+            "num_chunks": len(text_offsets) - 1,
+            "num_terms": len(encoded_terms),
+            "total_length": total_length,
+            "titles": titles,
+            "sources": sources,
+            "source_glob": os.path.relpath(os.path.abspath(source_glob), index_dir) if source_glob else None,
+            "sections": sections,
+        }).encode("utf-8")
+        metadata_offset = f.tell()
+        f.write(metadata)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, BYTE_ORDER_MARKER, metadata_offset, len(metadata)))
+    os.replace(tmp_path, output_path)
+
+    return {
+        "path": output_path,
+        "sources": len(sources),
+        "chunks": len(text_offsets) - 1,
+        "terms": len(encoded_terms),
+        "bytes": os.path.getsize(output_path),
+    }
+
+
+class CompiledTranscriptIndex(BaseTranscriptIndex):
+    """
+    Read-only transcript index backed by a memory-mapped compiled file.
+
+    Postings, chunk statistics and chunk text are array views straight into
+    the mapping; a TranscriptChunk object is only created for chunks that
+    are returned as results.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = os.path.abspath(path)
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.file_size = stat.st_size
+            self.file_mtime_ns = stat.st_mtime_ns
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.file_size < _HEADER.size:
+            raise CompiledIndexError(f"Index file too small: {self.path}")
+        magic, version, marker, metadata_offset, metadata_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise CompiledIndexError(f"Not a transcript index: {self.path}")
+        if version != FORMAT_VERSION:
+            raise CompiledIndexError(f"Unsupported index version {version} (expected {FORMAT_VERSION})")
+        if marker != BYTE_ORDER_MARKER:
+            raise CompiledIndexError("Index was built on a machine with a different byte order")
+
+        metadata = json.loads(self._mmap[metadata_offset:metadata_offset + metadata_length])
+        self._num_chunks = metadata["num_chunks"]
+        self._num_terms = metadata["num_terms"]
+        self._average_length = metadata["total_length"] / self._num_chunks if self._num_chunks else 0.0
+        self.titles: List[str] = metadata["titles"]
+        self.sources: List[Dict] = metadata["sources"]
+        index_dir = os.path.dirname(self.path)
+        self.source_glob: Optional[str] = None
+        if metadata["source_glob"]:
+            self.source_glob = os.path.normpath(os.path.join(index_dir, metadata["source_glob"]))
+
+        self._view = memoryview(self._mmap)
+        arrays = {}
+        for name, (offset, length, typecode) in metadata["sections"].items():
+            arrays[name] = self._view[offset:offset + length].cast(typecode)
+        self._chunk_table = arrays["chunk_table"]
+        self._text_offsets = arrays["text_offsets"]
+        self._text_base = metadata["sections"]["text_blob"][0]
+        self._token_offsets = arrays["token_offsets"]
+        self._token_starts = arrays["token_starts"]
+        self._token_ends = arrays["token_ends"]
+        self._term_offsets = arrays["term_offsets"]
+        self._term_base = metadata["sections"]["term_blob"][0]
+        self._postings_offsets = arrays["postings_offsets"]
+        self._postings_chunks = arrays["postings_chunks"]
+        self._postings_tfs = arrays["postings_tfs"]
+        self._position_offsets = arrays["position_offsets"]
+        self._positions = arrays["positions"]
+
+        # Phrase checks and snippets look the same few terms up repeatedly
+        self._term_id = functools.lru_cache(maxsize=4096)(self._lookup_term)
+
+        self._source_paths = [os.path.normpath(os.path.join(index_dir, source["path"])) for source in self.sources]
+        # Keyed like TranscriptIndex chunks, by path rather than file name
+        self._source_names = [source_key(path) for path in self._source_paths]
+
+        # Directory mtime at which the source glob was last verified
+        self._glob_checked_mtime_ns: Optional[int] = None
+
+    def close(self):
+        """
+        Unmaps the index file once it has been replaced.
+
+        The array views are released first. If chunks returned earlier
+        still hold token offset views into the mapping, the mapping stays
+        valid for them and is unmapped when the last one is freed.
+        """
+        self._term_id = None  # The cache holds a bound method, i.e. a reference cycle
+        for name in (
+            "_chunk_table", "_text_offsets", "_token_offsets", "_token_starts", "_token_ends",
+            "_term_offsets", "_postings_offsets", "_postings_chunks", "_postings_tfs",
+            "_position_offsets", "_positions",
+        ):
+            getattr(self, name).release()
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def is_fresh(self) -> bool:
+        """
+        Checks that the compiled sources are unchanged on disk.
+
+        Compares size and mtime of every source file. If the index was built
+        from a glob, the set of matching files is re-checked whenever the
+        directory's mtime moves. This is a handful of stat() calls, cheap
+        enough per query.
+
+        Returns:
+            True if the index still reflects its sources
+        """
+        try:
+            if self.source_glob:
+                dir_mtime_ns = os.stat(os.path.dirname(self.source_glob)).st_mtime_ns
+                if dir_mtime_ns != self._glob_checked_mtime_ns:
+                    matching = sorted(os.path.abspath(path) for path in glob.glob(self.source_glob))
+                    if matching != sorted(self._source_paths):
+                        return False
+                    self._glob_checked_mtime_ns = dir_mtime_ns
+            for source, path in zip(self.sources, self._source_paths):
+                stat = os.stat(path)
+                if stat.st_size != source["size"] or stat.st_mtime_ns != source["mtime_ns"]:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def _lookup_term(self, term: str) -> Optional[int]:
+        """Binary-searches the sorted term table for a term."""
+        target = term.encode("utf-8")
+        offsets = self._term_offsets
+        base = self._term_base
+        lo, hi = 0, self._num_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            candidate = self._mmap[base + offsets[mid]:base + offsets[mid + 1]]
+            if candidate < target:
+                lo = mid + 1
+            elif candidate > target:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    @property
+    def num_chunks(self) -> int:
+        return self._num_chunks
+
+    @property
+    def average_length(self) -> float:
+        return self._average_length
+
+    def document_frequency(self, term: str) -> int:
+        term_id = self._term_id(term)
+        if term_id is None:
+            return 0
+        return self._postings_offsets[term_id + 1] - self._postings_offsets[term_id]
+
+    def term_postings(self, term: str) -> Iterable[Tuple[int, int]]:
+        term_id = self._term_id(term)
+        if term_id is None:
+            return ()
+        start = self._postings_offsets[term_id]
+        end = self._postings_offsets[term_id + 1]
+        return zip(self._postings_chunks[start:end], self._postings_tfs[start:end])
+
+    def iter_terms(self) -> Iterable[str]:
+        offsets = self._term_offsets
+        base = self._term_base
+        for term_id in range(self._num_terms):
+            yield self._mmap[base + offsets[term_id]:base + offsets[term_id + 1]].decode("utf-8")
+
+    def chunk_positions(self, term: str, chunk_id: int) -> Sequence[int]:
+        term_id = self._term_id(term)
+        if term_id is None:
+            return ()
+        start = self._postings_offsets[term_id]
+        end = self._postings_offsets[term_id + 1]
+        posting = bisect_left(self._postings_chunks, chunk_id, start, end)
+        if posting == end or self._postings_chunks[posting] != chunk_id:
+            return ()
+        return self._positions[self._position_offsets[posting]:self._position_offsets[posting + 1]]
+
+    def chunk_length(self, chunk_id: int) -> int:
+        return self._chunk_table[chunk_id * CHUNK_FIELDS + _LENGTH]
+
+    def chunk_span(self, chunk_id: int) -> Tuple[str, int, int]:
+        row = chunk_id * CHUNK_FIELDS
+        table = self._chunk_table
+        return self._source_names[table[row + _SOURCE]], table[row + _START], table[row + _END]
+
+    def get_chunk(self, chunk_id: int) -> TranscriptChunk:
+        row = chunk_id * CHUNK_FIELDS
+        table = self._chunk_table
+        start = self._text_base + self._text_offsets[chunk_id]
+        end = self._text_base + self._text_offsets[chunk_id + 1]
+        video = table[row + _VIDEO]
+        token_start = self._token_offsets[chunk_id]
+        token_end = self._token_offsets[chunk_id + 1]
+        return TranscriptChunk(
+            chunk_id,
+            self._mmap[start:end].decode("utf-8"),
+            table[row + _LENGTH],
+            self._source_names[table[row + _SOURCE]],
+            None if video == _NO_VIDEO else video,
+            self.titles[table[row + _TITLE]],
+            table[row + _START],
+            table[row + _END],
+            self._token_starts[token_start:token_end],
+            self._token_ends[token_start:token_end],
+        )
+
+
+# Process-wide cache of loaded compiled indexes, keyed by index path
+_compiled_cache: Dict[str, CompiledTranscriptIndex] = {}
+_compiled_lock = threading.Lock()
+
+
+def load_compiled_index(path: Optional[str] = None) -> Optional[CompiledTranscriptIndex]:
+    """
+    Returns the memory-mapped compiled index if it exists and is up to date.
+
+    The mapping is opened once per process and reopened when `build-index`
+    replaces the file; the previous mapping is then closed. If the index is
+    missing, unreadable or older than its sources, None is returned and
+    callers fall back to the in-memory index.
+
+    Args:
+        path: Path to the compiled index (defaults to transcripts/transcripts.idx)
+
+    Returns:
+        CompiledTranscriptIndex, or None if it cannot be used
+    """
+    path = os.path.abspath(path or DEFAULT_COMPILED_INDEX_PATH)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    with _compiled_lock:
+        index = _compiled_cache.get(path)
+        if index is None or (index.file_size, index.file_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            previous = index
+            try:
+                index = CompiledTranscriptIndex(path)
+            except (CompiledIndexError, OSError, ValueError, KeyError):
+                return None
+            _compiled_cache[path] = index
+            if previous is not None:
+                previous.close()
+    return index if index.is_fresh() else None
+
+
+def compiled_source_paths(path: Optional[str] = None) -> List[str]:
+    """
+    Lists the transcript files the compiled index covers, or would cover once built.
+
+    The in-memory fallback searches these when the compiled index is missing
+    or stale, so results come from the same files either way: the index's
+    own source list, or the files its glob (by default transcripts/*.txt)
+    matches now.
+
+    Args:
+        path: Path to the compiled index (defaults to transcripts/transcripts.idx)
+
+    Returns:
+        Sorted absolute paths of the existing source files
+    """
+    path = os.path.abspath(path or DEFAULT_COMPILED_INDEX_PATH)
+    with _compiled_lock:
+        index = _compiled_cache.get(path)
+    if index is not None and not index.source_glob:
+        return sorted(source for source in index._source_paths if os.path.exists(source))
+    pattern = index.source_glob if index is not None else DEFAULT_SOURCE_GLOB
+    return sorted(os.path.abspath(source) for source in glob.glob(pattern))
+
+
+def build_index(sources: Optional[List[str]] = None, output_path: Optional[str] = None) -> Dict:
+    """
+    Entry point for the `build-index` command.
+
+    Args:
+        sources: Transcript files to compile (defaults to transcripts/*.txt)
+        output_path: Where to write the index (defaults to transcripts/transcripts.idx)
+
+    Returns:
+        Summary dictionary from compile_index()
+
+    Raises:
+        FileNotFoundError: If there are no transcript files to compile
+    """
+    source_glob = None if sources else DEFAULT_SOURCE_GLOB
+    sources = sources or glob.glob(DEFAULT_SOURCE_GLOB)
+    if not sources:
+        raise FileNotFoundError(f"No transcript files match {DEFAULT_SOURCE_GLOB}")
+    return compile_index(sources, output_path or DEFAULT_COMPILED_INDEX_PATH, source_glob)
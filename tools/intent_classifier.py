@@ -0,0 +1,490 @@
+"""
+Intent Classifier - Local Question / Praise classifier in front of the RouterAgent.
+
+Whether an accepted comment is a question or praise is usually obvious from
+a "?", a wh-word, "kaise", "can you", or thank-you phrasing. This
+module extracts those cues (plus the comment's words) as sparse features
+and scores them with a small logistic-regression model trained with NumPy.
+
+Training data:
+- comments from data/gold_standard.json and data/gold_responses.txt,
+  weakly labeled by the cue rules (they carry no Question/Praise label)
+- RouterAgent decisions logged to data/router_decisions.jsonl, which are
+  the model's own labels and take precedence over weak labels
+
+Local decisions are logged separately (data/router_local_decisions.jsonl),
+so only new model decisions trigger a retrain. Retraining happens at most
+once per RETRAIN_INTERVAL seconds, in a background thread; the current
+classifier keeps answering until the new one is ready. Both logs are
+compacted to their most recent MAX_LOGGED_DECISIONS records.
+
+"kya" opens questions ("kya main ... kar sakta hu") but also exclamations
+("kya baat hai sir"), so it only counts as a question cue next to a "?" or
+a question verb.
+
+The RouterAgent only runs when the local prediction is not confident.
+evaluate_agreement() reports how often the local classifier agrees with the
+logged model decisions at different thresholds (python main.py
+router-agreement). Each trained classifier is validated the same way, and
+it only decides locally once at least MIN_VALIDATION_DECISIONS model
+decisions were logged and the cross-validated agreement at
+CONFIDENCE_THRESHOLD reaches REQUIRED_AGREEMENT.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.style_examples import load_style_examples
+from tools.transcript_query import tokenize
+
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GOLD_STANDARD_PATH = PROJECT_ROOT / "data" / "gold_standard.json"
+GOLD_RESPONSES_PATH = PROJECT_ROOT / "data" / "gold_responses.txt"
+DEFAULT_DECISIONS_LOG = Path(os.environ.get(
+    "ROUTER_DECISIONS_LOG", PROJECT_ROOT / "data" / "router_decisions.jsonl"
+))
+# The classifier's own decisions, kept for auditing only (never trained on)
+DEFAULT_LOCAL_DECISIONS_LOG = Path(os.environ.get(
+    "ROUTER_LOCAL_DECISIONS_LOG", PROJECT_ROOT / "data" / "router_local_decisions.jsonl"
+))
+
+# Only the most recent decisions are kept in the logs and trained on
+MAX_LOGGED_DECISIONS = int(os.environ.get("ROUTER_MAX_LOGGED_DECISIONS", "5000"))
+
+# Minimum seconds between two retrains on new model decisions
+RETRAIN_INTERVAL = float(os.environ.get("ROUTER_RETRAIN_INTERVAL", "300"))
+
+# Local predictions below this probability are left to the RouterAgent
+CONFIDENCE_THRESHOLD = float(os.environ.get("ROUTER_CONFIDENCE_THRESHOLD", "0.8"))
+
+# Local routing stays off until the classifier agrees with this share of
+# held-out model decisions, measured on at least this many of them
+REQUIRED_AGREEMENT = float(os.environ.get("ROUTER_REQUIRED_AGREEMENT", "0.95"))
+MIN_VALIDATION_DECISIONS = int(os.environ.get("ROUTER_MIN_VALIDATION_DECISIONS", "50"))
+
+LABELS = ("Praise", "Question")
+
+# Logistic regression settings (tiny data, so full-batch gradient descent)
+L2_PENALTY = 0.01
+LEARNING_RATE = 0.5
+EPOCHS = 400
+
+_QUESTION_WORDS = frozenset({
+    "what", "how", "why", "when", "where", "which", "who", "whom", "whose",
+    "kaise", "kyu", "kab", "kitna", "kitni", "kitne", "kaun", "konsa",
+    "kaha", "kahan", "batao", "bataiye", "bataye", "explain", "suggest",
+})
+# "kya" is only a question cue together with a "?" or one of these
+_KYA = "kya"
+_QUESTION_VERBS = frozenset({
+    "sakta", "sakti", "sakte", "skta", "skte", "milega", "milegi", "milenge",
+    "hoga", "hogi", "honge", "chahiye", "karu", "karun", "karein", "kare",
+    "batao", "bataiye", "bataye", "explain", "hota", "hoti", "hote",
+})
+_AUXILIARIES = frozenset({
+    "can", "could", "should", "would", "will", "is", "are", "was", "does",
+    "do", "did", "have", "has", "shall",
+})
+_THANKS_WORDS = frozenset({
+    "thanks", "thank", "grateful", "dhanyavad", "shukriya", "appreciate",
+})
+_PRAISE_WORDS = frozenset({
+    "great", "awesome", "amazing", "love", "best", "nice", "excellent",
+    "helpful", "informative", "useful", "inspiring", "motivating", "respect",
+    "acha", "badiya", "mast", "superb", "brilliant", "clear",
+})
+_SALUTATIONS = frozenset({"sir", "bhai", "hello", "hi", "hey", "mam", "maam"})
+_REQUEST_RE = re.compile(r"\b(?:can|could|would|will)\s+(?:you|u)\b|\bplease\s+(?:explain|make|tell|share)\b", re.IGNORECASE)
+
+
+def extract_features(comment: str) -> Dict[str, float]:
+    """
+    Turns a comment into sparse named features.
+
+    Args:
+        comment: Comment text
+
+    Returns:
+        Dictionary of feature name -> value
+    """
+    tokens = tokenize(comment)
+    words = set(tokens)
+    leading = next((token for token in tokens if token not in _SALUTATIONS), "")
+    asks_kya = _KYA in words and ("?" in comment or bool(words & _QUESTION_VERBS))
+    features: Dict[str, float] = {"bias": 1.0}
+    for word in words:
+        # "kya" alone says nothing about the label; asks_kya carries it
+        if word != _KYA:
+            features["w:" + word] = 1.0
+    if "?" in comment:
+        features["question_mark"] = 1.0
+    if words & _QUESTION_WORDS or asks_kya:
+        features["question_word"] = 1.0
+    if leading in _QUESTION_WORDS or leading in _AUXILIARIES or (leading == _KYA and asks_kya):
+        features["leading_question_word"] = 1.0
+    if _REQUEST_RE.search(comment):
+        features["request"] = 1.0
+    if words & _THANKS_WORDS:
+        features["thanks"] = 1.0
+    if words & _PRAISE_WORDS:
+        features["praise_word"] = 1.0
+    if "!" in comment:
+        features["exclamation"] = 1.0
+    features["long"] = 1.0 if len(tokens) > 12 else 0.0
+    return features
+
+
+def weak_label(comment: str) -> str:
+    """
+    Labels a comment from its cues alone, for training on unlabeled text.
+
+    Args:
+        comment: Comment text
+
+    Returns:
+        "Question" or "Praise"
+    """
+    features = extract_features(comment)
+    asks = any(name in features for name in ("question_mark", "question_word", "leading_question_word", "request"))
+    return "Question" if asks else "Praise"
+
+
+def load_gold_comments() -> List[str]:
+    """
+    Reads the comments of both gold example files.
+
+    Returns:
+        List of comment texts (files that are missing are skipped)
+    """
+    return [example.comment for example in load_style_examples(GOLD_STANDARD_PATH, GOLD_RESPONSES_PATH)]
+
+
+def load_decisions(path: Optional[Path] = None, limit: int = MAX_LOGGED_DECISIONS) -> List[Dict]:
+    """
+    Reads the most recent logged router decisions.
+
+    Args:
+        path: Decisions log (defaults to data/router_decisions.jsonl)
+        limit: Maximum number of (most recent) records returned
+
+    Returns:
+        List of {"comment", "comment_type", "source"} records, oldest first
+    """
+    log_path = Path(path) if path else DEFAULT_DECISIONS_LOG
+    if not log_path.exists():
+        return []
+    records = deque(maxlen=limit)
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A partially written last line
+            if record.get("comment_type") in LABELS and record.get("comment"):
+                records.append(record)
+    return list(records)
+
+
+_log_lock = threading.Lock()
+_log_lines: Dict[Path, int] = {}
+
+
+def _compact_log(log_path: Path):
+    """Rewrites a decisions log with only its MAX_LOGGED_DECISIONS most recent records."""
+    records = load_decisions(log_path)
+    temporary = log_path.with_name(log_path.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(temporary, log_path)
+    _log_lines[log_path] = len(records)
+
+
+def log_decision(comment: str, comment_type: str, source: str, path: Optional[Path] = None):
+    """
+    Appends a router decision to its log.
+
+    Model decisions go to the training log and local decisions to their own
+    log, so logging a local decision never triggers a retrain. A log that
+    grows past twice MAX_LOGGED_DECISIONS records is compacted.
+
+    Args:
+        comment: Comment text
+        comment_type: "Question" or "Praise"
+        source: "model" for RouterAgent decisions, "local" for this classifier's
+        path: Log to write (defaults to data/router_decisions.jsonl for model
+            decisions and data/router_local_decisions.jsonl otherwise)
+    """
+    if path:
+        log_path = Path(path)
+    else:
+        log_path = DEFAULT_DECISIONS_LOG if source == "model" else DEFAULT_LOCAL_DECISIONS_LOG
+    record = {"time": time.time(), "comment": comment, "comment_type": comment_type, "source": source}
+    with _log_lock:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        if log_path not in _log_lines:
+            _log_lines[log_path] = len(load_decisions(log_path, limit=None))
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        _log_lines[log_path] += 1
+        if _log_lines[log_path] > 2 * MAX_LOGGED_DECISIONS:
+            _compact_log(log_path)
+
+
+def training_examples(decisions: List[Dict]) -> List[Tuple[str, str]]:
+    """
+    Combines weakly labeled gold comments with logged model decisions.
+
+    Only decisions made by the RouterAgent's model count as labels; the
+    classifier's own decisions would just reinforce themselves.
+
+    Args:
+        decisions: Logged router decisions
+
+    Returns:
+        List of (comment, label) pairs
+    """
+    labeled = {record["comment"]: record["comment_type"] for record in decisions if record.get("source") == "model"}
+    examples = [(comment, weak_label(comment)) for comment in load_gold_comments() if comment not in labeled]
+    examples.extend(labeled.items())
+    return examples
+
+
+class IntentClassifier:
+    """Logistic regression over extract_features(); predicts P(Question)."""
+
+    def __init__(self, examples: List[Tuple[str, str]]):
+        # Cross-validated agreement with the model, set by train_intent_classifier()
+        self.agreement: Optional[float] = None
+        self.feature_ids: Dict[str, int] = {}
+        # The feature matrix in coordinate form: a comment has ~10 of the
+        # thousands of features, so a dense matrix would be mostly zeros
+        row_ids: List[int] = []
+        column_ids: List[int] = []
+        values: List[float] = []
+        for row_number, (comment, _) in enumerate(examples):
+            for name, value in extract_features(comment).items():
+                row_ids.append(row_number)
+                column_ids.append(self.feature_ids.setdefault(name, len(self.feature_ids)))
+                values.append(value)
+        rows = np.array(row_ids, dtype=np.int64)
+        columns = np.array(column_ids, dtype=np.int64)
+        x = np.array(values, dtype=np.float64)
+        y = np.array([1.0 if label == "Question" else 0.0 for _, label in examples])
+
+        self.weights = np.zeros(len(self.feature_ids), dtype=np.float64)
+        if len(examples):
+            for _ in range(EPOCHS):
+                scores = np.bincount(rows, weights=x * self.weights[columns], minlength=len(examples))
+                errors = 1.0 / (1.0 + np.exp(-scores)) - y
+                gradient = np.bincount(columns, weights=x * errors[rows], minlength=len(self.weights))
+                self.weights -= LEARNING_RATE * (gradient / len(examples) + L2_PENALTY * self.weights)
+
+    def probability(self, comment: str) -> float:
+        """
+        Estimates the probability that a comment is a question.
+
+        Args:
+            comment: Comment text
+
+        Returns:
+            P(Question), 0.0 - 1.0
+        """
+        score = sum(
+            self.weights[self.feature_ids[name]] * value
+            for name, value in extract_features(comment).items()
+            if name in self.feature_ids
+        )
+        return float(1.0 / (1.0 + np.exp(-score)))
+
+    def predict(self, comment: str) -> Tuple[str, float]:
+        """
+        Predicts the comment type and the confidence of that prediction.
+
+        Args:
+            comment: Comment text
+
+        Returns:
+            ("Question" or "Praise", confidence between 0.5 and 1.0)
+        """
+        probability = self.probability(comment)
+        if probability >= 0.5:
+            return "Question", probability
+        return "Praise", 1.0 - probability
+
+    @property
+    def validated(self) -> bool:
+        """Whether held-out model decisions showed the classifier may route on its own."""
+        return self.agreement is not None and self.agreement >= REQUIRED_AGREEMENT
+
+    def decide(self, comment: str) -> Optional[Tuple[str, float]]:
+        """
+        Routes a comment locally when the classifier is validated and confident.
+
+        Args:
+            comment: Comment text
+
+        Returns:
+            (comment type, confidence), or None to leave the decision to the model
+        """
+        if not self.validated:
+            return None
+        comment_type, confidence = self.predict(comment)
+        if confidence < CONFIDENCE_THRESHOLD:
+            return None
+        return comment_type, confidence
+
+
+def validated_agreement(decisions: List[Dict]) -> Optional[float]:
+    """
+    Cross-validates the classifier against logged model decisions at CONFIDENCE_THRESHOLD.
+
+    Args:
+        decisions: Logged router decisions
+
+    Returns:
+        Share of confident held-out predictions that match the model, or None
+        when fewer than MIN_VALIDATION_DECISIONS model decisions are logged
+        or no held-out prediction was confident
+    """
+    if sum(1 for record in decisions if record.get("source") == "model") < MIN_VALIDATION_DECISIONS:
+        return None
+    report = evaluate_agreement(decisions, thresholds=(CONFIDENCE_THRESHOLD,))
+    return report["thresholds"][0]["agreement"]
+
+
+def train_intent_classifier(decisions: List[Dict]) -> IntentClassifier:
+    """
+    Trains a classifier on the gold comments and logged decisions and validates it.
+
+    Args:
+        decisions: Logged router decisions
+
+    Returns:
+        IntentClassifier whose agreement is set from held-out model decisions
+    """
+    classifier = IntentClassifier(training_examples(decisions))
+    classifier.agreement = validated_agreement(decisions)
+    if not classifier.validated:
+        logger.info(
+            "Local routing disabled: agreement %s with the model on held-out decisions (need %.2f)",
+            "n/a" if classifier.agreement is None else f"{classifier.agreement:.3f}",
+            REQUIRED_AGREEMENT,
+        )
+    return classifier
+
+
+_classifier: Optional[IntentClassifier] = None
+_classifier_log_mtime: Optional[int] = None
+_classifier_trained_at = 0.0
+_retraining = False
+_classifier_lock = threading.Lock()
+
+
+def _decisions_log_mtime() -> Optional[int]:
+    try:
+        return DEFAULT_DECISIONS_LOG.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _retrain(log_mtime: Optional[int]):
+    """Trains a classifier on the current logs and swaps it in."""
+    global _classifier, _classifier_log_mtime, _retraining
+    try:
+        classifier = train_intent_classifier(load_decisions())
+        with _classifier_lock:
+            _classifier = classifier
+            _classifier_log_mtime = log_mtime
+    except Exception:
+        logger.warning("Retraining the intent classifier failed; keeping the current one", exc_info=True)
+    finally:
+        with _classifier_lock:
+            _retraining = False
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """
+    Returns the process-wide classifier, retraining it when new model decisions were logged.
+
+    The first call trains synchronously. Later retrains run in a background
+    thread, at most once per RETRAIN_INTERVAL seconds, and the current
+    classifier is returned meanwhile. Every retrain re-validates the
+    classifier against the logged model decisions.
+
+    Returns:
+        Trained and validated IntentClassifier
+    """
+    global _classifier, _classifier_log_mtime, _classifier_trained_at, _retraining
+    log_mtime = _decisions_log_mtime()
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = train_intent_classifier(load_decisions())
+            _classifier_log_mtime = log_mtime
+            _classifier_trained_at = time.monotonic()
+        elif (
+            log_mtime != _classifier_log_mtime
+            and not _retraining
+            and time.monotonic() - _classifier_trained_at >= RETRAIN_INTERVAL
+        ):
+            _retraining = True
+            _classifier_trained_at = time.monotonic()
+            threading.Thread(target=_retrain, args=(log_mtime,), name="intent-retrain", daemon=True).start()
+        return _classifier
+
+
+def evaluate_agreement(
+    decisions: List[Dict],
+    thresholds: Tuple[float, ...] = (0.5, 0.6, 0.7, 0.8, 0.9, 0.95),
+    folds: int = 5,
+) -> Dict:
+    """
+    Measures agreement between the local classifier and logged model decisions.
+
+    Uses k-fold cross-validation so no decision is scored by a model that
+    was trained on it. For each threshold, coverage is the share of comments
+    the classifier would decide locally and agreement is how often those
+    local decisions match the model's.
+
+    Args:
+        decisions: Logged router decisions (only source == "model" are used)
+        thresholds: Confidence thresholds to report
+        folds: Number of cross-validation folds
+
+    Returns:
+        Dictionary with the number of decisions, the folds used and one
+        row per threshold
+    """
+    labeled = [record for record in decisions if record.get("source") == "model"]
+    predictions: List[Tuple[str, float, str]] = []
+    folds = max(1, min(folds, len(labeled)))
+    for fold in range(folds):
+        held_out = labeled[fold::folds]
+        training = [record for number, record in enumerate(labeled) if number % folds != fold]
+        classifier = IntentClassifier(training_examples(training))
+        for record in held_out:
+            label, confidence = classifier.predict(record["comment"])
+            predictions.append((label, confidence, record["comment_type"]))
+
+    rows = []
+    for threshold in thresholds:
+        decided = [(label, truth) for label, confidence, truth in predictions if confidence >= threshold]
+        agreed = sum(1 for label, truth in decided if label == truth)
+        rows.append({
+            "threshold": threshold,
+            "coverage": len(decided) / len(predictions) if predictions else 0.0,
+            "agreement": agreed / len(decided) if decided else None,
+        })
+    return {"decisions": len(labeled), "folds": folds, "thresholds": rows}
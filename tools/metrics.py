@@ -0,0 +1,330 @@
+"""
+Metrics - Counters, histograms, Prometheus text export and JSONL traces.
+
+The instrumentation callbacks (agents/instrumentation_callbacks.py) record
+every agent run, model call and tool call here. Metrics are kept in memory
+in one process-wide registry and can be read three ways:
+
+- render_prometheus(): the Prometheus text exposition format, also served
+  over HTTP at /metrics by start_metrics_server()
+- snapshot(): plain dictionaries, for scripts and benchmarks
+- the trace log: one JSONL line per span (agent run, model call, tool
+  call) with the comment's correlation id, in data/traces.jsonl
+
+Histograms use fixed buckets, so per-stage latency can be alerted on with
+histogram_quantile() on the Prometheus side.
+"""
+
+import json
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Span log, one JSON object per line
+DEFAULT_TRACE_LOG = Path(os.environ.get(
+    "TRACE_LOG", PROJECT_ROOT / "data" / "traces.jsonl"
+))
+
+# Latency buckets (seconds), from a local tool call to a slow web search
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "comment_responder_"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Adds amount to the series of the given label values."""
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def snapshot(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}"
+            for key, value in sorted(self.snapshot().items())
+        ]
+
+
+class Histogram:
+    """Fixed-bucket histogram with labels (cumulative buckets, sum and count)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, Dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        """Records one observation in the series of the given label values."""
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self) -> Dict[LabelValues, Dict]:
+        """
+        Returns every series.
+
+        Returns:
+            {label values: {"count", "sum", "buckets": [(upper bound, cumulative count)]}}
+        """
+        with self._lock:
+            result = {}
+            for key, series in self._series.items():
+                cumulative = 0
+                buckets = []
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+                buckets.append((float("inf"), series["count"]))
+                result[key] = {"count": series["count"], "sum": series["sum"], "buckets": buckets}
+            return result
+
+    def quantile(self, q: float, **labels: str) -> float:
+        """
+        Estimates a quantile of one series from its buckets, as histogram_quantile() does.
+
+        Args:
+            q: Quantile in [0, 1]
+            **labels: Label values of the series
+
+        Returns:
+            Estimated value (the highest finite bucket bound if it falls in +Inf)
+        """
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        series = self.snapshot().get(key)
+        if not series or not series["count"]:
+            return 0.0
+        rank = q * series["count"]
+        lower, below = 0.0, 0
+        for bound, cumulative in series["buckets"]:
+            if cumulative >= rank:
+                if bound == float("inf"):
+                    return self.buckets[-1]
+                in_bucket = cumulative - below
+                return lower + (bound - lower) * ((rank - below) / in_bucket if in_bucket else 0.0)
+            lower, below = bound, cumulative
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self.snapshot().items()):
+            for bound, cumulative in series["buckets"]:
+                le = ("le", _format_number(bound) if bound == float("inf") else repr(float(bound)))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {repr(float(series['sum']))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named counters and histograms, rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        full_name = METRIC_PREFIX + name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        """Returns the counter of a name (without the prefix), registering it on first use."""
+        return self._get_or_create(Counter, name, description, labels)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Returns the histogram of a name (without the prefix), registering it on first use."""
+        return self._get_or_create(Histogram, name, description, labels, buckets)
+
+    def render_prometheus(self) -> str:
+        """
+        Renders every metric in the Prometheus text exposition format (0.0.4).
+
+        Returns:
+            Exposition text, ending with a newline
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines: List[str] = []
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {metric.description}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Returns the values of every metric.
+
+        Returns:
+            {metric name: {label values: value (counters) or series (histograms)}}
+        """
+        with self._lock:
+            metrics = list(self._metrics.items())
+        return {name: metric.snapshot() for name, metric in metrics}
+
+
+class TraceLog:
+    """Appends spans to a JSONL file."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else DEFAULT_TRACE_LOG
+        self._lock = threading.Lock()
+
+    def write(self, span: Dict):
+        """
+        Appends one span.
+
+        Args:
+            span: JSON-serializable span record
+        """
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span, ensure_ascii=False) + "\n")
+            except OSError:
+                logger.warning("Could not write trace log %s", self.path, exc_info=True)
+
+
+_registry: Optional[MetricsRegistry] = None
+_trace_log: Optional[TraceLog] = None
+_singletons_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Returns the process-wide metrics registry, creating it on first use.
+
+    Returns:
+        Shared MetricsRegistry
+    """
+    global _registry
+    with _singletons_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def get_trace_log() -> TraceLog:
+    """
+    Returns the process-wide trace log, creating it on first use.
+
+    Returns:
+        TraceLog writing to data/traces.jsonl (or TRACE_LOG)
+    """
+    global _trace_log
+    with _singletons_lock:
+        if _trace_log is None:
+            _trace_log = TraceLog()
+        return _trace_log
+
+
+def start_metrics_server(
+    port: int,
+    host: str = "127.0.0.1",
+    registry: Optional[MetricsRegistry] = None,
+) -> ThreadingHTTPServer:
+    """
+    Serves the registry at http://host:port/metrics from a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one; see server.server_port)
+        host: Interface to bind
+        registry: Registry to serve (defaults to the process-wide one)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    registry = registry or get_metrics()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes are not worth a log line each
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
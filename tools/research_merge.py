@@ -0,0 +1,170 @@
+"""
+Research Merge - Merges transcript and web findings in code.
+
+SynthesisAgent mostly restates the two research outputs before the
+QuestionResponderAgent runs, which costs a full serial model call. For
+small inputs the same result is built here:
+
+- both outputs are split into sentences (markdown bullets, headings and
+  numbering stripped)
+- near-identical sentences that agree are dropped, keeping the first one;
+  transcript sentences come first, so the channel's own content wins
+- every sentence is tagged with its source ([Transcript] or [Web])
+- sources that are missing, skipped or UNAVAILABLE are noted as such
+
+Pairs of sentences from the two sources that talk about the same thing
+but disagree (different numbers, or one negated) are reported as
+contradictions, so the caller can hand them to the model instead.
+"""
+
+import re
+from typing import Dict, List, Set, Tuple
+
+from tools.token_budget import count_tokens
+from tools.transcript_query import tokenize
+
+
+# Token-set Jaccard similarity above which two sentences are duplicates
+DUPLICATE_SIMILARITY = 0.8
+
+# Share of the shorter sentence's words that another sentence must contain
+# for the two to be about the same thing
+SAME_TOPIC_OVERLAP = 0.6
+
+# Sentences with fewer tokens than this are dropped as fragments
+MIN_SENTENCE_TOKENS = 3
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_LIST_PREFIX_RE = re.compile(r"^\s*(?:[#>*\-•]+|\d+[.)])\s*")
+_EMPHASIS_RE = re.compile(r"\*\*|__|`")
+_NEGATIONS = frozenset({"not", "no", "never", "cannot", "cant", "dont", "doesnt", "isnt", "wont", "nahi"})
+_NUMBER_RE = re.compile(r"^\d+$")
+# "can't" would tokenize to "can" + "t" and "12,400" / "1,00,000" to
+# separate numbers
+_CONTRACTION_RE = re.compile(r"n['’]t\b", re.IGNORECASE)
+_DIGIT_GROUP_RE = re.compile(r"(?<=\d),(?=\d{2,3}(?:\b|,))")
+
+# Prefixes of outputs that carry no findings
+_NO_CONTENT_PREFIXES = ("UNAVAILABLE", "Web search was skipped")
+
+
+def has_content(output: str) -> bool:
+    """Whether a research output carries findings (not empty, skipped or unavailable)."""
+    return bool(output and output.strip()) and not output.strip().startswith(_NO_CONTENT_PREFIXES)
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits a research output into clean sentences.
+
+    Args:
+        text: Agent output, possibly markdown
+
+    Returns:
+        Sentences without list markers or emphasis, headings dropped
+    """
+    sentences: List[str] = []
+    for line in (text or "").splitlines():
+        line = _EMPHASIS_RE.sub("", _LIST_PREFIX_RE.sub("", line)).strip()
+        if not line or line.endswith(":"):
+            continue  # Blank lines and headings such as "Findings:"
+        for sentence in _SENTENCE_END_RE.split(line):
+            sentence = sentence.strip()
+            if len(tokenize(sentence)) >= MIN_SENTENCE_TOKENS:
+                sentences.append(sentence)
+    return sentences
+
+
+def sentence_tokens(sentence: str) -> Set[str]:
+    """
+    Token set of a sentence, with "n't" read as "not" and digit grouping removed.
+
+    Args:
+        sentence: One sentence from split_sentences()
+
+    Returns:
+        Set of lowercase tokens
+    """
+    return set(tokenize(_DIGIT_GROUP_RE.sub("", _CONTRACTION_RE.sub(" not", sentence))))
+
+
+def _similarity(first: Set[str], second: Set[str]) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def _overlap(first: Set[str], second: Set[str]) -> float:
+    """Share of the smaller set's words found in the other, ignoring numbers."""
+    first = {token for token in first if not _NUMBER_RE.match(token)}
+    second = {token for token in second if not _NUMBER_RE.match(token)}
+    if not first or not second:
+        return 0.0
+    return len(first & second) / min(len(first), len(second))
+
+
+def _contradicts(first: Set[str], second: Set[str]) -> bool:
+    """Whether two same-topic sentences disagree on numbers or negation."""
+    first_numbers = {token for token in first if _NUMBER_RE.match(token)}
+    second_numbers = {token for token in second if _NUMBER_RE.match(token)}
+    # One sentence may carry extra numbers (a video number, a year) and still agree
+    if first_numbers and second_numbers and not (first_numbers <= second_numbers or second_numbers <= first_numbers):
+        return True
+    return bool(first & _NEGATIONS) != bool(second & _NEGATIONS)
+
+
+def merge_research(transcript_results: str, search_results: str) -> Dict:
+    """
+    Merges transcript and web findings into one deduplicated, tagged summary.
+
+    Args:
+        transcript_results: TranscriptAgent output
+        search_results: SearchAgent output
+
+    Returns:
+        Dictionary with text (the merged summary), tokens (estimated size
+        of both inputs), contradictions (pairs of disagreeing sentences)
+        and the number of sentences kept and dropped
+    """
+    sources = [("Transcript", transcript_results), ("Web", search_results)]
+    kept: List[Tuple[str, str, Set[str]]] = []  # (tag, sentence, token set)
+    dropped = 0
+    notes: List[str] = []
+    labels = {"Transcript": "video transcripts", "Web": "web search"}
+    for tag, output in sources:
+        if not has_content(output):
+            # Keep the skipped / UNAVAILABLE note itself, it says why
+            notes.append(f"Note: {output.strip()}" if output and output.strip() else f"Missing: no findings from the {labels[tag]}.")
+            continue
+        for sentence in split_sentences(output):
+            token_set = sentence_tokens(sentence)
+            if any(
+                _similarity(token_set, other) >= DUPLICATE_SIMILARITY and not _contradicts(token_set, other)
+                for _, _, other in kept
+            ):
+                dropped += 1
+                continue
+            kept.append((tag, sentence, token_set))
+
+    contradictions: List[Tuple[str, str]] = []
+    for tag, sentence, token_set in kept:
+        if tag != "Transcript":
+            continue
+        for other_tag, other_sentence, other_set in kept:
+            if other_tag != "Web":
+                continue
+            if _overlap(token_set, other_set) >= SAME_TOPIC_OVERLAP and _contradicts(token_set, other_set):
+                contradictions.append((sentence, other_sentence))
+
+    lines = ["Key points from the research (transcript first):"]
+    lines.extend(f"- [{tag}] {sentence}" for tag, sentence, _ in kept)
+    if not kept:
+        lines.append("- No relevant information was found in the sources.")
+    lines.extend(notes)
+    return {
+        "text": "\n".join(lines),
+        "tokens": count_tokens(transcript_results) + count_tokens(search_results),
+        "contradictions": contradictions,
+        "kept": len(kept),
+        "dropped": dropped,
+    }
@@ -0,0 +1,448 @@
+"""
+Response Cache - Reuses answers for repeated and near-identical comments.
+
+Many comments say the same thing in slightly different words: "Thank you
+sir!", "thanku sir 🙏", "THANK YOU SIR!!!", or the same question about
+a GATE score worded a dozen ways. Each one used to run the whole
+pipeline. The cache sits in front of the root agent:
+
+- exact hits are keyed on a normalized form of the comment (case,
+  punctuation, emoji, repeated letters and whitespace folded, spelling
+  variants such as "thanku" mapped like the transcript tokenizer does)
+- near-duplicates are found with MinHash signatures over character
+  trigrams and an LSH band index, then confirmed on the estimated
+  Jaccard similarity and on the numbers the comment mentions (a "600"
+  question must not get the "700" answer); questions must also match on
+  word bigrams, because trigrams ignore word order and "MBA after MTech"
+  is not "MTech after MBA"
+- Praise and Question answers have their own policy (time to live and
+  how similar a near-duplicate must be); other comments are not cached.
+  The cache is checked before the comment is classified, so a comment with
+  a question cue ("?", kya, kab, kitna, ...) never gets a cached praise
+  reply: "Thank you sir for the MTech video but stipend kitna?" is close
+  to "Thank you sir for the MTech video" but needs an answer
+- the cache is bounded in size (least recently used entries are evicted
+  first) and entries expire after their policy's TTL
+- entries can be persisted to a local SQLite file (RESPONSE_CACHE_PATH),
+  so the cache survives restarts
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from tools.comment_prefilter import asks_question
+from tools.transcript_query import tokenize
+
+
+# Maximum number of cached responses (0 disables the cache)
+DEFAULT_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_SIZE", "2000"))
+
+# SQLite file to persist the cache in (unset: memory only)
+DEFAULT_CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH") or None
+
+# MinHash signature length, split into LSH bands of NUM_PERMUTATIONS / LSH_BANDS rows
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+# Fixed seed so signatures stay comparable across processes (and in SQLite)
+MINHASH_SEED = 1234
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_REPEATED_LETTERS_RE = re.compile(r"([a-z])\1{2,}")
+_NUMBER_RE = re.compile(r"^\d+$")
+
+# Multi-word phrasings folded to one canonical word before keying
+_PHRASE_FOLDS = {
+    "thank you": "thanks",
+    "thank u": "thanks",
+    "thanks you": "thanks",
+    "thanks a lot": "thanks",
+    "thank you so much": "thanks",
+    "thanks so much": "thanks",
+}
+
+
+class CachePolicy:
+    """How long answers of one comment type live and how they may be reused."""
+
+    __slots__ = ("ttl_seconds", "near_duplicates", "min_similarity", "word_order", "serve_questions")
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        near_duplicates: bool = True,
+        min_similarity: float = 0.8,
+        word_order: bool = False,
+        serve_questions: bool = True,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.near_duplicates = near_duplicates  # Serve near-duplicate hits at all
+        self.min_similarity = min_similarity  # Estimated Jaccard for a near-duplicate hit
+        self.word_order = word_order  # Near-duplicates must also reach min_similarity on word bigrams
+        self.serve_questions = serve_questions  # Serve hits (even exact) to comments with question cues
+
+
+# Thank-you replies barely depend on the wording, so they live long and
+# match fairly loosely, but never answer a comment that asks something. Answers to questions depend on the exact question and on
+# research that goes stale, so they expire sooner, must match closely and
+# must keep their word order.
+DEFAULT_POLICIES: Dict[str, CachePolicy] = {
+    "Praise": CachePolicy(ttl_seconds=7 * 24 * 3600, near_duplicates=True, min_similarity=0.7, serve_questions=False),
+    "Question": CachePolicy(ttl_seconds=24 * 3600, near_duplicates=True, min_similarity=0.85, word_order=True),
+}
+
+
+def normalize_comment(comment: str) -> str:
+    """
+    Folds a comment to the form used as its exact cache key.
+
+    Args:
+        comment: Raw comment text
+
+    Returns:
+        Lowercase words joined by single spaces, without punctuation or
+        emoji ("" if nothing is left)
+    """
+    text = _REPEATED_LETTERS_RE.sub(r"\1", comment.lower())
+    normalized = " ".join(tokenize(text))
+    for phrase in sorted(_PHRASE_FOLDS, key=len, reverse=True):
+        normalized = re.sub(rf"\b{phrase}\b", _PHRASE_FOLDS[phrase], normalized)
+    return normalized
+
+
+def comment_numbers(normalized: str) -> Tuple[str, ...]:
+    """
+    Returns the numbers a normalized comment mentions, in order.
+
+    Args:
+        normalized: Output of normalize_comment()
+
+    Returns:
+        Tuple of numeric tokens
+    """
+    return tuple(token for token in normalized.split() if _NUMBER_RE.match(token))
+
+
+def word_order_similarity(first: str, second: str) -> float:
+    """
+    Jaccard similarity of two normalized comments over word bigrams.
+
+    Unlike character trigrams, bigrams (with start and end markers) change
+    when words swap places: "can i do mba after mtech" and "can i do mtech
+    after mba" share only 3 of 11.
+
+    Args:
+        first: Output of normalize_comment()
+        second: Output of normalize_comment()
+
+    Returns:
+        0.0 - 1.0 (1.0 for identical word sequences)
+    """
+    def bigrams(normalized: str) -> Set[Tuple[str, str]]:
+        words = ["^"] + normalized.split() + ["$"]
+        return set(zip(words, words[1:]))
+
+    first_bigrams, second_bigrams = bigrams(first), bigrams(second)
+    return len(first_bigrams & second_bigrams) / len(first_bigrams | second_bigrams)
+
+
+class MinHasher:
+    """MinHash signatures over character trigrams with universal hashing."""
+
+    def __init__(self, num_permutations: int = NUM_PERMUTATIONS, seed: int = MINHASH_SEED):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _MERSENNE_PRIME, size=num_permutations, dtype=np.uint64)
+        self.b = rng.integers(0, _MERSENNE_PRIME, size=num_permutations, dtype=np.uint64)
+
+    @staticmethod
+    def shingles(normalized: str) -> Set[str]:
+        """Character trigrams of the normalized text, padded at both ends."""
+        padded = f" {normalized} "
+        return {padded[i:i + 3] for i in range(max(1, len(padded) - 2))}
+
+    def signature(self, normalized: str) -> np.ndarray:
+        """
+        Computes the MinHash signature of a normalized comment.
+
+        Args:
+            normalized: Output of normalize_comment()
+
+        Returns:
+            uint64 array of NUM_PERMUTATIONS minimum hash values
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in self.shingles(normalized)),
+            dtype=np.uint64,
+        )
+        # a * x stays below 2^63 because a < 2^31 and x < 2^32
+        values = (np.outer(self.a, hashes) + self.b[:, None]) % _MERSENNE_PRIME
+        return values.min(axis=1)
+
+
+def estimated_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """
+    Estimates the Jaccard similarity of two comments from their signatures.
+
+    Args:
+        first: MinHash signature
+        second: MinHash signature of the same length
+
+    Returns:
+        Share of equal signature positions (0.0 - 1.0)
+    """
+    return float(np.mean(first == second))
+
+
+class CacheEntry:
+    """One cached response."""
+
+    __slots__ = ("key", "response", "comment_type", "signature", "numbers", "created", "expires")
+
+    def __init__(self, key: str, response: str, comment_type: str, signature: np.ndarray, created: float, expires: float):
+        self.key = key
+        self.response = response
+        self.comment_type = comment_type
+        self.signature = signature
+        self.numbers = comment_numbers(key)
+        self.created = created
+        self.expires = expires
+
+
+class ResponseCache:
+    """Size- and TTL-bounded response cache with exact and near-duplicate lookup."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        policies: Optional[Dict[str, CachePolicy]] = None,
+        bands: int = LSH_BANDS,
+    ):
+        self.max_entries = max_entries
+        self.policies = policies or DEFAULT_POLICIES
+        self.hasher = MinHasher()
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        if path and max_entries > 0:
+            self._open(path)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def lookup(self, comment: str) -> Optional[Dict]:
+        """
+        Finds a cached response for a comment.
+
+        Args:
+            comment: Raw comment text
+
+        Returns:
+            Dictionary with response, comment_type, match ("exact" or
+            "near") and similarity, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        key = normalize_comment(comment)
+        if not key:
+            return None
+        now = time.time()
+        asks = asks_question(comment)
+        with self._lock:
+            self._counters["lookups"] += 1
+            entry = self._live_entry(key, now)
+            if entry is not None and self._servable(entry, asks):
+                self._entries.move_to_end(key)
+                self._counters["exact_hits"] += 1
+                return self._hit(entry, "exact", 1.0)
+
+        signature = self.hasher.signature(key)
+        numbers = comment_numbers(key)
+        with self._lock:
+            best, best_similarity = None, 0.0
+            for candidate_key in self._candidates(signature):
+                entry = self._live_entry(candidate_key, now)
+                if entry is None or entry.numbers != numbers:
+                    continue
+                policy = self.policies.get(entry.comment_type)
+                if policy is None or not policy.near_duplicates or not self._servable(entry, asks):
+                    continue
+                similarity = estimated_similarity(signature, entry.signature)
+                if similarity >= policy.min_similarity and policy.word_order:
+                    similarity = min(similarity, word_order_similarity(key, entry.key))
+                if similarity >= policy.min_similarity and similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+            if best is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(best.key)
+            self._counters["near_hits"] += 1
+            return self._hit(best, "near", best_similarity)
+
+    def store(self, comment: str, response: str, comment_type: str) -> bool:
+        """
+        Caches the response to a comment under its type's policy.
+
+        Args:
+            comment: Raw comment text
+            response: Response that was sent
+            comment_type: "Praise" or "Question"; other types are not cached
+
+        Returns:
+            True if the response was cached
+        """
+        policy = self.policies.get(comment_type)
+        key = normalize_comment(comment)
+        if not self.enabled or policy is None or not key or not response:
+            return False
+        now = time.time()
+        entry = CacheEntry(key, response, comment_type, self.hasher.signature(key), now, now + policy.ttl_seconds)
+        with self._lock:
+            self._insert(entry)
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, comment_type, signature, created, expires) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, response, comment_type, entry.signature.astype("<u8").tobytes(), entry.created, entry.expires),
+                )
+                self._db.commit()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dictionary with lookups, exact_hits, near_hits, misses, stores,
+            evictions, expired and the current number of entries
+        """
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries)}
+
+    def clear(self):
+        """Drops every entry, including the persisted ones."""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _servable(self, entry: CacheEntry, asks: bool) -> bool:
+        """Whether an entry may answer a comment that does (asks) or does not ask something."""
+        policy = self.policies.get(entry.comment_type)
+        return policy is not None and (policy.serve_questions or not asks)
+
+    def _hit(self, entry: CacheEntry, match: str, similarity: float) -> Dict:
+        return {
+            "response": entry.response,
+            "comment_type": entry.comment_type,
+            "match": match,
+            "similarity": round(similarity, 3),
+        }
+
+    def _live_entry(self, key: str, now: float) -> Optional[CacheEntry]:
+        """Returns the entry for a key, dropping it if it has expired (lock held)."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires <= now:
+            self._remove(key)
+            self._counters["expired"] += 1
+            return None
+        return entry
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _candidates(self, signature: np.ndarray) -> Set[str]:
+        """Keys sharing at least one LSH band with the signature (lock held)."""
+        candidates: Set[str] = set()
+        for band_key in self._band_keys(signature):
+            candidates |= self._buckets.get(band_key, set())
+        return candidates
+
+    def _insert(self, entry: CacheEntry):
+        """Adds or replaces an entry as the most recently used (lock held)."""
+        if entry.key in self._entries:
+            self._remove(entry.key, persist=False)
+        self._entries[entry.key] = entry
+        for band_key in self._band_keys(entry.signature):
+            self._buckets.setdefault(band_key, set()).add(entry.key)
+
+    def _remove(self, key: str, persist: bool = True):
+        """Removes an entry from the map, the LSH buckets and the file (lock held)."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in self._band_keys(entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+        if persist and self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _open(self, path: str):
+        """Opens (or creates) the SQLite file and loads its live entries."""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, comment_type TEXT NOT NULL, "
+            "signature BLOB NOT NULL, created REAL NOT NULL, expires REAL NOT NULL)"
+        )
+        now = time.time()
+        self._db.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        self._db.commit()
+        # Keep the newest entries, inserted oldest first so they end up most recently used
+        rows = self._db.execute(
+            "SELECT key, response, comment_type, signature, created, expires FROM responses "
+            "ORDER BY created DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, response, comment_type, signature, created, expires in reversed(rows):
+            signature = np.frombuffer(signature, dtype="<u8").astype(np.uint64)
+            if len(signature) != NUM_PERMUTATIONS:
+                continue  # Written with a different signature length
+            self._insert(CacheEntry(key, response, comment_type, signature, created, expires))
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Returns the process-wide response cache.
+
+    Returns:
+        ResponseCache sized by RESPONSE_CACHE_SIZE and persisted to
+        RESPONSE_CACHE_PATH when that is set
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
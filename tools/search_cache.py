@@ -0,0 +1,199 @@
+"""
+Search Cache - SQLite memoization of SearchAgent results by normalized question.
+
+The same questions (cutoffs, stipend, placements) come up all day, and each
+one used to cost a SearchAgent call with a google_search round-trip. This
+module keeps the SearchAgent's findings in a local SQLite file, keyed by
+the normalized question (the same folding as the response cache), so a
+repeat question reuses them.
+
+How long findings stay fresh depends on the topic: exam dates, cutoffs and
+results change often, fees and placement figures change yearly, and
+preparation advice hardly at all. Entries past their TTL are stale. By
+default a stale entry is a miss. In stale-while-revalidate mode
+(SEARCH_CACHE_STALE_WHILE_REVALIDATE=1) a stale entry is still served,
+up to SEARCH_CACHE_MAX_STALE seconds past its TTL, while the caller
+refreshes it in the background.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tools.response_cache import normalize_comment
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", str(PROJECT_ROOT / "data" / "search_cache.sqlite"))
+
+# Serve stale entries while refreshing them in the background
+STALE_WHILE_REVALIDATE = os.environ.get("SEARCH_CACHE_STALE_WHILE_REVALIDATE", "0").lower() in ("1", "true", "yes")
+
+# How long past its TTL a stale entry may still be served (seconds)
+MAX_STALE_SECONDS = float(os.environ.get("SEARCH_CACHE_MAX_STALE", str(7 * 24 * 3600)))
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+
+# (topic, TTL, keywords), checked in order; the first topic with a keyword in
+# the question wins. Fast-moving topics come first.
+TOPIC_TTLS: List[Tuple[str, float, frozenset]] = [
+    ("announcements", 6 * HOUR, frozenset({
+        "cutoff", "cutoffs", "result", "results", "date", "dates", "deadline", "notification",
+        "admit", "answer", "key", "schedule", "latest", "today", "news", "vacancy", "vacancies",
+        "registration", "form", "counselling", "counseling", "rank",
+    })),
+    ("figures", 3 * DAY, frozenset({
+        "stipend", "salary", "package", "ctc", "placement", "placements", "fees", "fee",
+        "seats", "seat", "eligibility", "age", "limit", "pay",
+    })),
+    ("evergreen", 14 * DAY, frozenset({
+        "syllabus", "prepare", "preparation", "books", "book", "strategy", "tips", "concept",
+        "difference", "meaning", "explain", "study", "notes",
+    })),
+]
+DEFAULT_TOPIC = "general"
+DEFAULT_TTL = 1 * DAY
+
+
+def topic_ttl(normalized: str) -> Tuple[str, float]:
+    """
+    Picks a freshness topic and TTL for a normalized question.
+
+    Args:
+        normalized: Output of normalize_comment()
+
+    Returns:
+        (topic, ttl_seconds)
+    """
+    words = set(normalized.split())
+    for topic, ttl, keywords in TOPIC_TTLS:
+        if words & keywords:
+            return topic, ttl
+    return DEFAULT_TOPIC, DEFAULT_TTL
+
+
+class SearchCache:
+    """SQLite-backed search-result cache with topic TTLs."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        stale_while_revalidate: bool = STALE_WHILE_REVALIDATE,
+        max_stale_seconds: float = MAX_STALE_SECONDS,
+    ):
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale_seconds = max_stale_seconds
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS search_results ("
+            "key TEXT PRIMARY KEY, query TEXT NOT NULL, results TEXT NOT NULL, "
+            "topic TEXT NOT NULL, fetched REAL NOT NULL, expires REAL NOT NULL)"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "fresh_hits": 0, "stale_hits": 0, "misses": 0, "stores": 0}
+
+    def lookup(self, query: str) -> Optional[Dict]:
+        """
+        Finds cached findings for a question.
+
+        Args:
+            query: Question or search query (normalized here)
+
+        Returns:
+            Dictionary with results, topic, age_seconds and stale (True
+            when served under stale-while-revalidate), or None on a miss
+        """
+        key = normalize_comment(query)
+        if not key:
+            return None
+        now = time.time()
+        with self._lock:
+            self._counters["lookups"] += 1
+            row = self._db.execute(
+                "SELECT results, topic, fetched, expires FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                results, topic, fetched, expires = row
+                stale = expires <= now
+                if not stale or (self.stale_while_revalidate and now - expires < self.max_stale_seconds):
+                    self._counters["stale_hits" if stale else "fresh_hits"] += 1
+                    return {"results": results, "topic": topic, "age_seconds": round(now - fetched), "stale": stale}
+            self._counters["misses"] += 1
+            return None
+
+    def store(self, query: str, results: str) -> bool:
+        """
+        Caches the findings for a question with its topic's TTL.
+
+        Args:
+            query: Question or search query (normalized here)
+            results: SearchAgent findings
+
+        Returns:
+            True if the findings were cached
+        """
+        key = normalize_comment(query)
+        if not key or not results or not results.strip():
+            return False
+        topic, ttl = topic_ttl(key)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_results (key, query, results, topic, fetched, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, query, results, topic, now, now + ttl),
+            )
+            self._db.commit()
+            self._counters["stores"] += 1
+        return True
+
+    def purge(self) -> int:
+        """
+        Deletes entries that can no longer be served, even as stale.
+
+        Returns:
+            Number of entries deleted
+        """
+        cutoff = time.time() - (self.max_stale_seconds if self.stale_while_revalidate else 0.0)
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM search_results WHERE expires <= ?", (cutoff,)).rowcount
+            self._db.commit()
+        return deleted
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dictionary with lookups, fresh_hits, stale_hits, misses, stores
+            and the number of stored entries
+        """
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+            return {**self._counters, "entries": entries}
+
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """
+    Returns the process-wide search cache.
+
+    Returns:
+        SearchCache stored at SEARCH_CACHE_PATH (default data/search_cache.sqlite)
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache()
+            _search_cache.purge()
+        return _search_cache
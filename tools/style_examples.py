@@ -0,0 +1,225 @@
+"""
+Style Examples - Shared store of reply examples, with nearest-example lookup.
+
+The responder agents used to paste every example of data/gold_standard.json
+into their system instructions (each with its own copy of the loader), and
+data/gold_responses.txt was never used. As the curated reply set grows,
+that bloats every prompt.
+
+This module loads both files once per process (reloading when either file
+changes), indexes the example comments with TF-IDF weighted terms in an
+inverted index, and returns the k examples whose comments are closest to
+the incoming one. style_instruction() turns an instruction template into
+a per-request instruction provider that injects those k examples, so the
+prompt size stays flat however many examples there are.
+"""
+
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.utils.instructions_utils import inject_session_state
+
+from tools.transcript_query import tokenize
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+GOLD_STANDARD_PATH = PROJECT_ROOT / "data" / "gold_standard.json"
+GOLD_RESPONSES_PATH = PROJECT_ROOT / "data" / "gold_responses.txt"
+
+# Examples injected into each prompt
+DEFAULT_EXAMPLE_COUNT = int(os.environ.get("STYLE_EXAMPLE_COUNT", "6"))
+
+# Replaced by the selected examples in instruction templates. Examples are
+# inserted after session state injection, so braces in them are kept as-is.
+EXAMPLES_PLACEHOLDER = "<<STYLE_EXAMPLES>>"
+
+
+class StyleExample:
+    """One comment and the reply written to it."""
+
+    __slots__ = ("comment", "response", "source")
+
+    def __init__(self, comment: str, response: str, source: str):
+        self.comment = comment
+        self.response = response
+        self.source = source  # File the example came from
+
+    def format(self) -> str:
+        return f"Comment: {self.comment}\nReply: {self.response}"
+
+
+def _strip_quotes(text: str) -> str:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return text[1:-1]
+    return text
+
+
+def load_style_examples(
+    gold_standard_path: Optional[Path] = None,
+    gold_responses_path: Optional[Path] = None,
+) -> List[StyleExample]:
+    """
+    Reads the examples of both gold files.
+
+    gold_standard.json is a list of {"input_comment", "your_response"}
+    objects; gold_responses.txt holds "Comment: ..." lines, each followed by
+    a "Reply: ..." line.
+
+    Args:
+        gold_standard_path: JSON examples (defaults to data/gold_standard.json)
+        gold_responses_path: Text examples (defaults to data/gold_responses.txt)
+
+    Returns:
+        List of examples in file order (files that are missing are skipped)
+    """
+    standard = Path(gold_standard_path or GOLD_STANDARD_PATH)
+    responses = Path(gold_responses_path or GOLD_RESPONSES_PATH)
+    examples: List[StyleExample] = []
+    if standard.exists():
+        with open(standard, "r", encoding="utf-8") as f:
+            for item in json.load(f):
+                examples.append(StyleExample(item["input_comment"], item["your_response"], standard.name))
+    if responses.exists():
+        comment = None
+        with open(responses, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("Comment:"):
+                    comment = _strip_quotes(line[len("Comment:"):])
+                elif line.startswith("Reply:") and comment is not None:
+                    examples.append(StyleExample(comment, _strip_quotes(line[len("Reply:"):]), responses.name))
+                    comment = None
+    return examples
+
+
+class StyleExampleStore:
+    """Inverted TF-IDF index over example comments for k-nearest lookup."""
+
+    def __init__(self, examples: List[StyleExample]):
+        self.examples = examples
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.norms: List[float] = []
+        document_frequency: Dict[str, int] = {}
+        term_counts: List[Dict[str, int]] = []
+        for example in examples:
+            counts: Dict[str, int] = {}
+            for token in tokenize(example.comment):
+                counts[token] = counts.get(token, 0) + 1
+            term_counts.append(counts)
+            for token in counts:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        self.idf = {
+            term: math.log((1 + len(examples)) / (1 + df)) + 1.0
+            for term, df in document_frequency.items()
+        }
+        for example_id, counts in enumerate(term_counts):
+            weights = {term: (1.0 + math.log(count)) * self.idf[term] for term, count in counts.items()}
+            self.norms.append(math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0)
+            for term, weight in weights.items():
+                self.postings.setdefault(term, []).append((example_id, weight))
+
+    def nearest(self, comment: str, k: int = DEFAULT_EXAMPLE_COUNT) -> List[StyleExample]:
+        """
+        Returns the k examples whose comments are most similar to a comment.
+
+        Similarity is the cosine of TF-IDF vectors; only examples sharing a
+        term with the comment are scored. When fewer than k examples match,
+        the rest are filled with the first examples in file order, so the
+        model always sees k samples of the style.
+
+        Args:
+            comment: Incoming comment
+            k: Number of examples
+
+        Returns:
+            Up to k examples, most similar first
+        """
+        counts: Dict[str, int] = {}
+        for token in tokenize(comment):
+            if token in self.idf:
+                counts[token] = counts.get(token, 0) + 1
+        scores: Dict[int, float] = {}
+        for term, count in counts.items():
+            query_weight = (1.0 + math.log(count)) * self.idf[term]
+            for example_id, weight in self.postings[term]:
+                scores[example_id] = scores.get(example_id, 0.0) + query_weight * weight
+        ranked = sorted(scores, key=lambda example_id: (-scores[example_id] / self.norms[example_id], example_id))
+        selected = ranked[:k]
+        for example_id in range(len(self.examples)):
+            if len(selected) >= k:
+                break
+            if example_id not in scores:
+                selected.append(example_id)
+        return [self.examples[example_id] for example_id in selected]
+
+    def format_nearest(self, comment: str, k: int = DEFAULT_EXAMPLE_COUNT) -> str:
+        """
+        Formats the k nearest examples for a prompt.
+
+        Args:
+            comment: Incoming comment
+            k: Number of examples
+
+        Returns:
+            "Comment: ... / Reply: ..." blocks separated by blank lines
+        """
+        return "\n\n".join(example.format() for example in self.nearest(comment, k))
+
+
+_store: Optional[StyleExampleStore] = None
+_store_mtimes: Optional[Tuple[int, int]] = None
+_store_lock = threading.Lock()
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def get_style_example_store() -> StyleExampleStore:
+    """
+    Returns the process-wide example store, reloading it when a gold file changes.
+
+    Returns:
+        StyleExampleStore over data/gold_standard.json and data/gold_responses.txt
+    """
+    global _store, _store_mtimes
+    mtimes = (_mtime(GOLD_STANDARD_PATH), _mtime(GOLD_RESPONSES_PATH))
+    with _store_lock:
+        if _store is None or mtimes != _store_mtimes:
+            _store = StyleExampleStore(load_style_examples())
+            _store_mtimes = mtimes
+        return _store
+
+
+def style_instruction(
+    template: str,
+    k: int = DEFAULT_EXAMPLE_COUNT,
+) -> Callable[[ReadonlyContext], Awaitable[str]]:
+    """
+    Builds an instruction provider that adds the examples nearest to each comment.
+
+    Args:
+        template: Instruction with {state_key} placeholders and one
+            EXAMPLES_PLACEHOLDER where the examples go
+        k: Number of examples per request
+
+    Returns:
+        Async instruction provider for LlmAgent(instruction=...)
+    """
+
+    async def provider(context: ReadonlyContext) -> str:
+        comment = ""
+        if context.user_content and context.user_content.parts:
+            comment = "".join(part.text or "" for part in context.user_content.parts)
+        instruction = await inject_session_state(template, context)
+        return instruction.replace(EXAMPLES_PLACEHOLDER, get_style_example_store().format_nearest(comment, k))
+
+    return provider
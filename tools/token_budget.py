@@ -0,0 +1,331 @@
+"""
+Token Budget - Approximate token counting, budgets and relevance-ordered trimming.
+
+Nothing used to limit what flowed from one stage into the next: transcript
+excerpts, web findings and the synthesized info were pasted into the next
+prompt whatever their size, and no one could tell which stage used the
+tokens. This module holds the pieces the budget callbacks
+(agents/token_budget_callbacks.py) are built from:
+
+- count_tokens(): a local approximate tokenizer (no API call); words are
+  counted by length, digits in groups of three, punctuation and non-Latin
+  characters one each, which tracks Gemini's counts far closer than a
+  flat characters-per-token ratio on the channel's Hinglish comments
+- budgets for state values (STATE_BUDGETS), tool outputs
+  (TOOL_OUTPUT_BUDGET) and each agent's prompt (agent_budget())
+- trim_text(): cuts a text to a budget, keeping the lines and sentences
+  most relevant to the question, in their original order
+- TokenLedger: per-agent totals of tokens in and out, with a JSONL log of
+  every model call
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tools.transcript_query import tokenize
+
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Budgets (tokens) of the research values that feed later prompts
+STATE_BUDGETS: Dict[str, int] = {
+    "transcript_results": int(os.environ.get("TOKEN_BUDGET_TRANSCRIPT_RESULTS", "700")),
+    "search_results": int(os.environ.get("TOKEN_BUDGET_SEARCH_RESULTS", "700")),
+    "synthesized_info": int(os.environ.get("TOKEN_BUDGET_SYNTHESIZED_INFO", "900")),
+}
+
+# Budget (tokens) of one tool response as the model sees it
+TOOL_OUTPUT_BUDGET = int(os.environ.get("TOKEN_BUDGET_TOOL_OUTPUT", "1500"))
+
+# Prompt budgets (tokens, system instruction included) of each agent.
+# AGENT_TOKEN_BUDGETS="SearchAgent=2500,TranscriptAgent=5000" overrides them.
+DEFAULT_AGENT_BUDGET = int(os.environ.get("TOKEN_BUDGET_AGENT_DEFAULT", "4000"))
+AGENT_BUDGETS: Dict[str, int] = {
+    "ClassifierAgent": 1500,
+    "FilterAgent": 1200,
+    "RouterAgent": 1200,
+    "PraiseResponderAgent": 2000,
+    "SearchAgent": 2500,
+    "TranscriptAgent": 5000,
+    "SynthesisAgent": 3500,
+    "QuestionResponderAgent": 3500,
+}
+for _entry in os.environ.get("AGENT_TOKEN_BUDGETS", "").split(","):
+    if "=" in _entry:
+        _name, _budget = _entry.split("=", 1)
+        AGENT_BUDGETS[_name.strip()] = int(_budget)
+
+# Per-model-call token log
+DEFAULT_TOKEN_LOG = Path(os.environ.get(
+    "TOKEN_USAGE_LOG", PROJECT_ROOT / "data" / "token_usage.jsonl"
+))
+
+# Appended to a text that was cut to its budget
+TRIM_MARKER = "[Trimmed to fit the token budget; less relevant parts left out.]"
+
+# Lines longer than this are split into sentences before trimming
+MAX_SEGMENT_TOKENS = 120
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|[0-9]+|[^\sA-Za-z0-9]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Words that say nothing about what a question asks (also used by the
+# transcript coverage score, tools/transcript_search_tool.py)
+STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "is", "are", "was", "be",
+    "it", "this", "that", "i", "you", "me", "my", "your", "we", "what", "how", "why", "when",
+    "which", "who", "can", "should", "do", "does", "sir", "bhai", "please", "hai", "ka", "ki", "ke",
+})
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximates the number of tokens a text costs, without calling the API.
+
+    Latin words cost one token per 4 letters (rounded up), digit runs one
+    per 3 digits, and every punctuation mark, emoji or non-Latin character
+    one token.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Approximate token count
+    """
+    if not text:
+        return 0
+    total = 0
+    for piece in _PIECE_RE.findall(text):
+        if piece.isascii() and piece.isalpha():
+            total += math.ceil(len(piece) / 4)
+        elif piece.isascii() and piece.isdigit():
+            total += math.ceil(len(piece) / 3)
+        else:
+            total += 1
+    return total
+
+
+def agent_budget(agent_name: str) -> int:
+    """
+    Returns the prompt budget of an agent.
+
+    Args:
+        agent_name: Agent name, e.g. "SearchAgent"
+
+    Returns:
+        Budget in tokens (DEFAULT_AGENT_BUDGET for agents without their own)
+    """
+    return AGENT_BUDGETS.get(agent_name, DEFAULT_AGENT_BUDGET)
+
+
+def _query_terms(query: str) -> set:
+    return {token for token in tokenize(query or "") if token not in STOPWORDS}
+
+
+def _segments(text: str) -> List[str]:
+    """Splits a text into non-blank lines, and long lines into sentences."""
+    segments: List[str] = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if count_tokens(line) <= MAX_SEGMENT_TOKENS:
+            segments.append(line)
+        else:
+            segments.extend(sentence for sentence in _SENTENCE_END_RE.split(line) if sentence.strip())
+    return segments
+
+
+def _truncate_words(text: str, budget: int) -> str:
+    """Keeps the leading words of a text that fit in budget tokens."""
+    kept: List[str] = []
+    used = 0
+    for word in text.split():
+        cost = count_tokens(word)
+        if used + cost > budget:
+            break
+        kept.append(word)
+        used += cost
+    return " ".join(kept)
+
+
+def trim_text(text: str, budget: int, query: str = "") -> str:
+    """
+    Cuts a text to a token budget, keeping the parts most relevant to a query.
+
+    The text is split into lines (long lines into sentences). Segments are
+    ranked by how many of the query's terms they contain, earlier segments
+    first on ties, and taken in that order while they fit. The kept
+    segments are returned in their original order, followed by TRIM_MARKER.
+    If the most relevant segment alone is over budget, its start is kept.
+
+    Args:
+        text: Text to trim
+        budget: Token budget, marker included
+        query: Question or comment the text should answer
+
+    Returns:
+        The text unchanged if it fits, the trimmed text otherwise
+    """
+    if not text or count_tokens(text) <= budget:
+        return text
+    room = budget - count_tokens(TRIM_MARKER) - 1
+    if room <= 0:
+        return _truncate_words(text, budget)
+
+    segments = _segments(text)
+    terms = _query_terms(query)
+    scores = [len(terms & set(tokenize(segment))) for segment in segments]
+    costs = [count_tokens(segment) + 1 for segment in segments]  # + newline
+    ranked = sorted(range(len(segments)), key=lambda index: (-scores[index], index))
+    if costs[ranked[0]] > room:
+        # Even the most relevant segment is over budget: keep its start
+        # rather than filling the room with less relevant segments
+        return "\n".join([_truncate_words(segments[ranked[0]], room), TRIM_MARKER])
+    kept = set()
+    used = 0
+    for index in ranked:
+        if used + costs[index] <= room:
+            kept.add(index)
+            used += costs[index]
+    lines = [segments[index] for index in sorted(kept)]
+    return "\n".join(lines + [TRIM_MARKER])
+
+
+def trim_tool_response(response: Dict, budget: int = TOOL_OUTPUT_BUDGET) -> Tuple[Dict, int]:
+    """
+    Cuts a tool response to a token budget.
+
+    Responses with a "matches" list (the transcript search tools) are
+    ranked best first, so the lowest-ranked matches are dropped until the
+    response fits; count and message are updated to match. Other responses
+    are returned unchanged.
+
+    Args:
+        response: Tool response dictionary
+        budget: Token budget of the serialized response
+
+    Returns:
+        (response, number of matches dropped)
+    """
+    matches = response.get("matches") if isinstance(response, dict) else None
+    if not matches or count_tokens(json.dumps(response, ensure_ascii=False)) <= budget:
+        return response, 0
+    base = {key: value for key, value in response.items() if key != "matches"}
+    used = count_tokens(json.dumps(base, ensure_ascii=False)) + 20  # Room for the note
+    kept = []
+    for match in matches:
+        cost = count_tokens(json.dumps(match, ensure_ascii=False))
+        if kept and used + cost > budget:
+            break
+        kept.append(match)
+        used += cost
+    dropped = len(matches) - len(kept)
+    trimmed = dict(base, matches=kept, count=len(kept))
+    if dropped:
+        trimmed["message"] = (
+            f"{response.get('message', '')} "
+            f"({dropped} lower-ranked match(es) left out to fit the token budget)"
+        ).strip()
+    return trimmed, dropped
+
+
+class TokenLedger:
+    """Per-agent totals of model calls, tokens in and out, and trims."""
+
+    def __init__(self, log_path: Optional[Path] = None):
+        self.log_path = Path(log_path) if log_path else DEFAULT_TOKEN_LOG
+        self._totals: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _agent(self, agent_name: str) -> Dict[str, int]:
+        return self._totals.setdefault(agent_name, {
+            "calls": 0, "tokens_in": 0, "tokens_out": 0, "over_budget": 0, "trimmed": 0,
+        })
+
+    def record_call(
+        self,
+        agent_name: str,
+        tokens_in: int,
+        tokens_out: int,
+        budget: int,
+        source: str,
+        invocation_id: str = "",
+    ):
+        """
+        Records one model call and appends it to the token log.
+
+        Args:
+            agent_name: Agent that made the call
+            tokens_in: Prompt tokens
+            tokens_out: Response tokens
+            budget: The agent's prompt budget
+            source: "usage" (counted by the API), "estimate" (count_tokens),
+                or "error" / "cancelled" for calls without a response
+                (prompt estimate only)
+            invocation_id: Invocation the call belonged to
+        """
+        with self._lock:
+            totals = self._agent(agent_name)
+            totals["calls"] += 1
+            totals["tokens_in"] += tokens_in
+            totals["tokens_out"] += tokens_out
+            if tokens_in > budget:
+                totals["over_budget"] += 1
+            record = {
+                "time": time.time(),
+                "invocation_id": invocation_id,
+                "agent": agent_name,
+                "tokens_in": tokens_in,
+                "tokens_out": tokens_out,
+                "budget": budget,
+                "source": source,
+            }
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                logger.warning("Could not write token log %s", self.log_path, exc_info=True)
+        logger.info("tokens agent=%s in=%d out=%d budget=%d (%s)", agent_name, tokens_in, tokens_out, budget, source)
+
+    def record_trim(self, agent_name: str):
+        """Counts one state value, tool output or prompt part trimmed for an agent."""
+        with self._lock:
+            self._agent(agent_name)["trimmed"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the totals so far.
+
+        Returns:
+            {agent name: {calls, tokens_in, tokens_out, over_budget, trimmed}}
+        """
+        with self._lock:
+            return {agent_name: dict(totals) for agent_name, totals in self._totals.items()}
+
+
+_ledger: Optional[TokenLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_token_ledger() -> TokenLedger:
+    """
+    Returns the process-wide token ledger, creating it on first use.
+
+    Returns:
+        TokenLedger logging to data/token_usage.jsonl (or TOKEN_USAGE_LOG)
+    """
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = TokenLedger()
+        return _ledger
@@ -0,0 +1,98 @@
+"""
+Transcript Chunker - Splits the transcripts file into per-video sliding windows.
+
+The transcripts file is a sequence of "Video N: Title" headers, each followed
+by the transcript lines of that video. Blank lines are rare, so paragraphs
+are not a useful unit. Instead, each video is cut into overlapping windows
+of a fixed number of lines, and every window remembers which video it came
+from and which lines of the file it covers.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+
+# Number of transcript lines per chunk, and how far each window advances.
+# A stride smaller than the window gives overlapping chunks so an answer
+# that straddles a boundary is still fully contained in one chunk.
+CHUNK_LINES = 8
+CHUNK_STRIDE = 4
+
+_VIDEO_HEADER_RE = re.compile(r"^\s*Video\s+(\d+)\s*:\s*(.*?)\s*$", re.IGNORECASE)
+
+
+class VideoSection:
+    """The header and transcript lines of one video."""
+
+    __slots__ = ("video_number", "video_title", "byte_offset", "line_number", "lines")
+
+    def __init__(self, video_number: Optional[int], video_title: str, byte_offset: int, line_number: int):
+        self.video_number = video_number
+        self.video_title = video_title
+        self.byte_offset = byte_offset  # Where the section starts in the file
+        self.line_number = line_number  # Line of the header (or first line)
+        self.lines: List[Tuple[int, str]] = []  # (1-based line number, text)
+
+
+def split_video_sections(text: str, base_offset: int = 0, base_line: int = 1) -> List[VideoSection]:
+    """
+    Splits transcript text into video sections at each "Video N: Title" header.
+
+    Text that precedes the first header is returned as a section without
+    a video number.
+
+    Args:
+        text: Transcript text
+        base_offset: Byte offset of text within the source file
+        base_line: Line number of the first line of text within the source file
+
+    Returns:
+        List of VideoSection objects in file order
+    """
+    sections: List[VideoSection] = []
+    current = VideoSection(None, "", base_offset, base_line)
+    offset = base_offset
+    for line_number, line in enumerate(text.split("\n"), start=base_line):
+        header = _VIDEO_HEADER_RE.match(line)
+        if header:
+            if current.lines or current.video_number is not None:
+                sections.append(current)
+            current = VideoSection(int(header.group(1)), header.group(2), offset, line_number)
+        elif line.strip():
+            current.lines.append((line_number, line.strip()))
+        offset += len(line.encode("utf-8")) + 1
+    if current.lines or current.video_number is not None:
+        sections.append(current)
+    return sections
+
+
+def chunk_section(
+    section: VideoSection,
+    window: int = CHUNK_LINES,
+    stride: int = CHUNK_STRIDE,
+) -> List[Tuple[str, int, int]]:
+    """
+    Cuts a video section into overlapping fixed-size line windows.
+
+    Args:
+        section: Video section to chunk
+        window: Number of lines per chunk
+        stride: Number of lines each window advances
+
+    Returns:
+        List of (chunk_text, start_line, end_line) tuples
+    """
+    lines = section.lines
+    chunks = []
+    start = 0
+    while start < len(lines):
+        window_lines = lines[start:start + window]
+        chunks.append((
+            "\n".join(text for _, text in window_lines),
+            window_lines[0][0],
+            window_lines[-1][0],
+        ))
+        if start + window >= len(lines):
+            break
+        start += stride
+    return chunks
@@ -0,0 +1,773 @@
+"""
+Transcript Index - In-memory inverted index over the video transcripts.
+
+The index is built once per process and reused by every call to the
+transcript search tool, so a query only touches the postings of its own
+terms instead of re-reading and re-scanning the whole transcripts file.
+Results are ranked with BM25.
+
+Query terms that are not in the index are expanded to similarly spelled
+vocabulary terms through a character-trigram index (see
+tools/transcript_trigrams.py), and adjacent query words are also tried
+joined ("m tech" -> "mtech").
+
+Postings are positional: every term records where it occurs in each chunk,
+and every chunk records the character offsets of its tokens. That enables
+quoted-phrase and NEAR/k queries (see tools/transcript_query.py) and lets
+snippets be cut around the densest cluster of hits without rescanning text.
+
+The unit of retrieval is a chunk: a short, overlapping window of lines
+within one video (see tools/transcript_chunker.py), so results carry the
+video number, title and line range they came from.
+
+The index also watches its source file. A cheap stat() check (size and
+mtime) detects changes. The indexed bytes are hashed in fixed-size blocks;
+if the file grew and its last indexed block still matches, only the
+appended bytes are indexed, so a refresh costs one block plus the new
+data however large the file is. Otherwise (the file shrank or its end was
+rewritten) the index is rebuilt from scratch.
+"""
+
+import abc
+import hashlib
+import math
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from tools.transcript_chunker import chunk_section, split_video_sections
+from tools.transcript_query import ParsedQuery, parse_query, tokenize, tokenize_with_offsets
+from tools.transcript_trigrams import TrigramIndex
+
+
+# Default location of the transcripts file (relative to project root)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TRANSCRIPTS_PATH = os.path.join(PROJECT_ROOT, "transcripts", "Video transcripts.txt")
+
+# BM25 tuning parameters (standard Okapi defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Size of the blocks the indexed bytes are hashed in; refresh() re-reads
+# only the last one
+HASH_BLOCK_BYTES = 1 << 20
+
+# Length of the snippet cut from a matching chunk, in tokens
+SNIPPET_TOKENS = 40
+
+
+class TranscriptChunk:
+    """A window of transcript lines from a single video."""
+
+    __slots__ = (
+        "chunk_id", "text", "lower", "length", "source", "video_number", "video_title", "start_line", "end_line",
+        "token_starts", "token_ends",
+    )
+
+    def __init__(
+        self,
+        chunk_id: int,
+        text: str,
+        length: int,
+        source: str,
+        video_number: Optional[int],
+        video_title: str,
+        start_line: int,
+        end_line: int,
+        token_starts: Sequence[int] = (),
+        token_ends: Sequence[int] = (),
+    ):
+        self.chunk_id = chunk_id
+        self.text = text
+        self.lower = text.lower()  # Precomputed once, never at query time
+        self.length = length
+        self.source = source
+        self.video_number = video_number
+        self.video_title = video_title
+        self.start_line = start_line
+        self.end_line = end_line
+        self.token_starts = token_starts  # Character offset of each token
+        self.token_ends = token_ends
+
+    def metadata(self) -> Dict:
+        """
+        Describes where the chunk came from.
+
+        Returns:
+            Dictionary with video number, title and line range
+        """
+        return {
+            "video_number": self.video_number,
+            "video_title": self.video_title,
+            "start_line": self.start_line,
+            "end_line": self.end_line,
+        }
+
+
+class BaseTranscriptIndex(abc.ABC):
+    """
+    BM25 ranking shared by every transcript index implementation.
+
+    Subclasses decide how chunks and postings are stored (Python objects
+    for the in-memory index, memory-mapped arrays for the compiled index)
+    and implement the abstract accessors below; a subclass missing one
+    cannot be instantiated.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+        # Bumped whenever the indexed content changes, so structures derived
+        # from the index (e.g. the TF-IDF matrix) know when to rebuild
+        self.version = 0
+
+        self._trigram_index: Optional[TrigramIndex] = None
+        self._trigram_version = -1
+
+    @property
+    @abc.abstractmethod
+    def num_chunks(self) -> int:
+        """Number of chunks in the index."""
+
+    @property
+    @abc.abstractmethod
+    def average_length(self) -> float:
+        """Average chunk length in tokens."""
+
+    @abc.abstractmethod
+    def document_frequency(self, term: str) -> int:
+        """Number of chunks containing a term."""
+
+    @abc.abstractmethod
+    def term_postings(self, term: str) -> Iterable[Tuple[int, int]]:
+        """(chunk_id, term_frequency) pairs for a term, in chunk order."""
+
+    @abc.abstractmethod
+    def iter_terms(self) -> Iterable[str]:
+        """Every term in the index."""
+
+    @abc.abstractmethod
+    def chunk_positions(self, term: str, chunk_id: int) -> Sequence[int]:
+        """Token positions of a term within one chunk (empty if absent)."""
+
+    @abc.abstractmethod
+    def chunk_length(self, chunk_id: int) -> int:
+        """Length of a chunk in tokens."""
+
+    @abc.abstractmethod
+    def chunk_span(self, chunk_id: int) -> Tuple[str, int, int]:
+        """(source, start_line, end_line) covered by a chunk."""
+
+    @abc.abstractmethod
+    def get_chunk(self, chunk_id: int) -> TranscriptChunk:
+        """Materializes a chunk with its text and metadata."""
+
+    def idf(self, term: str) -> float:
+        """
+        Computes the BM25 inverse document frequency of a term.
+
+        Args:
+            term: Index term
+
+        Returns:
+            IDF weight (0.0 for unknown terms)
+        """
+        df = self.document_frequency(term)
+        if not df:
+            return 0.0
+        return math.log(1.0 + (self.num_chunks - df + 0.5) / (df + 0.5))
+
+    def trigram_index(self) -> TrigramIndex:
+        """
+        Returns the trigram index over this index's vocabulary.
+
+        Built on first use (only misspelled queries need it) and rebuilt
+        after the indexed content changes.
+
+        Returns:
+            TrigramIndex of every indexed term
+        """
+        with self._lock:
+            if self._trigram_index is None or self._trigram_version != self.version:
+                self._trigram_index = TrigramIndex(self.iter_terms())
+                self._trigram_version = self.version
+            return self._trigram_index
+
+    def expand_query(self, parsed: ParsedQuery) -> ParsedQuery:
+        """
+        Maps query terms onto the index vocabulary.
+
+        Terms the index does not contain are replaced by similarly spelled
+        indexed terms (weighted by their trigram similarity), and adjacent
+        terms whose concatenation is indexed are added joined. Phrase and
+        NEAR clauses use the best replacement of an unknown term.
+
+        Args:
+            parsed: Parsed query
+
+        Returns:
+            New ParsedQuery with expanded terms and weights
+        """
+        terms: List[str] = []
+        weights: Dict[str, float] = {}
+        replacements: Dict[str, str] = {}
+
+        def add(term: str, weight: float) -> None:
+            if term not in weights:
+                terms.append(term)
+            weights[term] = max(weights.get(term, 0.0), weight)
+
+        for term in parsed.terms:
+            if self.document_frequency(term):
+                add(term, parsed.weight(term))
+                continue
+            candidates = self.trigram_index().similar(term)
+            for candidate, similarity in candidates:
+                add(candidate, similarity * parsed.weight(term))
+            if candidates:
+                replacements[term] = candidates[0][0]
+        for left, right in zip(parsed.terms, parsed.terms[1:]):
+            joined = left + right
+            if self.document_frequency(joined):
+                add(joined, 1.0)
+
+        phrases = [[replacements.get(term, term) for term in phrase] for phrase in parsed.phrases]
+        near = [
+            (replacements.get(left, left), replacements.get(right, right), distance)
+            for left, right, distance in parsed.near
+        ]
+        return ParsedQuery(terms, phrases, near, weights)
+
+    def score_many(self, queries: List[str]) -> List[Dict[int, float]]:
+        """
+        Computes BM25 scores for several queries in one pass over the postings.
+
+        The postings of each distinct term are walked once, no matter how
+        many of the queries contain it. Chunks that fail a query's phrase or
+        NEAR/k clauses are dropped, unless no chunk satisfies them, in which
+        case the query falls back to plain keyword ranking. Queries are
+        expanded with expand_query() first.
+
+        Args:
+            queries: Free-text queries (may contain phrase and NEAR/k operators)
+
+        Returns:
+            One {chunk_id: score} dictionary per query (only matching chunks)
+        """
+        with self._lock:
+            avg_length = self.average_length or 1.0
+            parsed_queries = [self.expand_query(parse_query(query)) for query in queries]
+            queries_by_term: Dict[str, List[Tuple[int, float]]] = {}
+            for query_number, parsed in enumerate(parsed_queries):
+                for term in set(parsed.terms):
+                    queries_by_term.setdefault(term, []).append((query_number, parsed.weight(term)))
+
+            scores: List[Dict[int, float]] = [{} for _ in queries]
+            for term, query_weights in queries_by_term.items():
+                idf = self.idf(term)
+                if not idf:
+                    continue
+                for chunk_id, tf in self.term_postings(term):
+                    length = self.chunk_length(chunk_id)
+                    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * length / avg_length)
+                    weight = idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+                    for query_number, query_weight in query_weights:
+                        query_scores = scores[query_number]
+                        query_scores[chunk_id] = query_scores.get(chunk_id, 0.0) + weight * query_weight
+
+            for query_number, parsed in enumerate(parsed_queries):
+                if parsed.has_constraints:
+                    constrained = {
+                        chunk_id: score
+                        for chunk_id, score in scores[query_number].items()
+                        if self.matches_constraints(parsed, chunk_id)
+                    }
+                    if constrained:
+                        scores[query_number] = constrained
+            return scores
+
+    def matches_constraints(self, parsed: ParsedQuery, chunk_id: int) -> bool:
+        """
+        Checks a chunk against a query's phrase and NEAR/k clauses.
+
+        Args:
+            parsed: Parsed query
+            chunk_id: Chunk to check
+
+        Returns:
+            True if every phrase occurs and every NEAR clause is satisfied
+        """
+        for phrase in parsed.phrases:
+            following = [set(self.chunk_positions(term, chunk_id)) for term in phrase[1:]]
+            if not any(
+                all(position + offset in positions for offset, positions in enumerate(following, start=1))
+                for position in self.chunk_positions(phrase[0], chunk_id)
+            ):
+                return False
+        for left, right, distance in parsed.near:
+            left_positions = self.chunk_positions(left, chunk_id)
+            right_positions = self.chunk_positions(right, chunk_id)
+            if not left_positions or not right_positions:
+                return False
+            if _min_distance(left_positions, right_positions) > distance:
+                return False
+        return True
+
+    def snippet(self, chunk: TranscriptChunk, terms: Iterable[str], window: int = SNIPPET_TOKENS) -> str:
+        """
+        Cuts the part of a chunk with the densest cluster of query hits.
+
+        Hit positions come from the positional postings and the cut is made
+        at precomputed token offsets, so the chunk text is never rescanned.
+
+        Args:
+            chunk: Chunk to cut the snippet from
+            terms: Query terms whose occurrences count as hits
+            window: Snippet length in tokens
+
+        Returns:
+            Snippet text, with "..." where the chunk was cut
+        """
+        num_tokens = len(chunk.token_starts)
+        if num_tokens <= window:
+            return chunk.text
+
+        hits = sorted(
+            position for term in set(terms) for position in self.chunk_positions(term, chunk.chunk_id)
+        )
+        start = 0
+        if hits:
+            # Slide over the sorted hits to find the span of at most `window`
+            # tokens that contains the most of them
+            best_count, best_lo, best_hi = 0, 0, 0
+            lo = 0
+            for hi in range(len(hits)):
+                while hits[hi] - hits[lo] >= window:
+                    lo += 1
+                if hi - lo + 1 > best_count:
+                    best_count, best_lo, best_hi = hi - lo + 1, lo, hi
+            center = (hits[best_lo] + hits[best_hi]) // 2
+            start = min(max(0, center - window // 2), num_tokens - window)
+        end = start + window
+
+        # Offsets were taken on the lowercased text, which only differs in
+        # length from the original for a few exotic characters
+        text = chunk.text if len(chunk.text) == len(chunk.lower) else chunk.lower
+        snippet = text[chunk.token_starts[start]:chunk.token_ends[end - 1]]
+        if start > 0:
+            snippet = "..." + snippet
+        if end < num_tokens:
+            snippet = snippet + "..."
+        return snippet
+
+    def select(self, scores: Dict[int, float], top_k: int) -> List[Tuple[TranscriptChunk, float]]:
+        """
+        Picks the best-scoring chunks, skipping overlapping windows.
+
+        Neighbouring windows overlap, so a chunk that shares lines with a
+        better-scoring chunk of the same video is skipped; each region of a
+        video is returned at most once, through its best window.
+
+        Args:
+            scores: {chunk_id: score} for candidate chunks
+            top_k: Maximum number of results to return
+
+        Returns:
+            List of (chunk, score) pairs, best first
+        """
+        with self._lock:
+            kept: List[Tuple[int, float]] = []
+            spans: List[Tuple[str, int, int]] = []
+            for chunk_id, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+                span = self.chunk_span(chunk_id)
+                if any(spans_overlap(span, other) for other in spans):
+                    continue
+                kept.append((chunk_id, score))
+                spans.append(span)
+                if len(kept) >= top_k:
+                    break
+            return [(self.get_chunk(chunk_id), score) for chunk_id, score in kept]
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[TranscriptChunk, float]]:
+        """
+        Ranks chunks against a query with BM25.
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of results to return
+
+        Returns:
+            List of (chunk, score) pairs, best first
+        """
+        with self._lock:
+            return self.select(self.score_many([query])[0], top_k)
+
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[TranscriptChunk, float]]]:
+        """
+        Ranks chunks against several queries with BM25 in one pass.
+
+        Args:
+            queries: Free-text queries
+            top_k: Maximum number of results per query
+
+        Returns:
+            One list of (chunk, score) pairs per query, best first
+        """
+        with self._lock:
+            return [self.select(scores, top_k) for scores in self.score_many(queries)]
+
+
+def spans_overlap(a: Tuple[str, int, int], b: Tuple[str, int, int]) -> bool:
+    """Checks whether two (source, start_line, end_line) spans share lines."""
+    return a[0] == b[0] and a[1] <= b[2] and b[1] <= a[2]
+
+
+def source_key(path: str) -> str:
+    """
+    Names a transcripts file as the source of its chunks.
+
+    The name is the path relative to the project root, so files with the
+    same name in different directories stay distinct while the name does
+    not depend on where the checkout lives.
+
+    Args:
+        path: Path to the transcripts file
+
+    Returns:
+        Relative path with forward slashes
+    """
+    return os.path.relpath(os.path.abspath(path), PROJECT_ROOT).replace(os.sep, "/")
+
+
+def _block_hashes(data: bytes) -> List[bytes]:
+    """SHA-1 digests of data in HASH_BLOCK_BYTES blocks."""
+    return [hashlib.sha1(data[start:start + HASH_BLOCK_BYTES]).digest() for start in range(0, len(data), HASH_BLOCK_BYTES)]
+
+
+def _min_distance(a: Sequence[int], b: Sequence[int]) -> int:
+    """Smallest gap between any position in a and any in b (both sorted)."""
+    i = j = 0
+    best = abs(a[0] - b[0])
+    while i < len(a) and j < len(b):
+        best = min(best, abs(a[i] - b[j]))
+        if a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return best
+
+
+class TranscriptIndex(BaseTranscriptIndex):
+    """
+    In-memory inverted index over transcript chunks.
+
+    Postings map each term to a list of (chunk_id, term_frequency) pairs,
+    and positions map each term to {chunk_id: token positions}.
+    Chunk statistics needed by BM25 (lengths, average length,
+    document frequencies) are kept alongside so scoring a query only
+    walks the postings of the query terms.
+    """
+
+    def __init__(self, source_name: str = ""):
+        super().__init__()
+        self.chunks: List[TranscriptChunk] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.positions: Dict[str, Dict[int, List[int]]] = {}
+        self.total_length = 0
+        self.source_name = source_name
+
+        # Source file fingerprint, used by refresh() to detect changes
+        self.source_path: Optional[str] = None
+        self.source_size = 0
+        self.source_mtime_ns = 0
+        self.block_hashes: List[bytes] = []  # SHA-1 of each HASH_BLOCK_BYTES block; the last may be partial
+
+        # Where the last video section starts (byte offset, line number and
+        # first chunk). Appended text may continue that video, so its chunks
+        # are re-indexed on every append.
+        self.tail_section_offset = 0
+        self.tail_section_line = 1
+        self.tail_section_chunk = 0
+
+    @classmethod
+    def from_text(cls, text: str, source_name: str = "") -> "TranscriptIndex":
+        """
+        Builds an index from the full transcripts text.
+
+        Args:
+            text: Contents of the transcripts file
+            source_name: Name recorded as the source of every chunk
+
+        Returns:
+            Populated TranscriptIndex
+        """
+        index = cls(source_name)
+        index._index_text(text, 0, 1)
+        return index
+
+    @classmethod
+    def from_file(cls, path: str) -> "TranscriptIndex":
+        """
+        Builds an index from a transcripts file on disk.
+
+        Args:
+            path: Path to the transcripts file
+
+        Returns:
+            Populated TranscriptIndex, bound to the file for refresh()
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+            stat = os.fstat(f.fileno())
+        index = cls.from_text(data.decode("utf-8"), source_key(path))
+        index.source_path = path
+        index._set_fingerprint(data, stat)
+        return index
+
+    @classmethod
+    def from_files(cls, paths: List[str]) -> "TranscriptIndex":
+        """
+        Builds one index over several transcripts files.
+
+        Each chunk records the file it came from as its source. The index is
+        not bound to the files, so refresh() leaves it unchanged; see
+        get_combined_transcript_index() for change detection.
+
+        Args:
+            paths: Paths to the transcripts files
+
+        Returns:
+            Populated TranscriptIndex
+        """
+        index = cls()
+        for path in paths:
+            with open(path, "rb") as f:
+                text = f.read().decode("utf-8")
+            index.source_name = source_key(path)
+            index._index_text(text, 0, 1)
+        index.source_name = ""
+        return index
+
+    def _index_text(self, text: str, base_offset: int, base_line: int) -> None:
+        """
+        Splits text into per-video chunks and indexes each one.
+
+        Args:
+            text: Text to index
+            base_offset: Byte offset of text within the source file
+            base_line: Line number of the first line of text
+        """
+        for section in split_video_sections(text, base_offset, base_line):
+            self.tail_section_offset = section.byte_offset
+            self.tail_section_line = section.line_number
+            self.tail_section_chunk = len(self.chunks)
+            for chunk_text, start_line, end_line in chunk_section(section):
+                self.add_chunk(chunk_text, section.video_number, section.video_title, start_line, end_line)
+
+    def _set_fingerprint(self, data: bytes, stat: os.stat_result) -> None:
+        """Records size, mtime and hash of the indexed source bytes."""
+        self.source_size = len(data)
+        self.source_mtime_ns = stat.st_mtime_ns
+        self.block_hashes = _block_hashes(data)
+
+    def _truncate_chunks(self, chunk_id: int) -> None:
+        """
+        Removes every chunk from chunk_id onward.
+
+        Chunks are appended in order, so the postings of the most recent
+        chunks are always at the end of each term's postings list.
+
+        Args:
+            chunk_id: First chunk to remove
+        """
+        while len(self.chunks) > chunk_id:
+            chunk = self.chunks.pop()
+            self.total_length -= chunk.length
+            for term in set(tokenize(chunk.text)):
+                postings = self.postings[term]
+                postings.pop()
+                del self.positions[term][chunk.chunk_id]
+                if not postings:
+                    del self.postings[term]
+                    del self.positions[term]
+            self.version += 1
+
+    def refresh(self) -> str:
+        """
+        Brings the index up to date with its source file.
+
+        Returns:
+            "unchanged", "appended" or "rebuilt" ("rebuilt" means the caller
+            must replace this index with a freshly built one)
+        """
+        if self.source_path is None:
+            return "unchanged"
+        stat = os.stat(self.source_path)
+        if stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime_ns:
+            return "unchanged"
+        if stat.st_size < self.source_size:
+            return "rebuilt"
+
+        with open(self.source_path, "rb") as f:
+            # Verify that the end of what we already indexed is unchanged (an
+            # editor may rewrite the last lines in the same save that appends
+            # new ones). Only the last hash block is re-read.
+            last_block_offset = max(0, len(self.block_hashes) - 1) * HASH_BLOCK_BYTES
+            f.seek(last_block_offset)
+            last_block = f.read(self.source_size - last_block_offset)
+            if _block_hashes(last_block) != self.block_hashes[-1:]:
+                return "rebuilt"
+
+            # Read from the start of the last video through the new end
+            f.seek(self.tail_section_offset)
+            delta = f.read()
+            stat = os.fstat(f.fileno())
+
+        try:
+            delta_text = delta.decode("utf-8")
+        except UnicodeDecodeError:
+            # Appended bytes end mid-character; retry on the next refresh
+            return "unchanged"
+
+        appended = delta[self.source_size - self.tail_section_offset:]
+        with self._lock:
+            self._truncate_chunks(self.tail_section_chunk)
+            self._index_text(delta_text, self.tail_section_offset, self.tail_section_line)
+            self.source_size += len(appended)
+            self.source_mtime_ns = stat.st_mtime_ns
+            self.block_hashes[-1:] = _block_hashes(last_block + appended)
+        return "appended"
+
+    def add_chunk(
+        self,
+        text: str,
+        video_number: Optional[int] = None,
+        video_title: str = "",
+        start_line: int = 0,
+        end_line: int = 0,
+    ) -> TranscriptChunk:
+        """
+        Tokenizes a chunk of transcript text and adds it to the index.
+
+        Args:
+            text: Chunk text
+            video_number: Number of the video the chunk belongs to
+            video_title: Title of that video
+            start_line: First line of the chunk in the transcripts file
+            end_line: Last line of the chunk in the transcripts file
+
+        Returns:
+            The stored TranscriptChunk
+        """
+        tokens, starts, ends = tokenize_with_offsets(text)
+        chunk = TranscriptChunk(
+            len(self.chunks), text, len(tokens), self.source_name, video_number, video_title, start_line, end_line,
+            starts, ends,
+        )
+        self.chunks.append(chunk)
+        self.total_length += chunk.length
+
+        chunk_positions: Dict[str, List[int]] = {}
+        for position, term in enumerate(tokens):
+            chunk_positions.setdefault(term, []).append(position)
+        for term, positions in chunk_positions.items():
+            self.postings.setdefault(term, []).append((chunk.chunk_id, len(positions)))
+            self.positions.setdefault(term, {})[chunk.chunk_id] = positions
+        self.version += 1
+        return chunk
+
+    @property
+    def num_chunks(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def average_length(self) -> float:
+        if not self.chunks:
+            return 0.0
+        return self.total_length / len(self.chunks)
+
+    def document_frequency(self, term: str) -> int:
+        return len(self.postings.get(term, ()))
+
+    def term_postings(self, term: str) -> Iterable[Tuple[int, int]]:
+        return self.postings.get(term, ())
+
+    def iter_terms(self) -> Iterable[str]:
+        return list(self.postings)
+
+    def chunk_positions(self, term: str, chunk_id: int) -> Sequence[int]:
+        return self.positions.get(term, {}).get(chunk_id, ())
+
+    def chunk_length(self, chunk_id: int) -> int:
+        return self.chunks[chunk_id].length
+
+    def chunk_span(self, chunk_id: int) -> Tuple[str, int, int]:
+        chunk = self.chunks[chunk_id]
+        return chunk.source, chunk.start_line, chunk.end_line
+
+    def get_chunk(self, chunk_id: int) -> TranscriptChunk:
+        return self.chunks[chunk_id]
+
+
+# Process-wide cache of built indexes, keyed by transcripts path
+_index_cache: Dict[str, TranscriptIndex] = {}
+_index_lock = threading.Lock()
+
+
+def get_transcript_index(path: Optional[str] = None) -> TranscriptIndex:
+    """
+    Returns the shared index for a transcripts file, building it on first use.
+
+    Every call checks whether the file changed since it was indexed. Appended
+    content is indexed incrementally; any other change triggers a rebuild.
+
+    Args:
+        path: Path to the transcripts file (defaults to the project's transcripts)
+
+    Returns:
+        The process-wide TranscriptIndex for that file
+
+    Raises:
+        FileNotFoundError: If the transcripts file does not exist
+    """
+    path = os.path.abspath(path or DEFAULT_TRANSCRIPTS_PATH)
+    with _index_lock:
+        index = _index_cache.get(path)
+        if index is None or index.refresh() == "rebuilt":
+            index = TranscriptIndex.from_file(path)
+            _index_cache[path] = index
+        return index
+
+
+# Process-wide cache of indexes over several files, keyed by their paths,
+# with the (size, mtime) of each file when it was indexed
+_combined_cache: Dict[Tuple[str, ...], Tuple[Tuple[Tuple[int, int], ...], TranscriptIndex]] = {}
+
+
+def get_combined_transcript_index(paths: List[str]) -> TranscriptIndex:
+    """
+    Returns the shared index over a set of transcripts files.
+
+    A single file uses get_transcript_index() (appends are indexed
+    incrementally). Several files are indexed together and rebuilt when
+    any of them changes.
+
+    Args:
+        paths: Paths to the transcripts files
+
+    Returns:
+        The process-wide TranscriptIndex for those files
+
+    Raises:
+        FileNotFoundError: If one of the files does not exist
+    """
+    paths = sorted(os.path.abspath(path) for path in paths)
+    if len(paths) == 1:
+        return get_transcript_index(paths[0])
+    key = tuple(paths)
+    fingerprint = tuple((stat.st_size, stat.st_mtime_ns) for stat in map(os.stat, paths))
+    with _index_lock:
+        cached = _combined_cache.get(key)
+        if cached is None or cached[0] != fingerprint:
+            cached = _combined_cache[key] = (fingerprint, TranscriptIndex.from_files(paths))
+        return cached[1]
@@ -0,0 +1,176 @@
+"""
+Transcript Query - Tokenization and query parsing for transcript search.
+
+Queries are free text with two optional operators:
+
+    "M.Tech placements"     quoted phrase: the words must appear consecutively
+    GATE NEAR/3 score       proximity: the two words at most 3 tokens apart
+
+Every word in the query (inside or outside operators) contributes to the
+relevance score; phrases and proximity clauses additionally restrict which
+chunks match.
+
+Tokens are normalized the same way in transcripts and in queries, so that
+commenters' spellings meet the transcript's: dotted and hyphenated
+abbreviations are folded ("M.Tech", "m-tech" -> "mtech"; "I.I.T" -> "iit"),
+and common Hinglish/English spelling variants map to one canonical form
+("nhi" -> "nahi", "thanku" -> "thanks"). Queries are additionally expanded
+with English equivalents of common Hinglish words ("naukri" -> "job").
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+
+# Abbreviations whose letters are separated by dots or hyphens are a single
+# token ("m.tech", "i.i.t", "ph.d"); everything else splits on non-alphanumerics
+_TOKEN_RE = re.compile(r"(?<![a-z0-9])(?:[a-z]|ph)(?:[.\-][a-z])+[a-z]*|[a-z0-9]+")
+_ABBREVIATION_PUNCTUATION = str.maketrans("", "", ".-")
+
+# Spelling variants folded to a canonical token, in transcripts and queries
+SPELLING_VARIANTS: Dict[str, str] = {
+    # Degrees and institutes
+    "mtec": "mtech", "mteck": "mtech",
+    "btec": "btech", "bteck": "btech",
+    "iits": "iit", "nits": "nit", "iiits": "iiit",
+    "phds": "phd",
+    # Hinglish spellings
+    "nhi": "nahi", "nai": "nahi", "nahin": "nahi",
+    "kia": "kya", "kyaa": "kya",
+    "kese": "kaise", "kaese": "kaise", "kaisey": "kaise",
+    "kyun": "kyu", "kyon": "kyu",
+    "accha": "acha", "achha": "acha",
+    "bhaiya": "bhai", "bhaiy": "bhai", "bhaiyya": "bhai",
+    "sirji": "sir",
+    # Chat shorthand
+    "thanku": "thanks", "thankyou": "thanks", "thnx": "thanks", "thx": "thanks",
+    "pls": "please", "plz": "please", "plzz": "please",
+    "u": "you", "ur": "your", "r": "are",
+}
+
+# English words added to a query when it contains a Hinglish word; the
+# transcripts themselves are in English
+HINGLISH_EXPANSIONS: Dict[str, List[str]] = {
+    "naukri": ["job"],
+    "padhai": ["study"],
+    "paisa": ["salary", "money"],
+    "tankhwah": ["salary"],
+    "kaam": ["work"],
+    "sarkari": ["government"],
+    "kaise": ["how"],
+    "kyu": ["why"],
+    "kab": ["when"],
+    "kitna": ["much"],
+    "acha": ["good"],
+    "sahi": ["right"],
+    "mushkil": ["difficult"],
+    "aasan": ["easy"],
+}
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+_NEAR_RE = re.compile(r"(\S+)\s+NEAR/(\d+)\s+(\S+)")
+
+
+def normalize_token(token: str) -> str:
+    """
+    Folds abbreviation punctuation and spelling variants out of a raw token.
+
+    Args:
+        token: Lowercase token as matched in the text
+
+    Returns:
+        Canonical token
+    """
+    token = token.translate(_ABBREVIATION_PUNCTUATION)
+    return SPELLING_VARIANTS.get(token, token)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into normalized lowercase alphanumeric tokens.
+
+    Args:
+        text: Raw text to tokenize
+
+    Returns:
+        List of tokens in the order they appear
+    """
+    return [normalize_token(token) for token in _TOKEN_RE.findall(text.lower())]
+
+
+def tokenize_with_offsets(text: str) -> Tuple[List[str], List[int], List[int]]:
+    """
+    Tokenizes text and records where each token sits in it.
+
+    Args:
+        text: Raw text to tokenize
+
+    Returns:
+        (tokens, start_offsets, end_offsets), with character offsets into text
+    """
+    tokens: List[str] = []
+    starts: List[int] = []
+    ends: List[int] = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        tokens.append(normalize_token(match.group()))
+        starts.append(match.start())
+        ends.append(match.end())
+    return tokens, starts, ends
+
+
+class ParsedQuery:
+    """A query split into scoring terms and positional constraints."""
+
+    __slots__ = ("terms", "phrases", "near", "weights")
+
+    def __init__(
+        self,
+        terms: List[str],
+        phrases: List[List[str]],
+        near: List[Tuple[str, str, int]],
+        weights: Dict[str, float] = None,
+    ):
+        self.terms = terms  # Every query token, used for ranking
+        self.phrases = phrases  # Token sequences that must appear consecutively
+        self.near = near  # (term_a, term_b, max_distance) proximity clauses
+        self.weights = weights or {}  # Score multipliers for expanded terms (default 1.0)
+
+    def weight(self, term: str) -> float:
+        """Score multiplier of a term (1.0 unless it came from an expansion)."""
+        return self.weights.get(term, 1.0)
+
+    @property
+    def has_constraints(self) -> bool:
+        """Whether the query contains phrase or proximity clauses."""
+        return bool(self.phrases or self.near)
+
+
+def parse_query(query: str) -> ParsedQuery:
+    """
+    Parses quoted phrases and NEAR/k clauses out of a query.
+
+    Args:
+        query: Raw query text
+
+    Returns:
+        ParsedQuery with all terms and the positional constraints
+    """
+    terms: List[str] = []
+    phrases = []
+    for phrase in _PHRASE_RE.findall(query):
+        tokens = tokenize(phrase)
+        terms.extend(tokens)
+        if len(tokens) > 1:
+            phrases.append(tokens)
+    rest = _PHRASE_RE.sub(" ", query)
+
+    near = []
+    for left, distance, right in _NEAR_RE.findall(rest):
+        left_tokens, right_tokens = tokenize(left), tokenize(right)
+        if left_tokens and right_tokens:
+            near.append((left_tokens[-1], right_tokens[0], int(distance)))
+    rest = re.sub(r"\bNEAR/\d+\b", " ", rest)
+
+    terms.extend(tokenize(rest))
+    for term in list(terms):
+        terms.extend(HINGLISH_EXPANSIONS.get(term, ()))
+    return ParsedQuery(terms, phrases, near)
@@ -2,30 +2,232 @@
 Custom tool for searching video transcripts.
 
 This tool allows agents to search through video transcripts for relevant information
-about topics mentioned in user comments.
+about topics mentioned in user comments. Searches run against a shared in-memory
+index instead of re-reading the transcripts file on every call.
 """
 
+import logging
+import math
 import os
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 from google.adk.tools import FunctionTool, ToolContext
+from tools.compiled_transcript_index import compiled_source_paths, load_compiled_index
+from tools.transcript_index import (
+    DEFAULT_TRANSCRIPTS_PATH,
+    BaseTranscriptIndex,
+    TranscriptChunk,
+    get_combined_transcript_index,
+)
+from tools.token_budget import STOPWORDS
+from tools.transcript_query import parse_query
+from tools.transcript_vectors import get_tfidf_matrix
+
+# Maximum number of excerpts returned to the agent
+MAX_MATCHES = 5
+
+# Maximum number of merged excerpts returned by a batch search
+MAX_BATCH_MATCHES = 8
+
+# Top-ranked chunks inspected when scoring retrieval confidence (the
+# excerpts the TranscriptAgent gets back from one search)
+CONFIDENCE_CANDIDATES = MAX_MATCHES
+
+# Stop words, forms of address, thanks and request phrasing: words that say
+# nothing about what a question asks and would count as covered anywhere
+_FILLER_TERMS = STOPWORDS | frozenset({
+    "mam", "maam", "hello", "hi", "hey", "pls", "plz", "where", "whom", "whose", "could", "would",
+    "will", "did", "has", "have", "had", "were", "been", "there", "these", "those", "with", "from",
+    "at", "by", "as", "if", "so", "but", "not", "no", "all", "any", "some", "about", "more", "also",
+    "very", "much", "just", "get", "got", "us", "our", "he", "she", "they", "them", "his", "her",
+    "thank", "thanks", "thanku", "thankyou", "explain", "tell", "share", "know", "want", "video",
+    "u", "ur", "kya", "kaise", "hai", "h", "ho", "se", "me", "mein", "main", "ko", "bhi", "aur",
+    "kitna", "kitni", "kitne", "than", "vs", "versus", "better", "possible",
+})
+
+# Ranking used for transcript searches: "bm25" (keyword relevance) or
+# "tfidf" (cosine similarity of TF-IDF vectors, see tools/transcript_vectors.py)
+SEARCH_MODE = os.environ.get("TRANSCRIPT_SEARCH_MODE", "bm25").lower()
+
+logger = logging.getLogger(__name__)
+
+# File set of the current fallback, logged once each time search falls back
+_fallback_logged: Optional[Tuple[str, ...]] = None
+
+
+def get_search_index() -> BaseTranscriptIndex:
+    """
+    Returns the index that transcript searches should run against.
+    
+    Prefers the memory-mapped compiled index (built with `python main.py
+    build-index`) when it is up to date with the transcripts, and falls back
+    to an in-memory index of the same transcript files otherwise (every
+    transcripts/*.txt file, not only the default one).
+    
+    Returns:
+        A transcript index ready for searching
+    
+    Raises:
+        FileNotFoundError: If neither a compiled index nor any transcripts file exists
+    """
+    global _fallback_logged
+    compiled = load_compiled_index()
+    if compiled is not None:
+        _fallback_logged = None
+        return compiled
+    paths = compiled_source_paths()
+    if not paths:
+        if not os.path.exists(DEFAULT_TRANSCRIPTS_PATH):
+            raise FileNotFoundError(f"Transcripts file not found at {DEFAULT_TRANSCRIPTS_PATH}")
+        paths = [DEFAULT_TRANSCRIPTS_PATH]
+    if tuple(paths) != _fallback_logged:
+        _fallback_logged = tuple(paths)
+        logger.warning(
+            "Compiled transcript index missing or stale; searching %d transcript file(s) from memory "
+            "(run `python main.py build-index` to rebuild it)", len(paths),
+        )
+    return get_combined_transcript_index(paths)
+
+
+def rank_queries(index: BaseTranscriptIndex, queries: List[str], top_k: int) -> List[List[Tuple[TranscriptChunk, float]]]:
+    """
+    Ranks chunks for each query with the configured SEARCH_MODE.
+    
+    Args:
+        index: Transcript index to search
+        queries: Free-text queries
+        top_k: Maximum number of results per query
+    
+    Returns:
+        One list of (chunk, score) pairs per query, best first
+    """
+    if SEARCH_MODE == "tfidf":
+        return get_tfidf_matrix(index).search_many(queries, top_k=top_k)
+    return index.search_many(queries, top_k=top_k)
+
+
+def format_match(index: BaseTranscriptIndex, chunk: TranscriptChunk, score: float, queries: List[str]) -> Dict:
+    """
+    Converts a ranked chunk into the match dictionary returned to agents.
+    
+    The excerpt is a snippet centered on the densest cluster of query hits
+    in the chunk, rather than the whole chunk.
+    
+    Args:
+        index: Index the chunk came from
+        chunk: Matching transcript chunk
+        score: Relevance score
+        queries: Queries whose terms count as hits for the snippet
+    
+    Returns:
+        Dictionary with the excerpt, its video metadata and score
+    """
+    terms = [term for query in queries for term in index.expand_query(parse_query(query)).terms]
+    match = {"excerpt": index.snippet(chunk, terms)}
+    match.update(chunk.metadata())
+    match["score"] = round(score, 3)
+    return match
+
+
+def transcript_confidence(question: str) -> Dict:
+    """
+    Scores how well the transcripts cover a question, without any model call.
+    
+    The question's terms are weighted by IDF (and by their query weight), so
+    filler words barely count. Misspelled terms use their closest indexed
+    spelling; terms the transcripts never mention at all get the highest
+    IDF and can never be covered. The confidence is the weighted share of
+    terms found in any of the top CONFIDENCE_CANDIDATES chunks, which are
+    the excerpts a transcript search would return.
+    
+    Args:
+        question: Comment / question text
+    
+    Returns:
+        Dictionary with confidence (0.0 - 1.0), the video metadata and
+        score of the chunk covering the most terms, and the uncovered terms
+    """
+    try:
+        index = get_search_index()
+    except FileNotFoundError:
+        return {"confidence": 0.0, "missing_terms": []}
+    parsed = parse_query(question)
+    results = rank_queries(index, [question], CONFIDENCE_CANDIDATES)[0]
+    if not parsed.terms or not results:
+        return {"confidence": 0.0, "missing_terms": [term for term in parsed.terms if term not in _FILLER_TERMS]}
+    
+    unknown_idf = math.log(1.0 + (index.num_chunks + 0.5) / 0.5)
+    weighted_terms = []  # (term, indexed spelling or None, weight)
+    for term in dict.fromkeys(parsed.terms):
+        if term in _FILLER_TERMS:
+            continue
+        if index.document_frequency(term):
+            weighted_terms.append((term, term, index.idf(term) * parsed.weight(term)))
+            continue
+        candidates = index.trigram_index().similar(term)
+        if candidates:
+            candidate, similarity = candidates[0]
+            weighted_terms.append((term, candidate, index.idf(candidate) * similarity * parsed.weight(term)))
+        elif len(term) > 2:  # Unindexed one- and two-letter words are noise
+            weighted_terms.append((term, None, unknown_idf * parsed.weight(term)))
+    if not weighted_terms:
+        return {"confidence": 0.0, "missing_terms": []}
+    total = sum(weight for _, _, weight in weighted_terms) or 1.0
+    
+    def found(indexed: str, chunk: TranscriptChunk) -> bool:
+        return indexed is not None and bool(index.chunk_positions(indexed, chunk.chunk_id))
+
+    best = max(
+        results,
+        key=lambda result: sum(weight for _, indexed, weight in weighted_terms if found(indexed, result[0])),
+    )
+    chunk, score = best
+    covered = 0.0
+    missing = []
+    for term, indexed, weight in weighted_terms:
+        if any(found(indexed, result_chunk) for result_chunk, _ in results):
+            covered += weight
+        else:
+            missing.append(term)
+    confidence = {"confidence": round(covered / total, 3), "score": round(score, 3), "missing_terms": missing}
+    confidence.update(chunk.metadata())
+    return confidence
 
 
 def search_transcripts(query: str, tool_context: ToolContext = None) -> Dict:
     """
     Searches through video transcripts for information related to the query.
     
-    This function reads the transcripts file and searches for relevant sections
-    that contain keywords from the query. It returns matching excerpts with context.
+    Queries are keywords, optionally with "quoted phrases" that must appear
+    word for word, or word NEAR/k word for words at most k words apart
+    (e.g. "GATE score" or GATE NEAR/3 cutoff). Spelling variants and typos
+    ("mtech", "m tech", "plcement") are matched automatically.
+    
+    The transcripts are indexed once per process (see tools/transcript_index.py),
+    or loaded from the compiled index file, as short windows of lines within
+    each video. Windows are ranked with BM25 (or TF-IDF cosine similarity,
+    see SEARCH_MODE), so the most relevant excerpts come first, each tagged
+    with the video it came from.
     
     Args:
-        query: The search query (keywords or topic to search for)
+        query: The search query (keywords or topic to search for; supports
+            "quoted phrases" and NEAR/k)
         tool_context: ADK tool context (automatically provided by ADK)
     
     Returns:
         Dictionary with status and search results:
         Success: {
             "status": "success",
-            "matches": [list of matching text excerpts],
+            "matches": [
+                {
+                    "excerpt": snippet of the matching transcript text,
+                    "video_number": number of the video,
+                    "video_title": title of the video,
+                    "start_line": first line of the excerpt,
+                    "end_line": last line of the excerpt,
+                    "score": relevance score
+                },
+                ...
+            ],
             "count": number of matches
         }
         Error: {
@@ -34,57 +236,117 @@ def search_transcripts(query: str, tool_context: ToolContext = None) -> Dict:
         }
     """
     try:
-        # Get the path to the transcripts file
-        # Assuming the file is in transcripts/Video transcripts.txt relative to project root
-        current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        transcripts_path = os.path.join(current_dir, "transcripts", "Video transcripts.txt")
-        
-        # Check if file exists
-        if not os.path.exists(transcripts_path):
+        # Index is loaded or built on first use and shared by every later call
+        try:
+            index = get_search_index()
+        except FileNotFoundError as e:
             return {
                 "status": "error",
-                "error_message": f"Transcripts file not found at {transcripts_path}"
+                "error_message": str(e)
             }
         
-        # Read the transcripts file
-        with open(transcripts_path, "r", encoding="utf-8") as f:
-            transcript_content = f.read()
+        results = rank_queries(index, [query], MAX_MATCHES)[0]
+        matches = [format_match(index, chunk, score, [query]) for chunk, score in results]
         
-        # Convert query to lowercase for case-insensitive search
-        query_lower = query.lower()
-        query_words = query_lower.split()
+        if matches:
+            return {
+                "status": "success",
+                "matches": matches,
+                "count": len(matches),
+                "message": f"Found {len(matches)} relevant section(s) in transcripts"
+            }
+        else:
+            return {
+                "status": "success",
+                "matches": [],
+                "count": 0,
+                "message": "No relevant information found in transcripts for this query"
+            }
+            
+    except Exception as e:
+        return {
+            "status": "error",
+            "error_message": f"Error searching transcripts: {str(e)}"
+        }
+
+
+def search_transcripts_batch(queries: List[str], tool_context: ToolContext = None) -> Dict:
+    """
+    Searches video transcripts for several phrasings of a question at once.
+    
+    Use this to collect all transcript evidence in a single call: pass every
+    keyword set or rewording you would otherwise search one by one. All
+    queries are scored in one pass over the index, and the hits are merged,
+    deduplicated (including overlapping excerpts) and returned as one ranked
+    list. Excerpts matched by several queries rank higher.
+    
+    Args:
+        queries: List of search queries (keywords, topics or rephrasings;
+            each supports "quoted phrases" and NEAR/k)
+        tool_context: ADK tool context (automatically provided by ADK)
+    
+    Returns:
+        Dictionary with status and merged search results:
+        Success: {
+            "status": "success",
+            "matches": [same fields as search_transcripts, plus
+                        "matched_queries": the queries that found this excerpt],
+            "count": number of matches
+        }
+        Error: {
+            "status": "error",
+            "error_message": "description of error"
+        }
+    """
+    try:
+        queries = [query for query in queries if query and query.strip()]
+        if not queries:
+            return {
+                "status": "error",
+                "error_message": "No search queries provided"
+            }
+        
+        try:
+            index = get_search_index()
+        except FileNotFoundError as e:
+            return {
+                "status": "error",
+                "error_message": str(e)
+            }
         
-        # Split transcript into sentences/paragraphs for better matching
-        # We'll search for paragraphs that contain any of the query words
-        paragraphs = transcript_content.split("\n\n")
+        # Normalize each query's scores by its best hit so one long query
+        # cannot drown out the others, then sum across queries
+        merged: Dict[int, float] = {}
+        matched_queries: Dict[int, List[str]] = {}
+        for query, results in zip(queries, rank_queries(index, queries, MAX_BATCH_MATCHES)):
+            if not results:
+                continue
+            best = results[0][1]
+            for chunk, score in results:
+                merged[chunk.chunk_id] = merged.get(chunk.chunk_id, 0.0) + score / best
+                matched_queries.setdefault(chunk.chunk_id, []).append(query)
         
         matches = []
-        for para in paragraphs:
-            para_lower = para.lower()
-            # Check if paragraph contains any query words
-            if any(word in para_lower for word in query_words if len(word) > 2):  # Ignore very short words
-                # Take first 500 characters of the paragraph to avoid too long responses
-                excerpt = para[:500] + "..." if len(para) > 500 else para
-                matches.append(excerpt.strip())
-        
-        # Limit to top 5 matches to avoid overwhelming the agent
-        matches = matches[:5]
+        for chunk, score in index.select(merged, MAX_BATCH_MATCHES):
+            match = format_match(index, chunk, score, matched_queries[chunk.chunk_id])
+            match["matched_queries"] = matched_queries[chunk.chunk_id]
+            matches.append(match)
         
         if matches:
             return {
                 "status": "success",
                 "matches": matches,
                 "count": len(matches),
-                "message": f"Found {len(matches)} relevant section(s) in transcripts"
+                "message": f"Found {len(matches)} relevant section(s) in transcripts for {len(queries)} queries"
             }
         else:
             return {
                 "status": "success",
                 "matches": [],
                 "count": 0,
-                "message": "No relevant information found in transcripts for this query"
+                "message": "No relevant information found in transcripts for these queries"
             }
-            
+    
     except Exception as e:
         return {
             "status": "error",
@@ -92,6 +354,7 @@ def search_transcripts(query: str, tool_context: ToolContext = None) -> Dict:
         }
 
 
-# Create the FunctionTool wrapper for ADK
+# Create the FunctionTool wrappers for ADK
 transcript_search_tool = FunctionTool(func=search_transcripts)
+transcript_batch_search_tool = FunctionTool(func=search_transcripts_batch)
 
@@ -0,0 +1,91 @@
+"""
+Transcript Trigrams - Character-trigram index over the transcript vocabulary.
+
+Commenters misspell freely ("plcement", "scholarshp", "bombey"). When a
+query term is not in the index, the trigram index proposes vocabulary terms
+that share most of its character trigrams. Candidates are gathered from the
+postings of the query term's own trigrams (and filtered by length), so a
+lookup only touches terms that share a trigram with the query instead of
+scanning the whole vocabulary.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+
+# Minimum Dice similarity (on trigram sets) for a fuzzy match
+MIN_SIMILARITY = 0.5
+
+# Maximum number of vocabulary terms a misspelled term expands into
+MAX_EXPANSIONS = 3
+
+# Candidates whose length differs by more than this are not considered
+MAX_LENGTH_DIFFERENCE = 3
+
+# Terms shorter than this are not fuzzy-matched (too many false positives)
+MIN_FUZZY_LENGTH = 4
+
+
+def trigrams(term: str) -> List[str]:
+    """
+    Splits a term into character trigrams, padded at both ends.
+
+    Args:
+        term: Normalized token
+
+    Returns:
+        Distinct trigrams of the term
+    """
+    padded = f"^{term}$"
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+class TrigramIndex:
+    """Maps character trigrams to the vocabulary terms that contain them."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms: List[str] = []
+        self.gram_counts: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+        for term in terms:
+            term_id = len(self.terms)
+            grams = trigrams(term)
+            self.terms.append(term)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(term_id)
+
+    def similar(
+        self,
+        term: str,
+        limit: int = MAX_EXPANSIONS,
+        threshold: float = MIN_SIMILARITY,
+    ) -> List[Tuple[str, float]]:
+        """
+        Finds vocabulary terms spelled similarly to a term.
+
+        Args:
+            term: Normalized query token
+            limit: Maximum number of candidates to return
+            threshold: Minimum Dice similarity between trigram sets
+
+        Returns:
+            List of (term, similarity) pairs, most similar first
+        """
+        if len(term) < MIN_FUZZY_LENGTH:
+            return []
+        grams = trigrams(term)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for term_id in self.postings.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+
+        candidates = []
+        for term_id, count in shared.items():
+            candidate = self.terms[term_id]
+            if abs(len(candidate) - len(term)) > MAX_LENGTH_DIFFERENCE:
+                continue
+            similarity = 2.0 * count / (len(grams) + self.gram_counts[term_id])
+            if similarity >= threshold:
+                candidates.append((candidate, similarity))
+        candidates.sort(key=lambda item: (-item[1], item[0]))
+        return candidates[:limit]
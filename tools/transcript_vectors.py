@@ -0,0 +1,226 @@
+"""
+Transcript Vectors - TF-IDF / cosine retrieval over transcript chunks with NumPy.
+
+Keyword OR-matching rewards any chunk that shares a common word with the
+query. This module instead represents every chunk as an L2-normalized
+TF-IDF vector, stored as a sparse term-by-chunk matrix (compressed columns:
+one slice of chunk ids and weights per term). A batch of queries becomes a
+sparse query matrix, and all of them are scored with a single sparse
+matrix product, computed as one NumPy scatter-add over just the postings
+the queries touch, followed by an argpartition top-k per query.
+
+Everything runs locally; no embedding service is involved.
+"""
+
+import math
+import threading
+import weakref
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from tools.transcript_index import BaseTranscriptIndex, TranscriptChunk, spans_overlap
+from tools.transcript_query import ParsedQuery, parse_query
+
+
+# Upper bound on the dense (queries x chunks) score block computed at once
+MAX_SCORE_BLOCK = 4_000_000
+
+# Candidates kept per query before overlapping windows are filtered out
+CANDIDATE_FACTOR = 4
+
+
+class TfidfMatrix:
+    """
+    Sparse TF-IDF matrix over the chunks of a transcript index.
+
+    Terms are columns: for term t, chunk ids live in
+    rows[col_ptr[t]:col_ptr[t + 1]] and the matching normalized weights in
+    weights[col_ptr[t]:col_ptr[t + 1]].
+    """
+
+    def __init__(self, index: BaseTranscriptIndex):
+        self.index = index
+        self.version = index.version
+        self.num_chunks = index.num_chunks
+
+        terms = sorted(index.iter_terms())
+        self.term_ids: Dict[str, int] = {term: term_id for term_id, term in enumerate(terms)}
+
+        col_ptr = [0]
+        rows: List[int] = []
+        tfs: List[int] = []
+        for term in terms:
+            for chunk_id, tf in index.term_postings(term):
+                rows.append(chunk_id)
+                tfs.append(tf)
+            col_ptr.append(len(rows))
+
+        self.col_ptr = np.asarray(col_ptr, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        df = np.diff(self.col_ptr).astype(np.float32)
+
+        # Smoothed IDF and sublinear TF, as in standard TF-IDF
+        self.idf = (np.log((1.0 + self.num_chunks) / (1.0 + df)) + 1.0).astype(np.float32)
+        term_of_entry = np.repeat(np.arange(len(terms)), np.diff(self.col_ptr))
+        weights = (1.0 + np.log(np.asarray(tfs, dtype=np.float32))) * self.idf[term_of_entry]
+
+        # L2-normalize each chunk vector so dot products are cosines
+        norms = np.sqrt(np.bincount(self.rows, weights=weights * weights, minlength=self.num_chunks))
+        norms[norms == 0.0] = 1.0
+        self.weights = (weights / norms[self.rows]).astype(np.float32)
+
+    def query_vector(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Builds the normalized sparse TF-IDF vector of a query.
+
+        Args:
+            query: Free-text query (phrase and NEAR/k operators contribute
+                their words; unknown words are expanded as in BM25 search)
+
+        Returns:
+            (term_ids, weights) arrays; both empty if no query term is indexed
+        """
+        parsed = self.index.expand_query(parse_query(query))
+        counts = Counter(term for term in parsed.terms if term in self.term_ids)
+        if not counts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        term_ids = np.fromiter((self.term_ids[term] for term in counts), dtype=np.int64, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        expansion = np.fromiter((parsed.weight(term) for term in counts), dtype=np.float32, count=len(counts))
+        weights = (1.0 + np.log(tf)) * self.idf[term_ids] * expansion
+        return term_ids, weights / math.sqrt(float(np.dot(weights, weights)))
+
+    def score_many(self, queries: List[str]) -> np.ndarray:
+        """
+        Computes cosine similarity between every query and every chunk.
+
+        Args:
+            queries: Free-text queries
+
+        Returns:
+            Array of shape (len(queries), num_chunks)
+        """
+        query_rows: List[np.ndarray] = []
+        query_terms: List[np.ndarray] = []
+        query_weights: List[np.ndarray] = []
+        for query_number, query in enumerate(queries):
+            term_ids, weights = self.query_vector(query)
+            query_rows.append(np.full(len(term_ids), query_number, dtype=np.int64))
+            query_terms.append(term_ids)
+            query_weights.append(weights)
+        q_rows = np.concatenate(query_rows) if query_rows else np.empty(0, dtype=np.int64)
+        q_terms = np.concatenate(query_terms) if query_terms else np.empty(0, dtype=np.int64)
+        q_weights = np.concatenate(query_weights) if query_weights else np.empty(0, dtype=np.float32)
+
+        # Expand every (query, term) pair into that term's postings. Gather
+        # indices into rows/weights are built with a repeat + cumsum trick so
+        # the whole product stays vectorized.
+        starts = self.col_ptr[q_terms]
+        lengths = self.col_ptr[q_terms + 1] - starts
+        total = int(lengths.sum())
+        pair_of_entry = np.repeat(np.arange(len(q_terms)), lengths)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        entries = starts[pair_of_entry] + offsets
+
+        flat = q_rows[pair_of_entry] * self.num_chunks + self.rows[entries]
+        contributions = self.weights[entries] * q_weights[pair_of_entry]
+        scores = np.bincount(flat, weights=contributions, minlength=len(queries) * self.num_chunks)
+        return scores.reshape(len(queries), self.num_chunks)
+
+    def search_many(self, queries: List[str], top_k: int = 5) -> List[List[Tuple[TranscriptChunk, float]]]:
+        """
+        Ranks chunks for many queries at once by cosine similarity.
+
+        Queries are scored in blocks so the dense score matrix stays bounded
+        on large corpora. Overlapping windows of the same video are reduced
+        to the best one, and phrase / NEAR/k clauses filter candidates, as in
+        BM25 search.
+
+        Args:
+            queries: Free-text queries
+            top_k: Maximum number of results per query
+
+        Returns:
+            One list of (chunk, score) pairs per query, best first
+        """
+        results: List[List[Tuple[TranscriptChunk, float]]] = []
+        if not self.num_chunks:
+            return [[] for _ in queries]
+        block = max(1, MAX_SCORE_BLOCK // self.num_chunks)
+        candidates = min(self.num_chunks, top_k * CANDIDATE_FACTOR)
+        for block_start in range(0, len(queries), block):
+            scores = self.score_many(queries[block_start:block_start + block])
+            top = np.argpartition(-scores, candidates - 1, axis=1)[:, :candidates]
+            block_queries = queries[block_start:block_start + block]
+            for query, row, candidate_ids in zip(block_queries, scores, top):
+                ordered = candidate_ids[np.lexsort((candidate_ids, -row[candidate_ids]))]
+                parsed = self.index.expand_query(parse_query(query))
+                selected = self._select(ordered, row, top_k, parsed)
+                if not selected and parsed.has_constraints:
+                    selected = self._select(ordered, row, top_k, None)
+                results.append(selected)
+        return results
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[TranscriptChunk, float]]:
+        """
+        Ranks chunks for a single query by cosine similarity.
+
+        Args:
+            query: Free-text query
+            top_k: Maximum number of results to return
+
+        Returns:
+            List of (chunk, score) pairs, best first
+        """
+        return self.search_many([query], top_k)[0]
+
+    def _select(
+        self,
+        ordered: np.ndarray,
+        row: np.ndarray,
+        top_k: int,
+        parsed: Optional[ParsedQuery],
+    ) -> List[Tuple[TranscriptChunk, float]]:
+        """Keeps the best non-overlapping, non-zero candidates satisfying the query clauses."""
+        kept: List[Tuple[TranscriptChunk, float]] = []
+        spans: List[Tuple[str, int, int]] = []
+        for chunk_id in ordered.tolist():
+            score = float(row[chunk_id])
+            if score <= 0.0:
+                break
+            if parsed is not None and parsed.has_constraints and not self.index.matches_constraints(parsed, chunk_id):
+                continue
+            span = self.index.chunk_span(chunk_id)
+            if any(spans_overlap(span, other) for other in spans):
+                continue
+            kept.append((self.index.get_chunk(chunk_id), score))
+            spans.append(span)
+            if len(kept) >= top_k:
+                break
+        return kept
+
+
+# One matrix per index object, rebuilt when the index content changes
+_matrix_cache: "weakref.WeakKeyDictionary[BaseTranscriptIndex, TfidfMatrix]" = weakref.WeakKeyDictionary()
+_matrix_lock = threading.Lock()
+
+
+def get_tfidf_matrix(index: BaseTranscriptIndex) -> TfidfMatrix:
+    """
+    Returns the TF-IDF matrix for an index, building it on first use.
+
+    Args:
+        index: Transcript index to vectorize
+
+    Returns:
+        TfidfMatrix matching the index's current content
+    """
+    with _matrix_lock:
+        matrix = _matrix_cache.get(index)
+        if matrix is None or matrix.version != index.version:
+            with index._lock:
+                matrix = TfidfMatrix(index)
+            _matrix_cache[index] = matrix
+        return matrix